@@ -50,6 +50,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'users',
     'movies',
     "django.contrib.humanize",
@@ -72,17 +73,26 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'movie_opinion_meter.urls'
 
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
+# Compile each template once per process in production
+if not DEBUG:
+    TEMPLATE_LOADERS = [('django.template.loaders.cached.Loader', TEMPLATE_LOADERS)]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            'loaders': TEMPLATE_LOADERS,
         },
     },
 ]
@@ -165,11 +175,107 @@ DEFAULT_FROM_EMAIL=os.getenv("DEFAULT_FROM_EMAIL")
 
 
 TMDB_API_KEY =os.getenv("TMDB_API_KEY")
+# Overridable so tests / local runs can point the client at a fake server
+TMDB_BASE_URL = os.getenv("TMDB_BASE_URL", "https://api.themoviedb.org/3")
+
+# TMDB allows roughly 50 requests/second per IP; every sync request goes
+# through a shared token bucket (movies/tmdb/ratelimit.py) set below that.
+TMDB_RATE_LIMIT = float(os.getenv("TMDB_RATE_LIMIT", "40"))
+TMDB_SYNC_WORKERS = int(os.getenv("TMDB_SYNC_WORKERS", "8"))
+# Incomplete person profiles are re-fetched from TMDB at most this often
+TMDB_PERSON_REFRESH_DAYS = int(os.getenv("TMDB_PERSON_REFRESH_DAYS", "30"))
+
+# On-disk TMDB response cache (empty TMDB_CACHE_DIR disables it).
+# TTLs are in seconds per endpoint; endpoints not listed are never cached.
+TMDB_CACHE_DIR = os.getenv("TMDB_CACHE_DIR", str(BASE_DIR / ".tmdb_cache"))
+TMDB_CACHE_MAX_MB = int(os.getenv("TMDB_CACHE_MAX_MB", "200"))
+TMDB_CACHE_TTLS = {
+    "/genre/movie/list": 7 * 24 * 3600,
+    "/movie/{id}": 24 * 3600,
+    "/person/{id}": 7 * 24 * 3600,
+}
+
+
+
+
+# Cache backend. CACHE_URL=redis://host:6379/0 (needs the `redis`
+# package) or memcached://host:11211 (needs `pymemcache`); unset falls
+# back to per-process local memory, which is what tests and local runs use.
+CACHE_URL = os.getenv("CACHE_URL", "")
+
+if CACHE_URL.startswith(("redis://", "rediss://")):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_URL,
+        }
+    }
+elif CACHE_URL.startswith("memcached://"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.memcached.PyMemcacheCache",
+            "LOCATION": CACHE_URL.removeprefix("memcached://"),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "movie-opinion-meter",
+        }
+    }
+
+CACHES["default"]["KEY_PREFIX"] = "mom"
 
+# TTL for movies.services.cache.cached(). Entries are also invalidated
+# on writes, but with locmem each process only sees its own writes, so
+# this bounds how stale another worker can be.
+CACHE_DEFAULT_SECONDS = int(os.getenv("CACHE_DEFAULT_SECONDS", "300"))
 
+# Per-user interaction state (votes, hype, watchlist, liked reviews) kept
+# in the cache; see movies.services.interactions. Writes invalidate it,
+# but only in the writing process with locmem, so keep it short there.
+INTERACTION_CACHE_SECONDS = int(
+    os.getenv("INTERACTION_CACHE_SECONDS", "3600" if CACHE_URL else "60")
+)
 
 
 GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
+# Async AI path (movies.services.ai_service): per-request timeout and the
+# pooled connections kept open to Groq per event loop
+GROQ_TIMEOUT_SECONDS = float(os.getenv("GROQ_TIMEOUT_SECONDS", "30"))
+GROQ_MAX_CONNECTIONS = int(os.getenv("GROQ_MAX_CONNECTIONS", "20"))
+# Per-model circuit breaker (movies.services.breaker): a model is skipped
+# for COOLDOWN seconds once ERROR_RATE of at least MIN_CALLS calls in the
+# last WINDOW seconds failed. The fallback model is also asked if the
+# primary hasn't answered within its p95 latency, capped at
+# GROQ_HEDGE_MAX_SECONDS (0 disables hedging).
+GROQ_BREAKER_WINDOW_SECONDS = int(os.getenv("GROQ_BREAKER_WINDOW_SECONDS", "60"))
+GROQ_BREAKER_MIN_CALLS = int(os.getenv("GROQ_BREAKER_MIN_CALLS", "5"))
+GROQ_BREAKER_ERROR_RATE = float(os.getenv("GROQ_BREAKER_ERROR_RATE", "0.5"))
+GROQ_BREAKER_COOLDOWN_SECONDS = int(os.getenv("GROQ_BREAKER_COOLDOWN_SECONDS", "30"))
+GROQ_HEDGE_MAX_SECONDS = float(os.getenv("GROQ_HEDGE_MAX_SECONDS", "5"))
+# AI results are reused for identical (text, mode, movie, model) requests
+# (movies.services.ai_cache) for this long, keeping at most this many
+AI_RESULT_CACHE_DAYS = int(os.getenv("AI_RESULT_CACHE_DAYS", "30"))
+AI_RESULT_CACHE_MAX_ROWS = int(os.getenv("AI_RESULT_CACHE_MAX_ROWS", "50000"))
+# Per user and AI action: this many requests in any sliding window of
+# this many seconds (movies.services.ratelimit). Counted in the cache:
+# without CACHE_URL each worker process counts on its own, so the real
+# limit is this times the number of workers.
+AI_RATE_LIMIT = int(os.getenv("AI_RATE_LIMIT", "100"))
+AI_RATE_WINDOW_SECONDS = int(os.getenv("AI_RATE_WINDOW_SECONDS", "600"))
+# AIRequestLog rows are buffered and bulk-written off the request path
+# (movies.services.ai_log) at least this often, or once BATCH_SIZE are
+# waiting; 0 writes each row immediately. At most BUFFER_SIZE are held.
+AI_LOG_FLUSH_SECONDS = float(os.getenv("AI_LOG_FLUSH_SECONDS", "2"))
+AI_LOG_BATCH_SIZE = int(os.getenv("AI_LOG_BATCH_SIZE", "100"))
+AI_LOG_BUFFER_SIZE = int(os.getenv("AI_LOG_BUFFER_SIZE", "1000"))
+# `manage.py prune_ai_logs` moves older rows to gzipped JSONL files here;
+# the admin lists only the last AI_LOG_ADMIN_DAYS unless asked for all
+AI_LOG_RETENTION_DAYS = int(os.getenv("AI_LOG_RETENTION_DAYS", "90"))
+AI_LOG_ARCHIVE_DIR = os.getenv("AI_LOG_ARCHIVE_DIR", str(BASE_DIR / "ai_log_archive"))
+AI_LOG_ADMIN_DAYS = int(os.getenv("AI_LOG_ADMIN_DAYS", "7"))
 
 LOGGING = {
     "version": 1,
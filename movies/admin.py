@@ -1,5 +1,9 @@
+from datetime import timedelta
+
+from django.conf import settings
 from django.contrib import admin
 from django.contrib import admin
+from django.utils import timezone
 from .models import (
     Genre,
     Movie,
@@ -12,7 +16,10 @@ from .models import (
     ReviewLike,
     ReviewComment,
     MovieHypeVote,
+    MovieStats,
+    SyncJob,
     AIRequestLog,
+    AIResult,
 )
 
 
@@ -64,12 +71,14 @@ class MovieReviewAdmin(admin.ModelAdmin):
         "user",
         "rating",
         "contains_spoiler",
+        "like_count",
+        "comment_count",
         "created_at",
     )
     list_filter = ("rating", "contains_spoiler", "created_at")
     search_fields = ("movie__title", "user__email", "review_text")
     raw_id_fields = ("user", "movie")
-    readonly_fields = ("created_at",)
+    readonly_fields = ("created_at", "like_count", "comment_count")
 
 
 
@@ -106,6 +115,20 @@ class MovieHypeVoteAdmin(admin.ModelAdmin):
     raw_id_fields = ("user", "movie")
 
 
+@admin.register(MovieStats)
+class MovieStatsAdmin(admin.ModelAdmin):
+    list_display = ("movie", "total_votes", "hype_excited", "hype_total", "review_count", "updated_at")
+    raw_id_fields = ("movie",)
+    readonly_fields = ("updated_at",)
+
+
+@admin.register(SyncJob)
+class SyncJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "status", "processed_count", "error_count", "started_at", "updated_at")
+    list_filter = ("kind", "status")
+    readonly_fields = ("started_at", "updated_at", "finished_at")
+
+
 @admin.register(Watchlist)
 class WatchlistAdmin(admin.ModelAdmin):
     list_display = ("id", "user", "movie", "created_at")
@@ -116,18 +139,60 @@ class WatchlistAdmin(admin.ModelAdmin):
 
 
 
+class AIRequestLogAgeFilter(admin.SimpleListFilter):
+    """
+    Recent rows by default, so listing and text search scan the last
+    AI_LOG_ADMIN_DAYS (via the created_at index), not the whole table.
+    """
+    title = "age"
+    parameter_name = "age"
+
+    def lookups(self, request, model_admin):
+        return [("all", "All (slow)")]
+
+    def choices(self, changelist):
+        yield {
+            "selected": self.value() is None,
+            "query_string": changelist.get_query_string(remove=[self.parameter_name]),
+            "display": f"Last {settings.AI_LOG_ADMIN_DAYS} days",
+        }
+        for lookup, title in self.lookup_choices:
+            yield {
+                "selected": self.value() == lookup,
+                "query_string": changelist.get_query_string({self.parameter_name: lookup}),
+                "display": title,
+            }
+
+    def queryset(self, request, queryset):
+        if self.value() == "all":
+            return queryset
+        since = timezone.now() - timedelta(days=settings.AI_LOG_ADMIN_DAYS)
+        return queryset.filter(created_at__gte=since)
+
+
 @admin.register(AIRequestLog)
 class AIRequestLogAdmin(admin.ModelAdmin):
     list_display = (
         "id",
         "user",
         "action",
+        "model_name",
         "success",
+        "latency_ms",
+        "prompt_tokens",
+        "completion_tokens",
         "created_at",
     )
-    list_filter = ("action", "success", "created_at")
+    list_filter = (AIRequestLogAgeFilter, "action", "model_name", "success", "cache_hit")
+    list_select_related = ("user",)
     search_fields = ("input_text", "output_text", "user__email")
     readonly_fields = ("created_at",)
+    # Skip the unfiltered COUNT(*) next to the filtered one
+    show_full_result_count = False
 
 
-
+@admin.register(AIResult)
+class AIResultAdmin(admin.ModelAdmin):
+    list_display = ("id", "action", "model_name", "hits", "created_at")
+    list_filter = ("action", "model_name")
+    readonly_fields = ("key", "created_at")
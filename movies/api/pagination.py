@@ -0,0 +1,51 @@
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from movies.pagination import paginate_keyset
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opaque-cursor pagination over explicit keys (see movies.pagination).
+
+    Responses look like PageNumberPagination's minus "count":
+    {"next": url, "previous": url, "results": [...]}.
+    """
+
+    cursor_query_param = "cursor"
+
+    def __init__(self, keys, page_size=20):
+        self.keys = keys
+        self.page_size = page_size
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page = paginate_keyset(
+            queryset,
+            self.keys,
+            request.query_params.get(self.cursor_query_param),
+            self.page_size,
+        )
+        return self.page.object_list
+
+    def _link(self, cursor):
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_next_link(self):
+        return self._link(self.page.next_cursor)
+
+    def get_previous_link(self):
+        if not self.page.has_previous:
+            return None
+        return self._link(self.page.previous_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
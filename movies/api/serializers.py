@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from movies.models import Movie, MovieReview, Genre
+from movies.models import Movie, MovieReview, Genre, Person
 
 
 class MovieListSerializer(serializers.ModelSerializer):
@@ -31,11 +31,22 @@ class MovieDetailSerializer(serializers.ModelSerializer):
         ]
 
 
+class PersonListSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Person
+        fields = [
+            "id",
+            "name",
+            "profile_path",
+            "known_for_department",
+        ]
+
+
 class ReviewSerializer(serializers.ModelSerializer):
     user_name = serializers.CharField(source="user.get_full_name")
     like_count = serializers.IntegerField()
     comment_count = serializers.IntegerField()
-    user_vote = serializers.CharField(allow_null=True)
+    user_vote = serializers.CharField(source="user_vote.vote", allow_null=True)
 
     class Meta:
         model = MovieReview
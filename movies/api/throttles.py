@@ -0,0 +1,22 @@
+from rest_framework.throttling import BaseThrottle
+
+from movies.services.ratelimit import hit
+
+
+class AIRateThrottle(BaseThrottle):
+    """
+    The AI rate limit (movies.services.ratelimit) for DRF views. The
+    bucket is the view's `ai_action`, "api" by default.
+    """
+
+    def allow_request(self, request, view):
+        self.retry_after = None
+        if not request.user.is_authenticated:
+            return True
+
+        allowed, retry_after = hit(request.user.id, getattr(view, "ai_action", "api"))
+        self.retry_after = retry_after or None
+        return allowed
+
+    def wait(self):
+        return self.retry_after
@@ -3,6 +3,7 @@ from .views import *
 
 urlpatterns = [
     path("movies/", MovieListAPI.as_view()),
+    path("search/", SearchAPI.as_view()),
     path("movies/<int:movie_id>/", MovieDetailAPI.as_view()),
     path("movies/<int:movie_id>/reviews/", MovieReviewsAPI.as_view()),
     path("movies/<int:movie_id>/vote/", MovieVoteAPI.as_view()),
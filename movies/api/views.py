@@ -3,26 +3,46 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.pagination import PageNumberPagination
 from django.shortcuts import get_object_or_404
-from django.db.models import Count, Q
+from django.utils.decorators import method_decorator
+from django.db import transaction
 
 from movies.models import (
-    Movie, MovieReview, ReviewLike,
-    MovieVote, Watchlist, MovieHypeVote
+    Movie, MovieReview,
+    MovieVote, Watchlist
 )
+from movies.conditional import (
+    conditional,
+    movie_list_markers,
+    movie_markers,
+    movie_reviews_markers,
+)
+from movies.pagination import MOVIE_KEYS
+from movies.services.cache import cached, group
+from movies.services.interactions import record_vote
+from movies.services.reviews import (
+    REVIEW_KEYS,
+    reviews_queryset,
+    assemble_reviews,
+)
+from movies.services.search import search_movies, search_people
+from movies.services.stats import get_movie_stats, record_vote_change, save_vote
+from movies.services.toggles import toggle_review_like, toggle_watchlist
+from .pagination import KeysetPagination
 from .serializers import (
     MovieListSerializer,
     MovieDetailSerializer,
+    PersonListSerializer,
     ReviewSerializer
 )
 
 
 
 class MovieListAPI(APIView):
+    @method_decorator(conditional(movie_list_markers))
     def get(self, request):
         qs = Movie.objects.all().prefetch_related("categories")
 
-        paginator = PageNumberPagination()
-        paginator.page_size = 20
+        paginator = KeysetPagination(MOVIE_KEYS, page_size=20)
         page = paginator.paginate_queryset(qs, request)
 
         serializer = MovieListSerializer(page, many=True)
@@ -31,60 +51,74 @@ class MovieListAPI(APIView):
 
 
 
+class SearchAPI(APIView):
+    def get(self, request):
+        query = request.GET.get("q", "").strip()
+
+        if not query:
+            return Response({"error": "Query parameter 'q' is required"}, status=400)
+
+        movies = search_movies(query).prefetch_related("categories")
+
+        paginator = PageNumberPagination()
+        paginator.page_size = 20
+        page = paginator.paginate_queryset(movies, request)
+
+        response = paginator.get_paginated_response(MovieListSerializer(page, many=True).data)
+        response.data["people"] = PersonListSerializer(search_people(query)[:10], many=True).data
+        return response
+
+
+
+
 class MovieDetailAPI(APIView):
+    @method_decorator(conditional(movie_markers))
     def get(self, request, movie_id):
-        movie = get_object_or_404(Movie, id=movie_id)
-
-        vote_counts = MovieVote.objects.filter(movie=movie).values("vote").annotate(
-            count=Count("id")
+        data = cached(
+            "api_movie_detail",
+            movie_id,
+            lambda: self.build(movie_id),
+            depends=[group(Movie, movie_id)],
+            # The ETag is read fresh from the database; a per-worker copy
+            # could pair it with a stale body
+            shared_only=True,
         )
+        return Response(data)
 
-        vote_summary = {v["vote"]: v["count"] for v in vote_counts}
+    def build(self, movie_id):
+        movie = get_object_or_404(
+            Movie.objects.select_related("stats").prefetch_related("categories"),
+            id=movie_id,
+        )
+        stats = get_movie_stats(movie)
 
         data = MovieDetailSerializer(movie).data
-        data["vote_summary"] = vote_summary
+        data["vote_summary"] = stats.vote_counts
+        data["review_count"] = stats.review_count
+        data["average_rating"] = stats.average_rating
 
         if not movie.is_released:
-            total = MovieHypeVote.objects.filter(movie=movie).count()
-            excited = MovieHypeVote.objects.filter(movie=movie, vote="excited").count()
+            total = stats.hype_total
+            excited = stats.hype_excited
             data["hype_score"] = round((excited / total) * 100) if total else 0
 
-        return Response(data)
+        return dict(data)
 
 
 
 class MovieReviewsAPI(APIView):
+    @method_decorator(conditional(movie_reviews_markers))
     def get(self, request, movie_id):
         sort = request.GET.get("sort", "liked")
+        if sort not in REVIEW_KEYS:
+            sort = "liked"
 
-        qs = (
-            MovieReview.objects
-            .filter(movie_id=movie_id)
-            .select_related("user")
-            .annotate(
-                like_count=Count("likes"),
-                comment_count=Count("comments"),
-            )
-        )
-
-        if sort == "latest":
-            qs = qs.order_by("-created_at")
-        else:
-            qs = qs.order_by("-like_count", "-created_at")
+        qs = reviews_queryset(movie_id, sort)
 
-        paginator = PageNumberPagination()
-        paginator.page_size = 10
+        paginator = KeysetPagination(REVIEW_KEYS[sort], page_size=10)
         page = paginator.paginate_queryset(qs, request)
 
-        data = []
-        for r in page:
-            user_vote = MovieVote.objects.filter(
-                movie_id=movie_id,
-                user=r.user
-            ).first()
-
-            r.user_vote = user_vote.vote if user_vote else None
-            data.append(r)
+        data = assemble_reviews(page, movie_id, viewer=request.user)
 
         serializer = ReviewSerializer(data, many=True)
         return paginator.get_paginated_response(serializer.data)
@@ -97,20 +131,11 @@ class ToggleReviewLikeAPI(APIView):
     def post(self, request, review_id):
         review = get_object_or_404(MovieReview, id=review_id)
 
-        like = ReviewLike.objects.filter(
-            user=request.user, review=review
-        )
-
-        if like.exists():
-            like.delete()
-            liked = False
-        else:
-            ReviewLike.objects.create(user=request.user, review=review)
-            liked = True
+        liked, like_count = toggle_review_like(request.user.id, review.id)
 
         return Response({
             "liked": liked,
-            "like_count": ReviewLike.objects.filter(review=review).count()
+            "like_count": like_count,
         })
 
 
@@ -119,22 +144,22 @@ class MovieVoteAPI(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request, movie_id):
+        movie = get_object_or_404(Movie, id=movie_id)
         vote = request.data.get("vote")
 
-        if vote == "remove":
-            MovieVote.objects.filter(
-                user=request.user,
-                movie_id=movie_id
-            ).delete()
-            return Response({"vote": None})
-
-        obj, _ = MovieVote.objects.update_or_create(
-            user=request.user,
-            movie_id=movie_id,
-            defaults={"vote": vote}
-        )
+        allowed_votes = {"bad", "average", "good", "masterpiece", "remove"}
+        if vote not in allowed_votes:
+            return Response({"error": "Invalid vote option"}, status=400)
+
+        new_vote = None if vote == "remove" else vote
 
-        return Response({"vote": obj.vote})
+        with transaction.atomic():
+            old_vote = save_vote(MovieVote, request.user, movie.id, new_vote)
+            if old_vote != new_vote:
+                record_vote_change(movie.id, old_vote, new_vote)
+                record_vote(request.user.id, movie.id, new_vote)
+
+        return Response({"vote": new_vote})
 
 
 
@@ -157,26 +182,20 @@ class MyWatchlistAPI(APIView):
         qs = (
             Watchlist.objects
             .filter(user=request.user)
-            .select_related("movie")
-            .annotate(
-                excited=Count(
-                    "movie__hype_votes",
-                    filter=Q(movie__hype_votes__vote="excited")
-                ),
-                total=Count("movie__hype_votes"),
-            )
+            .select_related("movie", "movie__stats")
         )
 
         data = []
         for w in qs:
+            stats = get_movie_stats(w.movie)
             data.append({
                 "movie_id": w.movie.id,
                 "title": w.movie.title,
                 "is_released": w.movie.is_released,
                 "added_at": w.created_at,
                 "hype": {
-                    "excited": w.excited,
-                    "total": w.total,
+                    "excited": stats.hype_excited,
+                    "total": stats.hype_total,
                 }
             })
 
@@ -188,20 +207,8 @@ class ToggleWatchlistAPI(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request, movie_id):
-        obj = Watchlist.objects.filter(
-            user=request.user,
-            movie_id=movie_id
-        )
-
-        if obj.exists():
-            obj.delete()
-            in_watchlist = False
-        else:
-            Watchlist.objects.create(
-                user=request.user,
-                movie_id=movie_id
-            )
-            in_watchlist = True
+        movie = get_object_or_404(Movie, id=movie_id)
+        in_watchlist = toggle_watchlist(request.user.id, movie.id)
 
         return Response({"in_watchlist": in_watchlist})
 
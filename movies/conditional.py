@@ -0,0 +1,144 @@
+import hashlib
+
+from django.contrib import messages
+from django.db.models import Count, Exists, Max, OuterRef, Subquery
+from django.db.models.functions import Greatest
+from django.views.decorators.http import condition
+
+from .models import Movie, MovieHypeVote, MovieStats, MovieVote, Person, Watchlist
+
+
+# Validators for conditional GET. Each *_markers function returns
+# (etag_parts, last_modified) for a resource, or None to skip conditional
+# handling (missing object, anonymous viewer, pending flash messages...).
+# They read change markers, never the payload: a 304 costs one query.
+#
+# last_modified is left None for HTML pages and per-viewer resources,
+# whose changes (a login, a watchlist toggle) don't move a timestamp.
+
+
+def conditional(markers):
+    """
+    condition() decorator driven by a markers function, which is run
+    once per request and shared by the ETag and Last-Modified checks.
+    """
+    def get(request, *args, **kwargs):
+        if not hasattr(request, "_conditional_markers"):
+            request._conditional_markers = markers(request, *args, **kwargs)
+        return request._conditional_markers
+
+    def etag(request, *args, **kwargs):
+        found = get(request, *args, **kwargs)
+        if found is None:
+            return None
+        digest = hashlib.md5(":".join(map(str, found[0])).encode()).hexdigest()
+        # Weak: pages carry a fresh csrf token mask on every render
+        return f'W/"{digest}"'
+
+    def last_modified(request, *args, **kwargs):
+        found = get(request, *args, **kwargs)
+        return None if found is None else found[1]
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
+
+
+def _html_viewer(request):
+    # Pages embed the viewer's navbar, csrf token and one-off messages
+    if len(messages.get_messages(request)):
+        return None
+    return [request.user.id, request.META.get("CSRF_COOKIE", "")]
+
+
+def _viewer_state(user):
+    # Read from the database, not the interactions cache: a stale cached
+    # copy would keep answering 304 after the viewer's own vote
+    mine = {"movie": OuterRef("pk"), "user": user}
+    return {
+        "my_vote": Subquery(MovieVote.objects.filter(**mine).values("vote")[:1]),
+        "my_hype": Subquery(MovieHypeVote.objects.filter(**mine).values("vote")[:1]),
+        "in_watchlist": Exists(Watchlist.objects.filter(**mine)),
+    }
+
+
+def movie_markers(request, movie_id):
+    """Movie row, its stats (votes, hype, review totals) only."""
+    row = (
+        Movie.objects
+        .filter(id=movie_id)
+        .values_list("updated_at", "stats__updated_at")
+        .first()
+    )
+    if row is None:
+        return None
+
+    last_modified = max(t for t in row if t is not None)
+    return ["movie", movie_id, *row], last_modified
+
+
+def movie_page_markers(request, movie_id):
+    """
+    movie_detail: movie, stats (also bumped by review, like and comment
+    changes, see movies.services.stats.touch_movie_stats) and the
+    viewer's state.
+    """
+    viewer = _html_viewer(request)
+    if viewer is None or not request.user.is_authenticated:
+        return None
+
+    row = (
+        Movie.objects
+        .filter(id=movie_id)
+        .annotate(**_viewer_state(request.user))
+        .values_list("updated_at", "stats__updated_at", "my_vote", "my_hype", "in_watchlist")
+        .first()
+    )
+    if row is None:
+        return None
+
+    return ["movie_page", movie_id, *row, *viewer], None
+
+
+def movie_reviews_markers(request, movie_id):
+    """MovieReviewsAPI: reviews, likes, comments and author votes, via stats."""
+    stats_updated = (
+        MovieStats.objects
+        .filter(movie_id=movie_id)
+        .values_list("updated_at", flat=True)
+        .first()
+    )
+    return ["movie_reviews", movie_id, request.user.id, stats_updated], None
+
+
+def movie_list_markers(request):
+    """
+    MovieListAPI: any movie added or re-synced changes every page. One
+    lookup on the updated_at index; movies are only ever deleted by hand.
+    """
+    last = Movie.objects.aggregate(last=Max("updated_at"))["last"]
+    return ["movie_list", last], last
+
+
+def person_markers(request, person_id):
+    """
+    person_detail: TMDB enrichment plus the credited movies (credit
+    changes bump the movie's updated_at, see movies.tmdb.sync_cast).
+    """
+    viewer = _html_viewer(request)
+    if viewer is None:
+        return None
+
+    row = (
+        Person.objects
+        .filter(id=person_id)
+        .annotate(
+            cast_n=Count("cast", distinct=True),
+            crew_n=Count("crew", distinct=True),
+            movies_last=Greatest(Max("cast__movie__updated_at"), Max("crew__movie__updated_at")),
+        )
+        .values_list("enriched_at", "cast_n", "crew_n", "movies_last")
+        .first()
+    )
+    if row is None:
+        return None
+
+    return ["person", person_id, *row, *viewer], None
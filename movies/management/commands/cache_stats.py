@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from movies.services.cache import cache_stats, is_shared, reset_cache_stats
+
+
+class Command(BaseCommand):
+    help = "Show cache hits, misses and hit ratio per namespace (shared cache backends only)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Zero the counters after printing them",
+        )
+
+    def handle(self, *args, **options):
+        if not is_shared():
+            self.stdout.write(self.style.WARNING(
+                "⚠️  Local-memory cache: counters live in each server process, "
+                "this command only sees its own (set CACHE_URL)"
+            ))
+
+        for namespace, stats in cache_stats().items():
+            ratio = "-" if stats["hit_ratio"] is None else f"{stats['hit_ratio']:.1%}"
+            self.stdout.write(
+                f"{namespace:<20} hits={stats['hits']:<8} misses={stats['misses']:<8} ratio={ratio}"
+            )
+
+        if options["reset"]:
+            reset_cache_stats()
+            self.stdout.write(self.style.SUCCESS("✅ Cache counters reset"))
@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from movies.services.ai_log import archive_before
+
+
+class Command(BaseCommand):
+    help = (
+        "Move AIRequestLog rows older than the retention window into gzipped JSONL "
+        "archives (one file per month). Run daily to keep the log table small."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.AI_LOG_RETENTION_DAYS,
+            help="Keep this many days in the database (default: AI_LOG_RETENTION_DAYS)",
+        )
+        parser.add_argument(
+            "--archive-dir",
+            default=settings.AI_LOG_ARCHIVE_DIR,
+            help="Where to write the archives (default: AI_LOG_ARCHIVE_DIR)",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["days"])
+
+        self.stdout.write(f"🗄️ Archiving AI logs before {cutoff:%Y-%m-%d %H:%M}...")
+        moved = archive_before(cutoff, options["archive_dir"], batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"✅ {moved} AI logs archived to {options['archive_dir']}"))
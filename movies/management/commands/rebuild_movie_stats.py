@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from movies.models import MovieReview
+from movies.services.reviews import rebuild_review_counts
+from movies.services.stats import rebuild_movie_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute denormalized movie vote/hype/review stats and review like/comment counts"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--movie",
+            type=int,
+            action="append",
+            dest="movie_ids",
+            help="Only rebuild this movie id (can be repeated)",
+        )
+
+    def handle(self, *args, **options):
+        movie_ids = options["movie_ids"]
+
+        self.stdout.write("📊 Rebuilding movie stats...")
+        fixed = rebuild_movie_stats(movie_ids=movie_ids)
+        self.stdout.write(self.style.SUCCESS(f"✅ Movie stats rebuilt ({fixed} rows fixed)"))
+
+        review_ids = None
+        if movie_ids:
+            review_ids = list(
+                MovieReview.objects.filter(movie_id__in=movie_ids).values_list("id", flat=True)
+            )
+
+        self.stdout.write("💬 Rebuilding review like/comment counts...")
+        fixed = rebuild_review_counts(review_ids=review_ids)
+        self.stdout.write(self.style.SUCCESS(f"✅ Review counts rebuilt ({fixed} rows fixed)"))
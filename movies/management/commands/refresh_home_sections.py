@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+from movies.services.home_sections import refresh_home_sections
+
+
+class Command(BaseCommand):
+    help = "Precompute the home page sections (trending, hyped, latest, upcoming)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="Keep running and refresh every N seconds (0 = refresh once)",
+        )
+
+    def handle(self, *args, **options):
+        interval = options["interval"]
+
+        while True:
+            sections = refresh_home_sections()
+            summary = ", ".join(f"{key}={len(ids)}" for key, ids in sections.items())
+            self.stdout.write(self.style.SUCCESS(f"✅ Home sections refreshed ({summary})"))
+
+            if interval <= 0:
+                break
+            time.sleep(interval)
@@ -1,4 +1,9 @@
+from datetime import datetime
+
 from django.core.management.base import BaseCommand
+from django.utils import timezone
+from movies.tmdb.changes import sync_changed_movies
+from movies.tmdb.jobs import start_job, run_job
 from movies.tmdb.sync_cast import sync_cast_and_crew
 
 
@@ -7,8 +12,50 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument("--limit", type=int, default=50)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Concurrent TMDB requests (default: TMDB_SYNC_WORKERS)",
+        )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Only resync credits of movies listed in TMDB's changes feed since the last run",
+        )
+        parser.add_argument(
+            "--since",
+            type=datetime.fromisoformat,
+            default=None,
+            help="With --incremental: override the stored high-water mark (YYYY-MM-DD)",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue the last unfinished sync job from its checkpoint",
+        )
 
     def handle(self, *args, **options):
         self.stdout.write("🎭 Syncing cast & crew...")
-        sync_cast_and_crew(limit=options["limit"])
+
+        if options["incremental"]:
+            since = options["since"]
+            if since and timezone.is_naive(since):
+                since = timezone.make_aware(since)
+
+            sync_changed_movies(
+                "cast",
+                update_movies=False,
+                workers=options["workers"],
+                since=since,
+            )
+        else:
+            job = start_job("cast", {"limit": options["limit"]}, resume=options["resume"])
+            run_job(
+                job,
+                sync_cast_and_crew,
+                limit=job.options.get("limit", options["limit"]),
+                workers=options["workers"],
+            )
+
         self.stdout.write(self.style.SUCCESS("✅ Cast & crew sync complete"))
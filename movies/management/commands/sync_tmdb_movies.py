@@ -1,4 +1,9 @@
+from datetime import datetime
+
 from django.core.management.base import BaseCommand
+from django.utils import timezone
+from movies.tmdb.changes import sync_changed_movies
+from movies.tmdb.jobs import start_job, run_job
 from movies.tmdb.sync import sync_all_movies
 
 
@@ -12,10 +17,50 @@ class Command(BaseCommand):
             default=200,
             help="Maximum number of movies to sync",
         )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Concurrent TMDB requests (default: TMDB_SYNC_WORKERS)",
+        )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Only refresh catalog movies listed in TMDB's changes feed since the last run",
+        )
+        parser.add_argument(
+            "--since",
+            type=datetime.fromisoformat,
+            default=None,
+            help="With --incremental: override the stored high-water mark (YYYY-MM-DD)",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue the last unfinished sync job from its checkpoint",
+        )
 
     def handle(self, *args, **options):
         limit = options["limit"]
 
-        self.stdout.write(f"🎬 Starting TMDB movie sync (limit={limit})...")
-        sync_all_movies(limit=limit)
+        if options["incremental"]:
+            since = options["since"]
+            if since and timezone.is_naive(since):
+                since = timezone.make_aware(since)
+
+            self.stdout.write("🎬 Starting incremental TMDB movie sync...")
+            sync_changed_movies(
+                "movies",
+                update_credits=False,
+                workers=options["workers"],
+                since=since,
+            )
+            self.stdout.write(self.style.SUCCESS("✅ Movie sync completed"))
+            return
+
+        job = start_job("movies", {"limit": limit}, resume=options["resume"])
+        limit = job.options.get("limit", limit)
+
+        self.stdout.write(f"🎬 Starting TMDB movie sync (limit={limit}, job #{job.id})...")
+        run_job(job, sync_all_movies, limit=limit, workers=options["workers"])
         self.stdout.write(self.style.SUCCESS("✅ Movie sync completed"))
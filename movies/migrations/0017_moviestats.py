@@ -0,0 +1,70 @@
+# Generated by Django 4.2.7 on 2026-10-17 15:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, Sum
+
+
+VOTE_FIELDS = {
+    "masterpiece": "masterpiece_votes",
+    "good": "good_votes",
+    "average": "average_votes",
+    "bad": "bad_votes",
+}
+
+
+def backfill_stats(apps, schema_editor):
+    Movie = apps.get_model("movies", "Movie")
+    MovieStats = apps.get_model("movies", "MovieStats")
+    MovieVote = apps.get_model("movies", "MovieVote")
+    MovieHypeVote = apps.get_model("movies", "MovieHypeVote")
+    MovieReview = apps.get_model("movies", "MovieReview")
+
+    stats = {
+        movie_id: MovieStats(movie_id=movie_id)
+        for movie_id in Movie.objects.values_list("id", flat=True)
+    }
+
+    for row in MovieVote.objects.values("movie_id", "vote").annotate(count=Count("id")):
+        field = VOTE_FIELDS.get(row["vote"])
+        if field:
+            setattr(stats[row["movie_id"]], field, row["count"])
+            stats[row["movie_id"]].total_votes += row["count"]
+
+    for row in MovieHypeVote.objects.values("movie_id", "vote").annotate(count=Count("id")):
+        stats[row["movie_id"]].hype_total += row["count"]
+        if row["vote"] == "excited":
+            stats[row["movie_id"]].hype_excited = row["count"]
+
+    for row in MovieReview.objects.values("movie_id").annotate(count=Count("id"), total=Sum("rating")):
+        stats[row["movie_id"]].review_count = row["count"]
+        stats[row["movie_id"]].rating_total = row["total"] or 0
+
+    MovieStats.objects.bulk_create(stats.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0016_alter_airequestlog_action'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MovieStats',
+            fields=[
+                ('movie', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='movies.movie')),
+                ('masterpiece_votes', models.IntegerField(default=0)),
+                ('good_votes', models.IntegerField(default=0)),
+                ('average_votes', models.IntegerField(default=0)),
+                ('bad_votes', models.IntegerField(default=0)),
+                ('total_votes', models.IntegerField(db_index=True, default=0)),
+                ('hype_excited', models.IntegerField(db_index=True, default=0)),
+                ('hype_total', models.IntegerField(default=0)),
+                ('review_count', models.IntegerField(default=0)),
+                ('rating_total', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(backfill_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-17 15:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0017_moviestats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HomeSection',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=50, unique=True)),
+                ('movie_ids', models.JSONField(default=list)),
+                ('refreshed_at', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,56 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+
+# Keep in sync with movies.services.search. These are created only on
+# PostgreSQL; other backends (e.g. SQLite in tests) fall back to icontains.
+SEARCH_INDEXES = [
+    ("Movie", GinIndex(
+        SearchVector("title", "overview", config="simple"),
+        name="movie_search_vector_gin",
+    )),
+    ("Movie", GinIndex(
+        fields=["title"],
+        name="movie_title_trgm_gin",
+        opclasses=["gin_trgm_ops"],
+    )),
+    ("Person", GinIndex(
+        SearchVector("name", config="simple"),
+        name="person_search_vector_gin",
+    )),
+    ("Person", GinIndex(
+        fields=["name"],
+        name="person_name_trgm_gin",
+        opclasses=["gin_trgm_ops"],
+    )),
+]
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    for model_name, index in SEARCH_INDEXES:
+        schema_editor.add_index(apps.get_model("movies", model_name), index)
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    for model_name, index in SEARCH_INDEXES:
+        schema_editor.remove_index(apps.get_model("movies", model_name), index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0018_homesection'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
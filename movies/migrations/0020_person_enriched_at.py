@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 15:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0019_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='person',
+            name='enriched_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
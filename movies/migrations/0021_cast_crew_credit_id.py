@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-17 15:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0020_person_enriched_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cast',
+            name='credit_id',
+            field=models.CharField(blank=True, db_index=True, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='cast',
+            name='order',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='crew',
+            name='credit_id',
+            field=models.CharField(blank=True, db_index=True, max_length=64, null=True),
+        ),
+    ]
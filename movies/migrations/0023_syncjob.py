@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-17 15:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0022_syncstate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('movies', 'Movies'), ('cast', 'Cast & crew')], max_length=20)),
+                ('status', models.CharField(choices=[('running', 'Running'), ('failed', 'Failed'), ('completed', 'Completed')], default='running', max_length=20)),
+                ('options', models.JSONField(blank=True, default=dict)),
+                ('cursor', models.JSONField(blank=True, default=dict)),
+                ('processed_count', models.PositiveIntegerField(default=0)),
+                ('error_count', models.PositiveIntegerField(default=0)),
+                ('failed_ids', models.JSONField(blank=True, default=list)),
+                ('last_error', models.TextField(blank=True)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'status'], name='movies_sync_kind_18d868_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+from django.db import migrations, models
+from django.db.models import F
+
+
+# Keep in sync with movies.pagination / movies.services.reviews. The
+# indexes use the same DESC NULLS LAST ordering as the keyset queries so
+# PostgreSQL can walk them; SQLite has no NULLS LAST in indexes.
+KEYSET_INDEXES = [
+    ("Movie", models.Index(
+        F("is_released").desc(nulls_last=True),
+        F("release_date").desc(nulls_last=True),
+        F("id").desc(nulls_last=True),
+        name="movie_home_keyset_idx",
+    )),
+    ("Movie", models.Index(
+        F("release_date").desc(nulls_last=True),
+        F("id").desc(nulls_last=True),
+        name="movie_release_keyset_idx",
+    )),
+    ("MovieReview", models.Index(
+        "movie",
+        F("created_at").desc(nulls_last=True),
+        F("id").desc(nulls_last=True),
+        name="review_latest_keyset_idx",
+    )),
+]
+
+
+def create_keyset_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    for model_name, index in KEYSET_INDEXES:
+        schema_editor.add_index(apps.get_model("movies", model_name), index)
+
+
+def drop_keyset_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    for model_name, index in KEYSET_INDEXES:
+        schema_editor.remove_index(apps.get_model("movies", model_name), index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0023_syncjob'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_keyset_indexes, drop_keyset_indexes),
+    ]
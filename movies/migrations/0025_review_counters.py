@@ -0,0 +1,74 @@
+# Generated by Django 4.2.7 on 2026-10-17 16:02
+
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+# "liked" review pages (movies.services.reviews REVIEW_KEYS); PostgreSQL
+# only, like the other keyset indexes in 0024.
+LIKED_KEYSET_INDEX = models.Index(
+    "movie",
+    F("like_count").desc(nulls_last=True),
+    F("created_at").desc(nulls_last=True),
+    F("id").desc(nulls_last=True),
+    name="review_liked_keyset_idx",
+)
+
+
+def _count(model, **filters):
+    return Coalesce(
+        Subquery(
+            model.objects
+            .filter(review_id=OuterRef("pk"), **filters)
+            .values("review_id")
+            .annotate(n=Count("id"))
+            .values("n")
+        ),
+        0,
+    )
+
+
+def backfill_counts(apps, schema_editor):
+    MovieReview = apps.get_model("movies", "MovieReview")
+    ReviewLike = apps.get_model("movies", "ReviewLike")
+    ReviewComment = apps.get_model("movies", "ReviewComment")
+
+    MovieReview.objects.update(
+        like_count=_count(ReviewLike),
+        comment_count=_count(ReviewComment),
+    )
+
+
+def create_liked_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.add_index(apps.get_model("movies", "MovieReview"), LIKED_KEYSET_INDEX)
+
+
+def drop_liked_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.remove_index(apps.get_model("movies", "MovieReview"), LIKED_KEYSET_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0024_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='moviereview',
+            name='comment_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='moviereview',
+            name='like_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counts, migrations.RunPython.noop),
+        migrations.RunPython(create_liked_index, drop_liked_index),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-17 18:20
+
+from django.db import migrations, models
+from django.db.models import F
+import django.utils.timezone
+
+
+def backfill_updated_at(apps, schema_editor):
+    MovieReview = apps.get_model("movies", "MovieReview")
+    MovieReview.objects.update(updated_at=F("created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0025_review_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='moviereview',
+            name='updated_at',
+            # Placeholder default for existing rows, replaced by
+            # created_at below
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+    ]
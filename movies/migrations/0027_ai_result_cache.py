@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-17 19:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0026_moviereview_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='airequestlog',
+            name='cache_hit',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='AIResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('action', models.CharField(choices=[('rewrite', 'Rewrite'), ('shorten', 'Shorten'), ('funny', 'Funny'), ('roast', 'Roast'), ('professional', 'Professional'), ('hype', 'Hype'), ('savage_1star', 'Savage 1-Star'), ('pros_cons', 'Pros & Cons')], max_length=20)),
+                ('model_name', models.CharField(max_length=100)),
+                ('output', models.JSONField()),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0027_ai_result_cache'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='airequestlog',
+            index=models.Index(fields=['user', 'action', 'created_at'], name='ai_log_user_action_idx'),
+        ),
+    ]
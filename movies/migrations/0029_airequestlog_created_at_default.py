@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:41
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0028_airequestlog_rate_limit_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='airequestlog',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-17 21:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0029_airequestlog_created_at_default'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='airequestlog',
+            index=models.Index(fields=['created_at'], name='ai_log_created_idx'),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.conf import settings
 from django.core.validators import MaxLengthValidator
+from django.utils import timezone
 User = settings.AUTH_USER_MODEL
 
 
@@ -38,6 +39,8 @@ class Movie(models.Model):
             models.Index(fields=["title"]),
             models.Index(fields=["release_date"]),
             models.Index(fields=["is_released"]),
+            # Latest change for the movie list's conditional GET
+            models.Index(fields=["updated_at"], name="movie_updated_idx"),
         ]
 
     def __str__(self):
@@ -55,6 +58,9 @@ class Person(models.Model):
     birthday = models.DateField(null=True, blank=True)
     place_of_birth = models.CharField(max_length=255, blank=True, null=True)
 
+    # Last successful TMDB /person/{id} fetch (see movies.tmdb.people)
+    enriched_at = models.DateTimeField(null=True, blank=True)
+
     def __str__(self):
         return self.name
 
@@ -65,6 +71,10 @@ class Cast(models.Model):
     person = models.ForeignKey(Person, on_delete=models.CASCADE)
     character = models.CharField(max_length=255, blank=True)
 
+    # TMDB credit id + billing order, used to diff credits on resync
+    credit_id = models.CharField(max_length=64, blank=True, null=True, db_index=True)
+    order = models.PositiveSmallIntegerField(default=0)
+
     def __str__(self):
         return f"{self.person.name} as {self.character}"
 
@@ -75,6 +85,8 @@ class Crew(models.Model):
     person = models.ForeignKey(Person, on_delete=models.CASCADE)
     job = models.CharField(max_length=255)
 
+    credit_id = models.CharField(max_length=64, blank=True, null=True, db_index=True)
+
     def __str__(self):
         return f"{self.person.name} ({self.job})"
 
@@ -123,8 +135,16 @@ class MovieReview(models.Model):
     )
 
     created_at = models.DateTimeField(auto_now_add=True)
+    # Bumped on edits (not on like/comment counters); review card
+    # fragments are cached per value
+    updated_at = models.DateTimeField(auto_now=True)
     contains_spoiler = models.BooleanField(default=False) 
 
+    # Denormalized, kept in sync on like/comment writes
+    # (see movies.services.reviews)
+    like_count = models.IntegerField(default=0)
+    comment_count = models.IntegerField(default=0)
+
     class Meta:
         unique_together = ("user", "movie")
 
@@ -182,6 +202,139 @@ class MovieHypeVote(models.Model):
 
 
 
+class MovieStats(models.Model):
+    """
+    Denormalized per-movie aggregates.
+
+    Maintained incrementally by the vote / hype / review write paths
+    (see movies.services.stats) so read paths never GROUP BY the vote
+    tables. `rebuild_movie_stats` reconciles any drift.
+    """
+
+    movie = models.OneToOneField(
+        Movie,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stats",
+    )
+
+    masterpiece_votes = models.IntegerField(default=0)
+    good_votes = models.IntegerField(default=0)
+    average_votes = models.IntegerField(default=0)
+    bad_votes = models.IntegerField(default=0)
+    total_votes = models.IntegerField(default=0, db_index=True)
+
+    hype_excited = models.IntegerField(default=0, db_index=True)
+    hype_total = models.IntegerField(default=0)
+
+    review_count = models.IntegerField(default=0)
+    rating_total = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Stats for movie {self.movie_id}"
+
+    @property
+    def vote_counts(self):
+        return {
+            "bad": self.bad_votes,
+            "average": self.average_votes,
+            "good": self.good_votes,
+            "masterpiece": self.masterpiece_votes,
+        }
+
+    @property
+    def hype_not_excited(self):
+        return self.hype_total - self.hype_excited
+
+    @property
+    def average_rating(self):
+        if not self.review_count:
+            return 0
+        return round(self.rating_total / self.review_count, 1)
+
+
+
+
+class HomeSection(models.Model):
+    """
+    Materialized home page section (ordered movie ids).
+
+    Written by `refresh_home_sections`, read by the home view.
+    """
+
+    key = models.CharField(max_length=50, unique=True)
+    movie_ids = models.JSONField(default=list)
+    refreshed_at = models.DateTimeField()
+
+    def __str__(self):
+        return self.key
+
+
+
+
+class SyncState(models.Model):
+    """
+    Persisted high-water mark for incremental TMDB syncs
+    (see movies.tmdb.changes).
+    """
+
+    name = models.CharField(max_length=50, unique=True)
+    high_water_mark = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.high_water_mark}"
+
+
+
+class SyncJob(models.Model):
+    """
+    Checkpoint of a long-running TMDB sync so it can be resumed
+    (`--resume`) instead of restarting from page 1 / movie 0.
+    """
+
+    KIND_CHOICES = [
+        ("movies", "Movies"),
+        ("cast", "Cast & crew"),
+    ]
+
+    STATUS_CHOICES = [
+        ("running", "Running"),
+        ("failed", "Failed"),
+        ("completed", "Completed"),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="running")
+
+    # Arguments the job was started with, reused on resume
+    options = models.JSONField(default=dict, blank=True)
+    # Where to pick up from (pages per discover list / last movie id)
+    cursor = models.JSONField(default=dict, blank=True)
+
+    processed_count = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    # tmdb ids that could not be fetched
+    failed_ids = models.JSONField(default=list, blank=True)
+    last_error = models.TextField(blank=True)
+
+    started_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["kind", "status"]),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.id} ({self.status})"
+
+
+
+
 class AIRequestLog(models.Model):
     ACTION_CHOICES = [
         ("rewrite", "Rewrite"),
@@ -204,8 +357,49 @@ class AIRequestLog(models.Model):
 
     success = models.BooleanField(default=False)
     error_message = models.CharField(max_length=255, blank=True)
+    # Served from AIResult without calling the model
+    cache_hit = models.BooleanField(default=False)
+    # Model that answered (see ai_service.ROUTES), time spent on the AI
+    # call and its token usage; tokens stay empty when nothing was sent
+    model_name = models.CharField(max_length=100, blank=True)
+    latency_ms = models.PositiveIntegerField(null=True, blank=True)
+    prompt_tokens = models.PositiveIntegerField(null=True, blank=True)
+    completion_tokens = models.PositiveIntegerField(null=True, blank=True)
+
+    # Set when the request is served; rows are written later in batches
+    # (movies.services.ai_log)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
 
-    created_at = models.DateTimeField(auto_now_add=True)
+    class Meta:
+        indexes = [
+            # Rate limit fallback when the cache is down
+            models.Index(fields=["user", "action", "created_at"], name="ai_log_user_action_idx"),
+            # Admin's recent window and prune_ai_logs
+            models.Index(fields=["created_at"], name="ai_log_created_idx"),
+        ]
 
     def __str__(self):
         return f"{self.user_id} - {self.action} - {self.success}"
+
+
+
+class AIResult(models.Model):
+    """
+    Content-addressed cache of AI outputs (see movies.services.ai_cache).
+
+    `key` hashes everything the output depends on: action, cleaned
+    input text, movie and model.
+    """
+
+    key = models.CharField(max_length=64, unique=True)
+    action = models.CharField(max_length=20, choices=AIRequestLog.ACTION_CHOICES)
+    model_name = models.CharField(max_length=100)
+
+    # Text for rewrites, {"pros": [...], "cons": [...]} for pros_cons
+    output = models.JSONField()
+
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.action} {self.key[:12]}"
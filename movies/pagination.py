@@ -0,0 +1,231 @@
+import base64
+import binascii
+import datetime
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import BooleanField, Expression, F, Q, Value
+
+
+# Keys are (field_or_annotation, descending) pairs; the last one must be
+# unique (normally ("id", True)) so every row has a distinct position.
+# NULLs always sort last, in both directions.
+
+# Newest release first (movies without a date at the end)
+MOVIE_KEYS = [("release_date", True), ("id", True)]
+
+# Home page: released movies first, then upcoming
+HOME_MOVIE_KEYS = [("is_released", True)] + MOVIE_KEYS
+
+
+def keyset_order(keys, backwards=False):
+    # Reversed order (used to fetch a previous page) puts NULLs first
+    nulls = {"nulls_first": True} if backwards else {"nulls_last": True}
+    return [
+        (F(name).desc if desc != backwards else F(name).asc)(**nulls)
+        for name, desc in keys
+    ]
+
+
+def encode_cursor(values, backwards=False):
+    values = [
+        v.isoformat() if isinstance(v, (datetime.date, datetime.datetime)) else v
+        for v in values
+    ]
+    raw = json.dumps({"v": values, "b": backwards}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token, model, keys):
+    """
+    Return (values, backwards) for a cursor token, or (None, False) if it
+    is missing or invalid (callers then show the first page).
+    """
+    token = (token or "").strip()
+    if not token:
+        return None, False
+
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        data = json.loads(raw)
+        values = data["v"]
+        backwards = bool(data.get("b"))
+    except (ValueError, TypeError, KeyError, binascii.Error):
+        return None, False
+
+    if not isinstance(values, list) or len(values) != len(keys):
+        return None, False
+
+    try:
+        values = [
+            _to_python(model, name, value)
+            for (name, _), value in zip(keys, values)
+        ]
+    except ValidationError:
+        return None, False
+
+    return values, backwards
+
+
+def _to_python(model, name, value):
+    # Dates come back as strings; annotations (counts) are plain JSON
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return value
+    return field.to_python(value) if value is not None else None
+
+
+def _nullable(model, name):
+    try:
+        return model._meta.get_field(name).null
+    except FieldDoesNotExist:
+        return False
+
+
+def _beyond(model, name, desc, value, backwards):
+    # Rows strictly after `value` on this key (before it when backwards)
+    nothing = Q(pk__in=[])
+
+    if value is None:
+        if backwards:
+            return Q(**{f"{name}__isnull": False})
+        return nothing
+
+    lookup = "lt" if desc != backwards else "gt"
+    q = Q(**{f"{name}__{lookup}": value})
+
+    if not backwards and _nullable(model, name):
+        q |= Q(**{f"{name}__isnull": True})
+
+    return q
+
+
+def _bound(model, name, desc, value, backwards):
+    # Rows at or after `value` on this key: implied by the full filter,
+    # but a plain range the planner can seek an index with
+    if value is None:
+        return Q() if backwards else Q(**{f"{name}__isnull": True})
+
+    lookup = "lte" if desc != backwards else "gte"
+    q = Q(**{f"{name}__{lookup}": value})
+
+    if not backwards and _nullable(model, name):
+        q |= Q(**{f"{name}__isnull": True})
+
+    return q
+
+
+class _RowComparison(Expression):
+    """(k1, k2, ...) < (v1, v2, ...) as a filter condition."""
+
+    conditional = True
+    output_field = BooleanField()
+
+    def __init__(self, names, op, values):
+        super().__init__()
+        self.lhs = [F(name) for name in names]
+        self.rhs = [Value(value) for value in values]
+        self.op = op
+
+    def get_source_expressions(self):
+        return self.lhs + self.rhs
+
+    def set_source_expressions(self, exprs):
+        self.lhs, self.rhs = exprs[: len(self.lhs)], exprs[len(self.lhs):]
+
+    def as_sql(self, compiler, connection):
+        sql, params = [], []
+        for side in (self.lhs, self.rhs):
+            compiled = [compiler.compile(expr) for expr in side]
+            sql.append("({})".format(", ".join(part for part, _ in compiled)))
+            params.extend(p for _, part_params in compiled for p in part_params)
+        return f"{sql[0]} {self.op} {sql[1]}", params
+
+
+def keyset_filter(model, keys, values, backwards=False):
+    """
+    Q matching rows after `values` in keys order (before when backwards).
+
+    When every key sorts the same way and no NULLs can be involved this
+    is a single row-value comparison, (k1, k2) < (v1, v2). Otherwise
+
+        k1 >= v1 AND ((k1 > v1) OR (k1 = v1 AND k2 > v2) OR ...)
+
+    where the leading bound is redundant but lets the planner use an
+    index range scan instead of evaluating the OR for every row.
+    """
+    directions = {desc for _, desc in keys}
+    if (
+        len(directions) == 1
+        and None not in values
+        and not any(_nullable(model, name) for name, _ in keys)
+    ):
+        op = "<" if directions.pop() != backwards else ">"
+        return Q(_RowComparison([name for name, _ in keys], op, values))
+
+    q = Q(pk__in=[])
+    equal = Q()
+
+    for (name, desc), value in zip(keys, values):
+        q |= equal & _beyond(model, name, desc, value, backwards)
+
+        if value is None:
+            equal &= Q(**{f"{name}__isnull": True})
+        else:
+            equal &= Q(**{name: value})
+
+    (name, desc), value = keys[0], values[0]
+    return _bound(model, name, desc, value, backwards) & q
+
+
+class KeysetPage:
+    def __init__(self, object_list, keys, has_next, has_previous):
+        self.object_list = object_list
+        self.keys = keys
+        self.has_next = has_next
+        self.has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def _position(self, obj):
+        return [getattr(obj, name) for name, _ in self.keys]
+
+    @property
+    def next_cursor(self):
+        if not self.has_next:
+            return None
+        return encode_cursor(self._position(self.object_list[-1]))
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous:
+            return None
+        return encode_cursor(self._position(self.object_list[0]), backwards=True)
+
+
+def paginate_keyset(qs, keys, cursor, page_size):
+    """
+    One page of `qs` ordered by `keys`, starting after `cursor`.
+
+    A single LIMIT query seeking on the keys: no OFFSET and no COUNT,
+    so deep pages cost the same as the first one.
+    """
+    values, backwards = decode_cursor(cursor, qs.model, keys)
+
+    if values is not None:
+        qs = qs.filter(keyset_filter(qs.model, keys, values, backwards))
+
+    rows = list(qs.order_by(*keyset_order(keys, backwards))[: page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    if backwards:
+        rows.reverse()
+        return KeysetPage(rows, keys, has_next=True, has_previous=has_more)
+
+    return KeysetPage(rows, keys, has_next=has_more, has_previous=values is not None)
@@ -0,0 +1,101 @@
+import hashlib
+import json
+import random
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import F
+from django.utils import timezone
+
+from movies.models import AIResult
+from .ai_service import ai_extract_pros_cons, clean_text, route_for
+
+
+# get_result counts roughly one hit in HIT_SAMPLE (as HIT_SAMPLE hits),
+# so reads don't each write a row
+HIT_SAMPLE = 10
+
+
+def result_key(action, text, movie_id=None, movie_context=""):
+    """
+    Content address of an AI result. The text is normalized with
+    clean_text, so whitespace-only differences share an entry. Includes
+    the action's route (see ai_service.ROUTES), so rerouting a mode
+    starts it afresh, and `movie_context` (the title and overview the
+    prompt was built from), so a re-synced overview does too.
+    """
+    text = clean_text(text)
+    payload = json.dumps([action, text, movie_id, movie_context, *route_for(action, bool(text))])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _max_age():
+    return timedelta(days=getattr(settings, "AI_RESULT_CACHE_DAYS", 30))
+
+
+def get_result(key):
+    """Cached output for `key`, or None if missing or expired."""
+    row = (
+        AIResult.objects
+        .filter(key=key, created_at__gte=timezone.now() - _max_age())
+        .values_list("id", "output")
+        .first()
+    )
+    if row is None:
+        return None
+
+    if random.random() < 1 / HIT_SAMPLE:
+        AIResult.objects.filter(id=row[0]).update(hits=F("hits") + HIT_SAMPLE)
+    return row[1]
+
+
+def store_result(key, action, output, model_name=""):
+    try:
+        result, created = AIResult.objects.update_or_create(
+            key=key,
+            # Replaces an expired entry in place
+            defaults={
+                "action": action,
+                "model_name": model_name,
+                "output": output,
+                "hits": 0,
+                "created_at": timezone.now(),
+            },
+        )
+    except IntegrityError:
+        # Stored concurrently by an identical request
+        return
+
+    if created:
+        # Size bound: ids only grow, so drop everything older than the
+        # newest AI_RESULT_CACHE_MAX_ROWS entries
+        max_rows = getattr(settings, "AI_RESULT_CACHE_MAX_ROWS", 50000)
+        AIResult.objects.filter(id__lte=result.id - max_rows).delete()
+
+
+aget_result = sync_to_async(get_result)
+astore_result = sync_to_async(store_result)
+
+
+def pros_cons(text, meta=None):
+    """
+    ai_extract_pros_cons through the cache. A stored review's entry
+    stops matching as soon as its text is edited. `meta` is filled as
+    for groq_chat on a miss.
+
+    Returns (data, cache_hit).
+    """
+    key = result_key("pros_cons", text)
+
+    data = get_result(key)
+    if data is not None:
+        return data, True
+
+    meta = {} if meta is None else meta
+    data = ai_extract_pros_cons(text, meta)
+    # Nothing extracted is worth asking again for, not pinning
+    if data["pros"] or data["cons"]:
+        store_result(key, "pros_cons", data, meta.get("model", ""))
+    return data, False
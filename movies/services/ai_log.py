@@ -0,0 +1,167 @@
+import atexit
+import gzip
+import json
+import logging
+import threading
+from collections import defaultdict
+from pathlib import Path
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections
+
+from movies.models import AIRequestLog
+
+
+logger = logging.getLogger(__name__)
+
+# Write-behind AIRequestLog: record() only appends to an in-process
+# buffer, and a background thread bulk-inserts it every
+# AI_LOG_FLUSH_SECONDS or as soon as AI_LOG_BATCH_SIZE entries are
+# waiting. Whatever is left is flushed when the process exits.
+#
+# The buffer is bounded at AI_LOG_BUFFER_SIZE: if the database can't keep
+# up, new entries are dropped (and counted) rather than held in memory.
+
+_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_wake = threading.Event()
+_buffer = []
+_worker = None
+stats = {"written": 0, "dropped": 0}
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def record(**fields):
+    """
+    Queue one AIRequestLog row. Doesn't touch the database, so it is safe
+    to call from async views. created_at defaults to now, not flush time.
+    """
+    entry = AIRequestLog(**fields)
+
+    if _setting("AI_LOG_FLUSH_SECONDS", 2) <= 0:
+        # Write-through (tests, management commands)
+        _write([entry])
+        return
+
+    with _lock:
+        dropped = len(_buffer) >= _setting("AI_LOG_BUFFER_SIZE", 1000)
+        if dropped:
+            stats["dropped"] += 1
+        else:
+            _buffer.append(entry)
+        due = dropped or len(_buffer) >= _setting("AI_LOG_BATCH_SIZE", 100)
+
+    if dropped:
+        logger.warning("AI log buffer full", extra={"dropped": stats["dropped"]})
+    _ensure_worker()
+    if due:
+        _wake.set()
+
+
+async def arecord(**fields):
+    if _setting("AI_LOG_FLUSH_SECONDS", 2) <= 0:
+        await sync_to_async(record)(**fields)
+    else:
+        record(**fields)
+
+
+def pending():
+    return len(_buffer)
+
+
+def flush():
+    """Write everything buffered so far. Returns the number of rows."""
+    with _flush_lock:
+        with _lock:
+            entries = _buffer[:]
+            _buffer.clear()
+        if entries:
+            _write(entries)
+        return len(entries)
+
+
+def _write(entries):
+    try:
+        AIRequestLog.objects.bulk_create(entries, batch_size=_setting("AI_LOG_BATCH_SIZE", 100))
+    except Exception:
+        stats["dropped"] += len(entries)
+        logger.exception("AI log write failed", extra={"entries": len(entries)})
+    else:
+        stats["written"] += len(entries)
+
+
+def _run():
+    while True:
+        _wake.wait(_setting("AI_LOG_FLUSH_SECONDS", 2))
+        _wake.clear()
+        # This thread keeps its own connection; honour CONN_MAX_AGE
+        close_old_connections()
+        flush()
+
+
+def _ensure_worker():
+    global _worker
+
+    # Threads don't survive a fork, so a forked worker starts its own
+    if _worker is not None and _worker.is_alive():
+        return
+    with _lock:
+        if _worker is not None and _worker.is_alive():
+            return
+        _worker = threading.Thread(target=_run, name="ai-log-writer", daemon=True)
+        _worker.start()
+
+
+ARCHIVE_FIELDS = [
+    "id", "user_id", "movie_id", "action", "input_text", "output_text",
+    "success", "error_message", "cache_hit", "model_name", "latency_ms",
+    "prompt_tokens", "completion_tokens", "created_at",
+]
+
+
+def archive_before(cutoff, directory, batch_size=1000):
+    """
+    Move rows created before `cutoff` out of AIRequestLog into gzipped
+    JSONL files in `directory`, one per month (ai_logs-YYYY-MM.jsonl.gz,
+    appended to across runs). Rows are deleted only once their batch is
+    written, so an interrupted run can at worst archive a batch twice.
+
+    Returns the number of rows moved.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    moved = 0
+
+    while True:
+        rows = list(
+            AIRequestLog.objects
+            .filter(created_at__lt=cutoff)
+            .order_by("created_at", "id")
+            .values(*ARCHIVE_FIELDS)[:batch_size]
+        )
+        if not rows:
+            return moved
+
+        by_month = defaultdict(list)
+        for row in rows:
+            by_month[row["created_at"].strftime("%Y-%m")].append(row)
+
+        for month, month_rows in by_month.items():
+            # Each append is a new gzip member; readers see one stream
+            with gzip.open(directory / f"ai_logs-{month}.jsonl.gz", "at", encoding="utf-8") as f:
+                for row in month_rows:
+                    f.write(json.dumps(row, cls=DjangoJSONEncoder) + "\n")
+
+        AIRequestLog.objects.filter(id__in=[row["id"] for row in rows]).delete()
+        moved += len(rows)
+
+
+# Daemon threads are stopped at exit without finishing; drain from the
+# exiting thread instead (gunicorn/uvicorn workers exit normally on
+# SIGTERM, so this runs on graceful shutdown).
+atexit.register(flush)
@@ -1,13 +1,74 @@
 import re
 import json
+import time
+import asyncio
+import hashlib
+import threading
+import weakref
+from typing import NamedTuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import httpx
 import requests
 from django.conf import settings
 
+from .breaker import get_breaker
+
 GROQ_URL = "https://api.groq.com/openai/v1/chat/completions"
 GROQ_MODEL_PRIMARY = "llama-3.3-70b-versatile"
 GROQ_MODEL_FALLBACK = "llama-3.1-8b-instant"
 
 
+class Route(NamedTuple):
+    model: str
+    max_tokens: int
+    # Budget for the movie overview in the prompt (0 leaves it out)
+    context_tokens: int
+
+
+# Per AI action: which model answers first, how long the answer may be
+# and how much movie context it gets. Light edits run on the small model;
+# the other model is still the fallback (see groq_chat).
+ROUTES = {
+    "rewrite": Route(GROQ_MODEL_PRIMARY, 300, 80),
+    "shorten": Route(GROQ_MODEL_FALLBACK, 80, 0),
+    "funny": Route(GROQ_MODEL_PRIMARY, 300, 120),
+    "roast": Route(GROQ_MODEL_PRIMARY, 300, 120),
+    "professional": Route(GROQ_MODEL_FALLBACK, 300, 0),
+    "hype": Route(GROQ_MODEL_FALLBACK, 250, 80),
+    "savage_1star": Route(GROQ_MODEL_PRIMARY, 300, 120),
+    # Room for the whole JSON object: a cut-off answer doesn't parse
+    "pros_cons": Route(GROQ_MODEL_PRIMARY, 400, 0),
+    # Any mode with no review text: a review written from the overview
+    "generate": Route(GROQ_MODEL_PRIMARY, 350, 250),
+}
+DEFAULT_ROUTE = Route(GROQ_MODEL_PRIMARY, 350, 250)
+
+
+def route_for(action: str, has_text: bool = True) -> Route:
+    if not has_text:
+        return ROUTES["generate"]
+    return ROUTES.get(action, DEFAULT_ROUTE)
+
+
+def truncate_tokens(text: str, tokens: int) -> str:
+    """
+    Cut `text` to roughly `tokens` tokens (~4 characters each), at a
+    sentence end if one is close, else at a word.
+    """
+    text = (text or "").strip()
+    if tokens <= 0:
+        return ""
+    limit = tokens * 4
+    if len(text) <= limit:
+        return text
+
+    cut = text[:limit]
+    sentence = cut.rfind(". ")
+    if sentence >= limit // 2:
+        return cut[:sentence + 1]
+    return cut.rsplit(" ", 1)[0] + "…"
+
+
 def clean_text(text: str) -> str:
     text = (text or "").strip()
     text = re.sub(r"\s+", " ", text)
@@ -53,7 +114,32 @@ def build_prompt(text: str, mode: str, movie_title: str = "", movie_overview: st
     return base + "Rewrite this review."
 
 
-def groq_chat(messages: list) -> str:
+MODELS = [GROQ_MODEL_PRIMARY, GROQ_MODEL_FALLBACK]
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _available_models(preferred: str = GROQ_MODEL_PRIMARY) -> list:
+    # Models in preference order, skipping those with an open breaker
+    order = [preferred] + [m for m in MODELS if m != preferred]
+    models = [m for m in order if get_breaker(m).allow()]
+    if not models:
+        raise RuntimeError("AI temporarily unavailable")
+    return models
+
+
+def _usage(data: dict) -> dict:
+    # Groq reports usage under "usage", or "x_groq" on streamed chunks
+    usage = data.get("usage") or (data.get("x_groq") or {}).get("usage") or {}
+    return {
+        "prompt_tokens": usage.get("prompt_tokens"),
+        "completion_tokens": usage.get("completion_tokens"),
+    }
+
+
+def _call_model(model_name: str, messages: list, max_tokens: int = 350) -> tuple:
+    """Returns (content, usage); usage includes the finish_reason."""
     api_key = getattr(settings, "GROQ_API_KEY", "").strip()
     if not api_key:
         raise ValueError("GROQ_API_KEY missing")
@@ -62,31 +148,84 @@ def groq_chat(messages: list) -> str:
         "Authorization": f"Bearer {api_key}",
         "Content-Type": "application/json",
     }
+    payload = {
+        "model": model_name,
+        "messages": messages,
+        "temperature": 0.7,
+        "max_tokens": max_tokens,
+    }
 
-    def call_model(model_name: str) -> str:
-        payload = {
-            "model": model_name,
-            "messages": messages,
-            "temperature": 0.7,
-            "max_tokens": 350,
-        }
-
+    started = time.monotonic()
+    try:
         res = requests.post(GROQ_URL, headers=headers, json=payload, timeout=30)
 
         if res.status_code != 200:
             raise RuntimeError(f"Groq error {res.status_code}: {res.text[:500]}")
 
         data = res.json()
-        return data["choices"][0]["message"]["content"].strip()
-
-    try:
-        return call_model(GROQ_MODEL_PRIMARY)
+        choice = data["choices"][0]
+        content = choice["message"]["content"].strip()
     except Exception:
-        return call_model(GROQ_MODEL_FALLBACK)
+        get_breaker(model_name).record(False, time.monotonic() - started)
+        raise
 
+    get_breaker(model_name).record(True, time.monotonic() - started)
+    return content, {**_usage(data), "finish_reason": choice.get("finish_reason")}
 
-def ai_rewrite_review(text: str, mode: str = "rewrite", movie_title: str = "", movie_overview: str = "") -> str:
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "GROQ_MAX_CONNECTIONS", 20),
+                thread_name_prefix="groq",
+            )
+        return _executor
+
+
+def groq_chat(messages: list, route: Route = DEFAULT_ROUTE, meta: dict = None) -> str:
+    """
+    Ask the route's model first. If it fails, or hasn't answered within
+    its hedge delay (see CircuitBreaker.hedge_delay), the other model is
+    asked too and the first good answer wins.
+
+    `meta`, if given, gets the answering model and its token usage.
+    """
+    def call(model_name):
+        return model_name, *_call_model(model_name, messages, route.max_tokens)
+
+    def answer(model_name, content, usage):
+        if meta is not None:
+            meta.update(model=model_name, **usage)
+        return content
+
+    models = _available_models(route.model)
+    if len(models) == 1:
+        return answer(*call(models[0]))
+    delay = get_breaker(models[0]).hedge_delay()
+
+    pending = {_pool().submit(call, models[0])}
+    remaining = models[1:]
+    error = None
+
+    while pending:
+        # A slow loser keeps running in the pool and records its outcome
+        done, pending = wait(pending, timeout=delay if remaining else None, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return answer(*future.result())
+            error = future.exception()
+
+        if remaining and (not done or not pending):
+            pending.add(_pool().submit(call, remaining.pop(0)))
+
+    raise error
+
+
+def rewrite_messages(text: str, mode: str = "rewrite", movie_title: str = "", movie_overview: str = "") -> list:
     text = clean_text(text)
+    movie_overview = truncate_tokens(movie_overview, route_for(mode, bool(text)).context_tokens)
 
     if not text:
         if not movie_title:
@@ -100,25 +239,275 @@ def ai_rewrite_review(text: str, mode: str = "rewrite", movie_title: str = "", m
             "Length: 5-8 lines.\n"
         )
 
-        messages = [
+        return [
             {"role": "system", "content": "You write movie reviews. Output only the final review text."},
             {"role": "user", "content": prompt},
         ]
 
-        return groq_chat(messages)
-
     prompt = build_prompt(text, mode, movie_title=movie_title, movie_overview=movie_overview)
 
-    messages = [
+    return [
         {"role": "system", "content": "You write movie reviews. Output only the final rewritten review text."},
         {"role": "user", "content": prompt},
     ]
 
-    return groq_chat(messages)
 
+def ai_rewrite_review(text: str, mode: str = "rewrite", movie_title: str = "", movie_overview: str = "") -> str:
+    route = route_for(mode, bool(clean_text(text)))
+    return groq_chat(rewrite_messages(text, mode, movie_title, movie_overview), route)
 
 
-def ai_extract_pros_cons(text: str) -> dict:
+# ---------------------------------------------------------------------------
+# Async streaming path (ASGI). One pooled httpx client per event loop, and
+# identical prompts in flight on the same loop share one upstream stream.
+
+_async_clients = weakref.WeakKeyDictionary()
+_in_flight = weakref.WeakKeyDictionary()
+
+
+def _async_client() -> httpx.AsyncClient:
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        max_connections = getattr(settings, "GROQ_MAX_CONNECTIONS", 20)
+        client = _async_clients[loop] = httpx.AsyncClient(
+            timeout=httpx.Timeout(getattr(settings, "GROQ_TIMEOUT_SECONDS", 30), connect=5),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+    return client
+
+
+async def _stream_model(model_name: str, messages: list, max_tokens: int = 350, usage: dict = None):
+    """
+    Yield content deltas from one Groq streaming completion. Token usage,
+    sent with the last chunk, is stored in `usage`.
+    """
+    api_key = getattr(settings, "GROQ_API_KEY", "").strip()
+    if not api_key:
+        raise ValueError("GROQ_API_KEY missing")
+
+    payload = {
+        "model": model_name,
+        "messages": messages,
+        "temperature": 0.7,
+        "max_tokens": max_tokens,
+        "stream": True,
+    }
+    headers = {"Authorization": f"Bearer {api_key}"}
+
+    async with _async_client().stream("POST", GROQ_URL, headers=headers, json=payload) as res:
+        if res.status_code != 200:
+            body = (await res.aread()).decode(errors="replace")
+            raise RuntimeError(f"Groq error {res.status_code}: {body[:500]}")
+
+        # OpenAI-style SSE: "data: {json}" lines, then "data: [DONE]"
+        async for line in res.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                break
+            chunk = json.loads(data)
+            if usage is not None and (chunk.get("usage") or chunk.get("x_groq", {}).get("usage")):
+                usage.update(_usage(chunk))
+            choices = chunk.get("choices") or [{}]
+            delta = choices[0].get("delta", {}).get("content")
+            if delta:
+                yield delta
+
+
+async def _first_delta(model_name: str, messages: list, max_tokens: int, usage: dict):
+    """Start a stream; returns (stream, first delta, model) once the model answers."""
+    stream = _stream_model(model_name, messages, max_tokens, usage)
+    started = time.monotonic()
+    try:
+        first = await stream.__anext__()
+    except StopAsyncIteration:
+        first = ""
+    except Exception:
+        get_breaker(model_name).record(False, time.monotonic() - started)
+        raise
+
+    get_breaker(model_name).record(True, time.monotonic() - started)
+    return stream, first, model_name
+
+
+async def _stream_with_fallback(messages: list, route: Route = DEFAULT_ROUTE, meta: dict = None):
+    """
+    Same policy as groq_chat, racing on the first delta: the stream that
+    starts answering first is used and the other is cancelled. Once text
+    has been sent there is no switching models.
+    """
+    models = _available_models(route.model)
+    delay = get_breaker(models[0]).hedge_delay()
+
+    started = {}
+    usages = {}
+
+    def start(model_name):
+        usages[model_name] = {}
+        task = asyncio.ensure_future(_first_delta(model_name, messages, route.max_tokens, usages[model_name]))
+        started[task] = (model_name, time.monotonic())
+        return task
+
+    pending = {start(models[0])}
+    remaining = models[1:]
+    error = None
+    winner = None
+
+    try:
+        while pending and winner is None:
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=delay if remaining else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for task in done:
+                if task.exception() is None:
+                    winner = task.result()
+                    break
+                error = task.exception()
+
+            if winner is None and remaining and (not done or not pending):
+                pending.add(start(remaining.pop(0)))
+    finally:
+        for task in pending:
+            task.cancel()
+            if winner is not None:
+                # Beaten by the hedge: slow, as far as its breaker goes
+                model_name, t0 = started[task]
+                get_breaker(model_name).record(False, time.monotonic() - t0)
+        for task in started:
+            # Answered in the same tick as the winner
+            if task.done() and not task.cancelled() and task.exception() is None and task.result() is not winner:
+                await task.result()[0].aclose()
+
+    if winner is None:
+        raise error
+
+    stream, first, model_name = winner
+    if meta is not None:
+        meta["model"] = model_name
+
+    if first:
+        yield first
+    async for delta in stream:
+        yield delta
+
+    if meta is not None:
+        meta.update(usages[model_name])
+
+
+class _Flight:
+    """
+    One upstream stream, run as its own task and replayed to every
+    caller with the same prompt.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.done = False
+        self.error = None
+        # Answering model and token usage
+        self.meta = {}
+        self.subscribers = 0
+        self.task = None
+        self.changed = asyncio.Condition()
+
+    async def publish(self, delta=None, error=None, done=False):
+        async with self.changed:
+            if delta is not None:
+                self.chunks.append(delta)
+            self.error = error or self.error
+            self.done = done or self.done
+            self.changed.notify_all()
+
+    async def follow(self):
+        seen = 0
+        while True:
+            async with self.changed:
+                await self.changed.wait_for(lambda: len(self.chunks) > seen or self.done)
+                new, done, error = self.chunks[seen:], self.done, self.error
+
+            for delta in new:
+                yield delta
+            seen += len(new)
+
+            if done:
+                if error:
+                    raise error
+                return
+
+
+async def _pump(flight, flights, key, messages, route):
+    error = None
+    try:
+        async for delta in _stream_with_fallback(messages, route, flight.meta):
+            await flight.publish(delta)
+    except asyncio.CancelledError:
+        error = RuntimeError("AI request cancelled")
+        raise
+    except Exception as e:
+        error = e
+    finally:
+        if flights.get(key) is flight:
+            del flights[key]
+        await flight.publish(error=error, done=True)
+
+
+async def astream_chat(messages: list, route: Route = DEFAULT_ROUTE, meta: dict = None):
+    """
+    Stream a chat completion, yielding text deltas.
+
+    The upstream request runs in a task of its own, shared by every
+    caller with the same prompt: late callers replay what was received so
+    far and then follow along, so N identical prompts cost one Groq call.
+    A caller leaving doesn't affect the others; the request is cancelled
+    once nobody is left to read it.
+
+    `meta`, if given, gets the answering model, plus the token usage for
+    the caller that started the request (the others cost none).
+    """
+    key = hashlib.sha256(json.dumps([messages, route], sort_keys=True).encode()).hexdigest()
+    flights = _in_flight.setdefault(asyncio.get_running_loop(), {})
+
+    flight = flights.get(key)
+    started = flight is None
+    if started:
+        flight = flights[key] = _Flight()
+        flight.task = asyncio.ensure_future(_pump(flight, flights, key, messages, route))
+
+    flight.subscribers += 1
+    try:
+        async for delta in flight.follow():
+            yield delta
+    finally:
+        flight.subscribers -= 1
+        if flight.subscribers == 0 and not flight.task.done():
+            if flights.get(key) is flight:
+                del flights[key]
+            flight.task.cancel()
+
+        if meta is not None:
+            if started:
+                meta.update(flight.meta)
+            else:
+                meta["model"] = flight.meta.get("model")
+
+
+async def astream_rewrite_review(text: str, mode: str = "rewrite", movie_title: str = "",
+                                 movie_overview: str = "", meta: dict = None):
+    route = route_for(mode, bool(clean_text(text)))
+    messages = rewrite_messages(text, mode, movie_title, movie_overview)
+    async for delta in astream_chat(messages, route, meta):
+        yield delta
+
+
+
+def ai_extract_pros_cons(text: str, meta: dict = None) -> dict:
     text = clean_text(text)
     if not text:
         raise ValueError("Empty text")
@@ -136,15 +525,20 @@ def ai_extract_pros_cons(text: str) -> dict:
         {"role": "user", "content": prompt},
     ]
 
-    raw = groq_chat(messages)
+    meta = {} if meta is None else meta
+    raw = groq_chat(messages, ROUTES["pros_cons"], meta)
 
+    # A failure, not an empty result: callers log it as one and don't cache it
+    if meta.get("finish_reason") == "length":
+        raise ValueError("Pros/cons answer cut off at max_tokens")
     try:
         data = json.loads(raw)
-        pros = data.get("pros", [])
-        cons = data.get("cons", [])
-        return {
-            "pros": pros[:6] if isinstance(pros, list) else [],
-            "cons": cons[:6] if isinstance(cons, list) else [],
-        }
-    except Exception:
-        return {"pros": [], "cons": []}
+    except ValueError:
+        raise ValueError("Pros/cons answer is not JSON")
+
+    pros = data.get("pros", []) if isinstance(data, dict) else []
+    cons = data.get("cons", []) if isinstance(data, dict) else []
+    return {
+        "pros": pros[:6] if isinstance(pros, list) else [],
+        "cons": cons[:6] if isinstance(cons, list) else [],
+    }
@@ -0,0 +1,137 @@
+import logging
+import math
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class CircuitBreaker:
+    """
+    Rolling outcome stats for one upstream (a Groq model), per process.
+
+    Calls in the last GROQ_BREAKER_WINDOW_SECONDS are kept as (time, ok,
+    latency). Once at least GROQ_BREAKER_MIN_CALLS are in the window and
+    GROQ_BREAKER_ERROR_RATE of them failed, the breaker opens: allow()
+    is False for GROQ_BREAKER_COOLDOWN_SECONDS. After that calls go
+    through again and the next outcome closes it (fresh stats) or
+    reopens it.
+
+    Latency is the time until the model answered (the first streamed
+    delta for streams). A call slower than GROQ_HEDGE_MAX_SECONDS counts
+    as a failure: it would have been hedged anyway.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = deque()
+        self.open_until = None
+        self.lock = threading.Lock()
+
+    def _trim(self, now):
+        horizon = now - _setting("GROQ_BREAKER_WINDOW_SECONDS", 60)
+        while self.calls and self.calls[0][0] < horizon:
+            self.calls.popleft()
+
+    def allow(self):
+        return self.open_until is None or time.monotonic() >= self.open_until
+
+    def record(self, ok, latency):
+        slow = latency > _setting("GROQ_HEDGE_MAX_SECONDS", 5) > 0
+        ok = ok and not slow
+        now = time.monotonic()
+
+        with self.lock:
+            if self.open_until is not None and now >= self.open_until:
+                # First outcome after the cooldown decides
+                if ok:
+                    self.open_until = None
+                    self.calls.clear()
+                    logger.warning("Circuit closed", extra={"upstream": self.name})
+                else:
+                    self._open(now)
+                    return
+
+            self.calls.append((now, ok, latency))
+            self._trim(now)
+
+            if self.open_until is None and self._tripped():
+                self._open(now)
+
+    def _tripped(self):
+        if len(self.calls) < _setting("GROQ_BREAKER_MIN_CALLS", 5):
+            return False
+        errors = sum(1 for _, ok, _ in self.calls if not ok)
+        return errors / len(self.calls) >= _setting("GROQ_BREAKER_ERROR_RATE", 0.5)
+
+    def _open(self, now):
+        self.open_until = now + _setting("GROQ_BREAKER_COOLDOWN_SECONDS", 30)
+        logger.warning("Circuit opened", extra={"upstream": self.name, "calls": len(self.calls)})
+
+    def p95(self):
+        """p95 latency of successful calls in the window, or None."""
+        with self.lock:
+            self._trim(time.monotonic())
+            latencies = sorted(latency for _, ok, latency in self.calls if ok)
+        if len(latencies) < _setting("GROQ_BREAKER_MIN_CALLS", 5):
+            return None
+        return latencies[math.ceil(len(latencies) * 0.95) - 1]
+
+    def hedge_delay(self):
+        """
+        How long to wait for this upstream before also asking the next
+        one: its p95, within [0.5s, GROQ_HEDGE_MAX_SECONDS]. None when
+        hedging is off.
+        """
+        ceiling = _setting("GROQ_HEDGE_MAX_SECONDS", 5)
+        if ceiling <= 0:
+            return None
+        p95 = self.p95()
+        return ceiling if p95 is None else min(max(p95, 0.5), ceiling)
+
+    def snapshot(self):
+        with self.lock:
+            self._trim(time.monotonic())
+            calls = len(self.calls)
+            errors = sum(1 for _, ok, _ in self.calls if not ok)
+            open_for = None if self.open_until is None else max(0.0, self.open_until - time.monotonic())
+
+        if open_for is None:
+            state = "closed"
+        else:
+            state = "open" if open_for > 0 else "half_open"
+        return {
+            "state": state,
+            "calls": calls,
+            "errors": errors,
+            "error_rate": errors / calls if calls else None,
+            "p95_seconds": self.p95(),
+            "open_for_seconds": open_for,
+        }
+
+
+_breakers = {}
+_registry_lock = threading.Lock()
+
+
+def get_breaker(name):
+    with _registry_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name)
+        return breaker
+
+
+def breaker_states():
+    """Snapshot of every breaker in this process, by name."""
+    with _registry_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.snapshot() for breaker in breakers}
@@ -0,0 +1,139 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+
+# Every namespace passed to cached(); cache_stats reports on these
+NAMESPACES = [
+    "genres",
+    "movie_detail",
+    "person_detail",
+    "api_movie_detail",
+    "interactions",
+]
+
+
+def group(model, pk=None):
+    """
+    Invalidation group for a model ("movies.movie") or one of its rows
+    ("movies.movie:42"). Cached values list the groups they depend on.
+    """
+    label = model._meta.label_lower
+    return label if pk is None else f"{label}:{pk}"
+
+
+def _version_key(name):
+    return f"ver:{name}"
+
+
+def _stats_key(namespace, outcome):
+    return f"stats:{namespace}:{outcome}"
+
+
+def is_shared():
+    """
+    Whether every worker process sees the same cache. With locmem each
+    process has its own: invalidations and counters stay in it.
+    """
+    return not isinstance(caches["default"], LocMemCache)
+
+
+def _default_timeout():
+    return getattr(settings, "CACHE_DEFAULT_SECONDS", 300)
+
+
+def _versions(groups):
+    keys = [_version_key(g) for g in groups]
+    found = cache.get_many(keys)
+
+    missing = {k: time.time_ns() for k in keys if k not in found}
+    if missing:
+        # Seeded from the clock so an evicted counter never comes back
+        # at a version that old entries were stored under
+        for k, v in missing.items():
+            if not cache.add(k, v, None):
+                missing[k] = cache.get(k, v)
+        found.update(missing)
+
+    return [str(found[k]) for k in keys]
+
+
+def _bump(groups):
+    for g in groups:
+        try:
+            cache.incr(_version_key(g))
+        except ValueError:
+            cache.set(_version_key(g), time.time_ns(), None)
+
+
+def invalidate(*groups):
+    """
+    Drop every cached value that depends on any of `groups`, once the
+    current transaction commits (immediately outside one).
+    """
+    transaction.on_commit(lambda: _bump(groups))
+
+
+def _count(namespace, outcome):
+    key = _stats_key(namespace, outcome)
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def cached(namespace, key, compute, depends=(), timeout=None, shared_only=False):
+    """
+    Return compute() through the cache under `namespace` / `key`.
+
+    `depends` lists invalidation groups (see group()); the value is
+    recomputed after any of them is invalidated. Hits and misses are
+    counted per namespace for cache_stats().
+
+    With `shared_only`, values are only cached when is_shared(): for data
+    that must not outlive a write seen by another process.
+    """
+    if shared_only and not is_shared():
+        return compute()
+
+    versions = _versions(depends)
+    full_key = ":".join([namespace, str(key), *versions])
+
+    value = cache.get(full_key)
+    if value is not None:
+        _count(namespace, "hits")
+        return value
+
+    _count(namespace, "misses")
+    value = compute()
+    cache.set(full_key, value, _default_timeout() if timeout is None else timeout)
+    return value
+
+
+def cache_stats(namespaces=None):
+    """{namespace: {"hits", "misses", "hit_ratio"}} since the last reset."""
+    namespaces = namespaces or NAMESPACES
+
+    keys = [_stats_key(ns, o) for ns in namespaces for o in ("hits", "misses")]
+    counts = cache.get_many(keys)
+
+    stats = {}
+    for ns in namespaces:
+        hits = counts.get(_stats_key(ns, "hits"), 0)
+        misses = counts.get(_stats_key(ns, "misses"), 0)
+        total = hits + misses
+        stats[ns] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / total, 3) if total else None,
+        }
+    return stats
+
+
+def reset_cache_stats(namespaces=None):
+    namespaces = namespaces or NAMESPACES
+    cache.delete_many([_stats_key(ns, o) for ns in namespaces for o in ("hits", "misses")])
@@ -0,0 +1,154 @@
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+
+from movies.models import Movie, HomeSection
+
+
+SECTION_SIZE = 12
+
+# Held while a request rebuilds a stale snapshot; expires on its own if
+# that request dies
+REFRESH_LOCK_KEY = "home_sections:refresh"
+REFRESH_LOCK_SECONDS = 60
+
+SECTION_KEYS = [
+    "trending_movies",
+    "hyped_movies",
+    "latest_released_movies",
+    "coming_soon_movies",
+    "major_upcoming_movies",
+]
+
+
+def snapshot_max_age():
+    return timedelta(minutes=getattr(settings, "HOME_SECTIONS_MAX_AGE_MINUTES", 15))
+
+
+def section_querysets(today=None):
+    """Live (ranked) queries behind each home page section."""
+    today = today or date.today()
+    soon_limit = today + timedelta(days=60)
+    recent_limit = today - timedelta(days=120)
+
+    return {
+        # Trending section
+        "trending_movies": Movie.objects.filter(
+            is_released=True,
+            release_date__gte=recent_limit
+        ).order_by(
+            F("stats__total_votes").desc(nulls_last=True), "-release_date"
+        ),
+
+        # Most Hyped (Upcoming) movies
+        "hyped_movies": Movie.objects.filter(
+            is_released=False,
+            stats__hype_total__gt=0,
+        ).order_by(
+            "-stats__hype_excited",
+            "-stats__hype_total",
+            "release_date"
+        ),
+
+        # Latest released
+        "latest_released_movies": Movie.objects.filter(
+            is_released=True
+        ).order_by("-release_date"),
+
+        # Coming soon (next 60 days)
+        "coming_soon_movies": Movie.objects.filter(
+            is_released=False,
+            release_date__isnull=False,
+            release_date__lte=soon_limit
+        ).order_by("release_date"),
+
+        "major_upcoming_movies": Movie.objects.filter(
+            is_released=False,
+            release_date__isnull=False,
+            release_date__gt=soon_limit
+        ).order_by("release_date"),
+    }
+
+
+def refresh_home_sections():
+    """
+    Recompute every section and store the ordered ids.
+
+    Returns {key: [movie ids]}.
+    """
+    now = timezone.now()
+
+    sections = {
+        key: list(qs.values_list("id", flat=True)[:SECTION_SIZE])
+        for key, qs in section_querysets().items()
+    }
+
+    HomeSection.objects.bulk_create(
+        [
+            HomeSection(key=key, movie_ids=ids, refreshed_at=now)
+            for key, ids in sections.items()
+        ],
+        update_conflicts=True,
+        unique_fields=["key"],
+        update_fields=["movie_ids", "refreshed_at"],
+    )
+
+    return sections
+
+
+def load_section_ids():
+    """
+    Read the snapshot, normally kept fresh by `refresh_home_sections`
+    on a schedule.
+
+    When it is older than HOME_SECTIONS_MAX_AGE_MINUTES, one request
+    (holding REFRESH_LOCK_KEY) rebuilds it while the others keep serving
+    the stale copy. Only a missing section forces a live refresh.
+    """
+    cutoff = timezone.now() - snapshot_max_age()
+
+    snapshots = {
+        s.key: s
+        for s in HomeSection.objects.filter(key__in=SECTION_KEYS)
+    }
+
+    fresh = all(
+        key in snapshots and snapshots[key].refreshed_at >= cutoff
+        for key in SECTION_KEYS
+    )
+    if fresh:
+        return {key: snapshots[key].movie_ids for key in SECTION_KEYS}
+
+    if any(key not in snapshots for key in SECTION_KEYS):
+        return refresh_home_sections()
+
+    if not cache.add(REFRESH_LOCK_KEY, 1, REFRESH_LOCK_SECONDS):
+        # Someone else is on it
+        return {key: snapshots[key].movie_ids for key in SECTION_KEYS}
+
+    try:
+        return refresh_home_sections()
+    finally:
+        cache.delete(REFRESH_LOCK_KEY)
+
+
+def get_home_sections():
+    """
+    Section movie lists for the home page.
+
+    On a warm snapshot this is one snapshot read plus one movie fetch
+    (and its categories prefetch), no ranked aggregation.
+    """
+    section_ids = load_section_ids()
+
+    all_ids = {movie_id for ids in section_ids.values() for movie_id in ids}
+    movies = Movie.objects.filter(id__in=all_ids).select_related("stats").prefetch_related("categories")
+    by_id = {m.id: m for m in movies}
+
+    return {
+        key: [by_id[movie_id] for movie_id in ids if movie_id in by_id]
+        for key, ids in section_ids.items()
+    }
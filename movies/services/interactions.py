@@ -0,0 +1,79 @@
+from django.conf import settings
+
+from movies.models import MovieHypeVote, MovieVote, ReviewLike, Watchlist
+from .cache import cached, invalidate
+
+
+# Invalidation group (see movies.services.cache) for one user's state
+def _group(user_id):
+    return f"interactions:{user_id}"
+
+
+def _timeout():
+    return getattr(settings, "INTERACTION_CACHE_SECONDS", 60)
+
+
+def load_interactions(user_id):
+    """
+    Build a user's interaction state from the database:
+
+        watchlist      set of movie ids
+        votes          {movie_id: vote}
+        hype           {movie_id: vote}
+        liked_reviews  set of review ids
+    """
+    return {
+        "watchlist": set(
+            Watchlist.objects.filter(user_id=user_id).values_list("movie_id", flat=True)
+        ),
+        "votes": dict(
+            MovieVote.objects.filter(user_id=user_id).values_list("movie_id", "vote")
+        ),
+        "hype": dict(
+            MovieHypeVote.objects.filter(user_id=user_id).values_list("movie_id", "vote")
+        ),
+        "liked_reviews": set(
+            ReviewLike.objects.filter(user_id=user_id).values_list("review_id", flat=True)
+        ),
+    }
+
+
+def get_interactions(user):
+    """
+    The viewer's interactions from the cache, loaded from the database
+    on a miss.
+
+    Writes invalidate the cached copy once they commit (record_* below)
+    rather than patching it. The version check in cached() also keeps a
+    read that raced a write from storing what it loaded: it lands under
+    the old version and is never served.
+    """
+    return cached(
+        "interactions",
+        user.id,
+        lambda: load_interactions(user.id),
+        depends=[_group(user.id)],
+        timeout=_timeout(),
+    )
+
+
+def forget_interactions(user_id):
+    # After commit, so a rolled back write never touches the cache
+    invalidate(_group(user_id))
+
+
+def record_watchlist(user_id, movie_id, in_watchlist):
+    forget_interactions(user_id)
+
+
+def record_review_like(user_id, review_id, liked):
+    forget_interactions(user_id)
+
+
+def record_vote(user_id, movie_id, vote):
+    # vote=None removes it
+    forget_interactions(user_id)
+
+
+def record_hype(user_id, movie_id, vote):
+    forget_interactions(user_id)
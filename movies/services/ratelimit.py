@@ -0,0 +1,146 @@
+import functools
+import logging
+import math
+import time
+from datetime import timedelta
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.utils import timezone
+
+from movies.models import AIRequestLog
+
+
+logger = logging.getLogger(__name__)
+
+
+def ai_limit():
+    """(requests, window seconds) allowed per user and AI action."""
+    return (
+        getattr(settings, "AI_RATE_LIMIT", 100),
+        getattr(settings, "AI_RATE_WINDOW_SECONDS", 600),
+    )
+
+
+def _now():
+    # The limiter's own clock, so tests can move it without also moving
+    # the cache backend's expiry clock
+    return time.time()
+
+
+def _window_key(user_id, action, window, index):
+    return f"ratelimit:{action}:{user_id}:{window}:{index}"
+
+
+def _retry_after(prev, cur, limit, window, offset):
+    # Seconds until the estimate drops below the limit with no new hits
+    if cur < limit:
+        # The previous window's weight has to fall to (limit - cur) / prev
+        return window * (1 - (limit - cur) / prev) - offset
+    # Only once this window is the previous one and has partly slid out
+    return window - offset + window * (1 - limit / cur)
+
+
+def _incr(key, timeout):
+    if cache.add(key, 1, timeout):
+        return 1
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Expired between add() and incr()
+        cache.set(key, 1, timeout)
+        return 1
+
+
+def _hit_cache(user_id, action, limit, window, now):
+    # Sliding window counter: this window's count plus the previous
+    # window's, weighted by how much of it still overlaps the last
+    # `window` seconds. Two keys per user/action, whatever the traffic.
+    index, offset = divmod(now, window)
+    current = _window_key(user_id, action, window, int(index))
+    previous = _window_key(user_id, action, window, int(index) - 1)
+
+    # Count first and judge the value we got back: concurrent requests
+    # each see their own position, so they can't all slip under the limit
+    cur = _incr(current, window * 2)
+    prev = cache.get(previous, 0)
+
+    # Requests made before this one
+    estimate = prev * (1 - offset / window) + cur - 1
+    if estimate < limit:
+        return True, 0
+
+    # Rejected requests don't use up the budget
+    try:
+        cache.decr(current)
+    except ValueError:
+        pass
+    return False, max(1, math.ceil(_retry_after(prev, cur - 1, limit, window, offset)))
+
+
+def _hit_db(user_id, action, limit, window):
+    # Fallback when the cache is unavailable: count logged requests
+    # (indexed on user, action, created_at)
+    since = timezone.now() - timedelta(seconds=window)
+    count = AIRequestLog.objects.filter(user_id=user_id, action=action, created_at__gte=since).count()
+    return count < limit, (window if count >= limit else 0)
+
+
+def hit(user_id, action, limit=None, window=None):
+    """
+    Record one request by `user_id` for `action` if it is within the
+    limit. Returns (allowed, retry_after_seconds). O(1) in the cache;
+    falls back to the AIRequestLog count if the cache is down.
+    """
+    default_limit, default_window = ai_limit()
+    limit = limit or default_limit
+    window = window or default_window
+
+    try:
+        return _hit_cache(user_id, action, limit, window, _now())
+    except Exception:
+        logger.warning("Rate limit cache unavailable, counting AIRequestLog", exc_info=True)
+        return _hit_db(user_id, action, limit, window)
+
+
+def _too_many(retry_after):
+    response = JsonResponse({"ok": False, "error": "Too many requests. Try later."}, status=429)
+    response["Retry-After"] = str(retry_after)
+    return response
+
+
+def ai_rate_limit(action, methods=("POST",)):
+    """
+    Limit a view to AI_RATE_LIMIT requests per AI_RATE_WINDOW_SECONDS per
+    user. `action` is the bucket name, or a callable taking the request
+    (e.g. to limit each AI mode separately). Only `methods` are counted;
+    anonymous requests and other methods pass through for the view to
+    reject, so they don't spend the budget. Works on sync and async views.
+    """
+    def check(request):
+        if request.method not in methods:
+            return None
+        if not request.user.is_authenticated:
+            return None
+        name = action(request) if callable(action) else action
+        allowed, retry_after = hit(request.user.id, name)
+        return None if allowed else _too_many(retry_after)
+
+    def decorator(view):
+        if iscoroutinefunction(view):
+            acheck = sync_to_async(check)
+
+            @functools.wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                return await acheck(request) or await view(request, *args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            return check(request) or view(request, *args, **kwargs)
+        return wrapper
+
+    return decorator
+
@@ -0,0 +1,109 @@
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from movies.models import MovieReview, MovieStats, MovieVote, ReviewComment, ReviewLike
+from movies.pagination import keyset_order
+from .interactions import get_interactions
+
+
+# Pagination keys per sort (see movies.pagination)
+REVIEW_KEYS = {
+    "liked": [("like_count", True), ("created_at", True), ("id", True)],
+    "latest": [("created_at", True), ("id", True)],
+}
+
+
+def reviews_queryset(movie_id, sort="liked"):
+    """
+    Reviews of a movie with the author, in display order
+    (REVIEW_KEYS[sort]). Feed a page of it to assemble_reviews().
+    """
+    qs = (
+        MovieReview.objects
+        .filter(movie_id=movie_id)
+        .select_related("user")
+    )
+
+    return qs.order_by(*keyset_order(REVIEW_KEYS.get(sort, REVIEW_KEYS["liked"])))
+
+
+def _needs_show_more(text):
+    text = (text or "").strip()
+    return len(text.splitlines()) > 3 or len(text) > 150
+
+
+def assemble_reviews(reviews, movie_id, viewer=None):
+    """
+    Attach what a review card needs beyond the row itself to a page of
+    reviews: user_vote (the author's MovieVote or None), is_liked (by
+    `viewer`, from the interaction cache) and show_more. like_count /
+    comment_count are stored on MovieReview.
+
+    Runs one query (plus a cache read) whatever the page size.
+    Returns the reviews as a list.
+    """
+    reviews = list(reviews)
+    if not reviews:
+        return reviews
+
+    votes_map = {
+        v.user_id: v
+        for v in MovieVote.objects.filter(
+            movie_id=movie_id,
+            user_id__in={r.user_id for r in reviews},
+        )
+    }
+
+    liked_ids = set()
+    if viewer is not None and viewer.is_authenticated:
+        liked_ids = get_interactions(viewer)["liked_reviews"]
+
+    for review in reviews:
+        review.user_vote = votes_map.get(review.user_id)
+        review.is_liked = review.id in liked_ids
+        review.show_more = _needs_show_more(review.review_text)
+
+    return reviews
+
+
+def record_comment_change(review_id, delta):
+    MovieReview.objects.filter(id=review_id).update(comment_count=F("comment_count") + delta)
+    # The movie's review change marker (see movies.conditional)
+    MovieStats.objects.filter(movie__reviews=review_id).update(updated_at=timezone.now())
+
+
+def rebuild_review_counts(review_ids=None, batch_size=500):
+    """
+    Reconcile MovieReview.like_count / comment_count with the like and
+    comment tables. Only drifted rows are written; returns how many.
+    """
+    reviews = MovieReview.objects.all()
+    likes = ReviewLike.objects.all()
+    comments = ReviewComment.objects.all()
+
+    if review_ids is not None:
+        reviews = reviews.filter(id__in=review_ids)
+        likes = likes.filter(review_id__in=review_ids)
+        comments = comments.filter(review_id__in=review_ids)
+
+    like_counts = dict(likes.values("review_id").annotate(n=Count("id")).values_list("review_id", "n"))
+    comment_counts = dict(comments.values("review_id").annotate(n=Count("id")).values_list("review_id", "n"))
+
+    to_update = []
+    for review in reviews.only("id", "like_count", "comment_count"):
+        likes_n = like_counts.get(review.id, 0)
+        comments_n = comment_counts.get(review.id, 0)
+
+        if (review.like_count, review.comment_count) != (likes_n, comments_n):
+            review.like_count = likes_n
+            review.comment_count = comments_n
+            to_update.append(review)
+
+    with transaction.atomic():
+        MovieReview.objects.bulk_update(
+            to_update, ["like_count", "comment_count"], batch_size=batch_size
+        )
+        MovieStats.objects.filter(movie__reviews__in=to_update).update(updated_at=timezone.now())
+
+    return len(to_update)
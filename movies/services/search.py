@@ -0,0 +1,107 @@
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramSimilarity,
+)
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, Value, When
+
+from movies.models import Movie, Person
+
+
+# These expressions must stay identical to the GIN indexes created in
+# migration 0019_search_indexes, otherwise PostgreSQL won't use them.
+SEARCH_CONFIG = "simple"
+MOVIE_SEARCH_VECTOR = SearchVector("title", "overview", config=SEARCH_CONFIG)
+PERSON_SEARCH_VECTOR = SearchVector("name", config=SEARCH_CONFIG)
+
+MAX_QUERY_LENGTH = 100
+
+
+def normalize_query(query):
+    return " ".join((query or "").split())[:MAX_QUERY_LENGTH]
+
+
+def uses_full_text_search():
+    """Full-text + trigram search needs PostgreSQL; anything else uses icontains."""
+    return connection.vendor == "postgresql"
+
+
+def search_movies(query, qs=None):
+    """
+    Rank movies by title/overview match.
+
+    On PostgreSQL this is a tsvector match OR a trigram match on the
+    title (typo tolerance), both served by GIN indexes. Results are
+    annotated with `search_score` and ordered best first.
+    """
+    query = normalize_query(query)
+    if qs is None:
+        qs = Movie.objects.all()
+
+    if not query:
+        return qs.none()
+
+    if uses_full_text_search():
+        search_query = SearchQuery(query, search_type="websearch", config=SEARCH_CONFIG)
+
+        return (
+            qs.alias(search=MOVIE_SEARCH_VECTOR)
+            .filter(Q(search=search_query) | Q(title__trigram_similar=query))
+            .annotate(
+                search_score=SearchRank(MOVIE_SEARCH_VECTOR, search_query)
+                + TrigramSimilarity("title", query)
+            )
+            .order_by("-search_score", "-release_date")
+        )
+
+    return (
+        qs.filter(Q(title__icontains=query) | Q(overview__icontains=query))
+        .annotate(
+            search_score=Case(
+                When(title__iexact=query, then=Value(3)),
+                When(title__istartswith=query, then=Value(2)),
+                When(title__icontains=query, then=Value(1)),
+                default=Value(0),
+                output_field=IntegerField(),
+            )
+        )
+        .order_by("-search_score", "-release_date")
+    )
+
+
+def search_people(query, qs=None):
+    """Rank people by name, same strategy as search_movies."""
+    query = normalize_query(query)
+    if qs is None:
+        qs = Person.objects.all()
+
+    if not query:
+        return qs.none()
+
+    if uses_full_text_search():
+        search_query = SearchQuery(query, search_type="websearch", config=SEARCH_CONFIG)
+
+        return (
+            qs.alias(search=PERSON_SEARCH_VECTOR)
+            .filter(Q(search=search_query) | Q(name__trigram_similar=query))
+            .annotate(
+                search_score=SearchRank(PERSON_SEARCH_VECTOR, search_query)
+                + TrigramSimilarity("name", query)
+            )
+            .order_by("-search_score", "name")
+        )
+
+    return (
+        qs.filter(name__icontains=query)
+        .annotate(
+            search_score=Case(
+                When(name__iexact=query, then=Value(3)),
+                When(name__istartswith=query, then=Value(2)),
+                default=Value(1),
+                output_field=IntegerField(),
+            )
+        )
+        .order_by("-search_score", "name")
+    )
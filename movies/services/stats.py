@@ -0,0 +1,244 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from movies.models import Movie, MovieStats, MovieVote, MovieHypeVote, MovieReview
+from .cache import group, invalidate
+
+
+VOTE_FIELDS = {
+    "masterpiece": "masterpiece_votes",
+    "good": "good_votes",
+    "average": "average_votes",
+    "bad": "bad_votes",
+}
+
+COUNTER_FIELDS = [
+    "masterpiece_votes",
+    "good_votes",
+    "average_votes",
+    "bad_votes",
+    "total_votes",
+    "hype_excited",
+    "hype_total",
+    "review_count",
+    "rating_total",
+]
+
+
+def get_movie_stats(movie):
+    """
+    Return the stats row for a movie, or an empty (unsaved) one.
+
+    Use select_related("stats") on the movie queryset to make this free.
+    """
+    try:
+        return movie.stats
+    except MovieStats.DoesNotExist:
+        return MovieStats(movie=movie)
+
+
+def _apply_deltas(movie_id, deltas):
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    updates = {field: F(field) + delta for field, delta in deltas.items()}
+    updated = MovieStats.objects.filter(movie_id=movie_id).update(
+        updated_at=timezone.now(),
+        **updates,
+    )
+    if updated:
+        return
+
+    # First write for this movie: create the row with the deltas as the
+    # initial values. A concurrent writer may beat us to it, in which case
+    # the row exists now and the plain update applies.
+    try:
+        with transaction.atomic():
+            MovieStats.objects.create(movie_id=movie_id, **deltas)
+    except IntegrityError:
+        MovieStats.objects.filter(movie_id=movie_id).update(
+            updated_at=timezone.now(),
+            **updates,
+        )
+
+
+def touch_movie_stats(movie_id, create=True):
+    """
+    Bump the stats row's updated_at without changing a counter: it is
+    also the change marker for the movie's reviews (see
+    movies.conditional). create=False leaves a missing row missing.
+    """
+    if MovieStats.objects.filter(movie_id=movie_id).update(updated_at=timezone.now()):
+        return
+    if create:
+        MovieStats.objects.get_or_create(movie_id=movie_id)
+
+
+def save_vote(model, user, movie_id, vote):
+    """
+    Store `user`'s MovieVote or MovieHypeVote on a movie (vote=None
+    deletes it) and return the previous vote, for record_*_change.
+
+    The previous vote is read from a locked row or known from a create,
+    never from a plain read: two concurrent first votes can't both count
+    as new. Call inside a transaction.
+    """
+    votes = model.objects.filter(user=user, movie_id=movie_id)
+
+    if vote is None:
+        existing = votes.select_for_update().first()
+        if existing is None:
+            return None
+        existing.delete()
+        return existing.vote
+
+    while True:
+        # A concurrent create makes get_or_create fall back to the
+        # committed row, which is then locked below
+        _, created = model.objects.get_or_create(user=user, movie_id=movie_id, defaults={"vote": vote})
+        if created:
+            return None
+
+        existing = votes.select_for_update().first()
+        if existing is None:
+            # Deleted in between; try again
+            continue
+        old_vote = existing.vote
+        if old_vote != vote:
+            existing.vote = vote
+            existing.save(update_fields=["vote"])
+        return old_vote
+
+
+def record_vote_change(movie_id, old_vote, new_vote):
+    if old_vote == new_vote:
+        return
+
+    deltas = {}
+    if old_vote in VOTE_FIELDS:
+        deltas[VOTE_FIELDS[old_vote]] = -1
+        deltas["total_votes"] = -1
+    if new_vote in VOTE_FIELDS:
+        deltas[VOTE_FIELDS[new_vote]] = deltas.get(VOTE_FIELDS[new_vote], 0) + 1
+        deltas["total_votes"] = deltas.get("total_votes", 0) + 1
+
+    _apply_deltas(movie_id, deltas)
+
+
+def record_hype_change(movie_id, old_vote, new_vote):
+    if old_vote == new_vote:
+        return
+
+    deltas = {"hype_excited": 0, "hype_total": 0}
+    if old_vote:
+        deltas["hype_total"] -= 1
+        if old_vote == "excited":
+            deltas["hype_excited"] -= 1
+    if new_vote:
+        deltas["hype_total"] += 1
+        if new_vote == "excited":
+            deltas["hype_excited"] += 1
+
+    _apply_deltas(movie_id, deltas)
+
+
+def record_review_change(movie_id, old_rating, new_rating):
+    """
+    old_rating is None for a new review, new_rating is None for a delete.
+    """
+    deltas = {"review_count": 0, "rating_total": 0}
+    if old_rating is not None:
+        deltas["review_count"] -= 1
+        deltas["rating_total"] -= old_rating
+    if new_rating is not None:
+        deltas["review_count"] += 1
+        deltas["rating_total"] += new_rating
+
+    _apply_deltas(movie_id, deltas)
+
+
+def compute_movie_stats(movie_ids=None):
+    """
+    Recompute aggregates from the source tables.
+
+    Returns {movie_id: {counter_field: value}} for every movie in scope.
+    """
+    movies = Movie.objects.all()
+    votes = MovieVote.objects.all()
+    hype = MovieHypeVote.objects.all()
+    reviews = MovieReview.objects.all()
+
+    if movie_ids is not None:
+        movies = movies.filter(id__in=movie_ids)
+        votes = votes.filter(movie_id__in=movie_ids)
+        hype = hype.filter(movie_id__in=movie_ids)
+        reviews = reviews.filter(movie_id__in=movie_ids)
+
+    result = {
+        movie_id: dict.fromkeys(COUNTER_FIELDS, 0)
+        for movie_id in movies.values_list("id", flat=True)
+    }
+
+    for row in votes.values("movie_id", "vote").annotate(count=Count("id")):
+        field = VOTE_FIELDS.get(row["vote"])
+        if field and row["movie_id"] in result:
+            result[row["movie_id"]][field] = row["count"]
+            result[row["movie_id"]]["total_votes"] += row["count"]
+
+    for row in hype.values("movie_id", "vote").annotate(count=Count("id")):
+        if row["movie_id"] not in result:
+            continue
+        result[row["movie_id"]]["hype_total"] += row["count"]
+        if row["vote"] == "excited":
+            result[row["movie_id"]]["hype_excited"] = row["count"]
+
+    for row in reviews.values("movie_id").annotate(count=Count("id"), total=Sum("rating")):
+        if row["movie_id"] in result:
+            result[row["movie_id"]]["review_count"] = row["count"]
+            result[row["movie_id"]]["rating_total"] = row["total"] or 0
+
+    return result
+
+
+def rebuild_movie_stats(movie_ids=None, batch_size=500):
+    """
+    Reconcile MovieStats with the source tables.
+
+    Only rows that drifted are written. Returns the number of rows fixed.
+    """
+    expected = compute_movie_stats(movie_ids)
+
+    existing = {
+        s.movie_id: s
+        for s in MovieStats.objects.filter(movie_id__in=list(expected))
+    }
+
+    to_create = []
+    to_update = []
+    now = timezone.now()
+
+    for movie_id, values in expected.items():
+        stats = existing.get(movie_id)
+
+        if stats is None:
+            to_create.append(MovieStats(movie_id=movie_id, **values))
+            continue
+
+        if any(getattr(stats, f) != v for f, v in values.items()):
+            for f, v in values.items():
+                setattr(stats, f, v)
+            stats.updated_at = now
+            to_update.append(stats)
+
+    with transaction.atomic():
+        MovieStats.objects.bulk_create(to_create, batch_size=batch_size, ignore_conflicts=True)
+        MovieStats.objects.bulk_update(
+            to_update,
+            COUNTER_FIELDS + ["updated_at"],
+            batch_size=batch_size,
+        )
+        invalidate(*[group(Movie, s.movie_id) for s in to_create + to_update])
+
+    return len(to_create) + len(to_update)
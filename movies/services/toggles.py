@@ -0,0 +1,170 @@
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from movies.models import MovieReview, MovieStats, ReviewLike, Watchlist
+from .interactions import record_review_like, record_watchlist
+
+
+def _row_values(model, values):
+    # Raw SQL skips pre_save(), so fill auto_now / auto_now_add here
+    values = dict(values)
+    for field in model._meta.concrete_fields:
+        if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False):
+            values.setdefault(field.name, timezone.now())
+
+    fields = [model._meta.get_field(name) for name in values]
+    params = [f.get_db_prep_save(v, connection) for f, v in zip(fields, values.values())]
+    return fields, params
+
+
+def _insert_ignore(model, **values):
+    """
+    INSERT .. ON CONFLICT DO NOTHING for one row.
+
+    Returns True if the row was inserted, False if it already existed.
+    Unlike create(), a concurrent duplicate never raises IntegrityError.
+    """
+    qn = connection.ops.quote_name
+    fields, params = _row_values(model, values)
+
+    sql = "INSERT INTO {} ({}) VALUES ({}) ON CONFLICT DO NOTHING RETURNING 1".format(
+        qn(model._meta.db_table),
+        ", ".join(qn(f.column) for f in fields),
+        ", ".join(["%s"] * len(fields)),
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchone() is not None
+
+
+def _toggle(model, values, counter=None, touch=None):
+    """
+    Delete the row matching `values`, or insert it if there was none, as
+    one statement (data-modifying CTEs) on PostgreSQL. A concurrent
+    duplicate insert is ignored, never an IntegrityError.
+
+    counter=(model, column, pk) also moves that counter column by the
+    change, in the same statement. touch=(model, fk) then also bumps
+    `updated_at` on the row the counter row's `fk` column points to.
+
+    Returns (present, counter value). The counter value is None without a
+    counter, or if its row is gone.
+    """
+    if connection.vendor != "postgresql":
+        return _toggle_statements(model, values, counter, touch)
+
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
+    fields, params = _row_values(model, values)
+    match = [(f, p) for f, p in zip(fields, params) if f.name in values]
+
+    sql = (
+        "WITH deleted AS ("
+        "DELETE FROM {table} WHERE {where} RETURNING 1"
+        "), inserted AS ("
+        "INSERT INTO {table} ({columns}) SELECT {placeholders} "
+        "WHERE NOT EXISTS (SELECT 1 FROM deleted) "
+        "ON CONFLICT DO NOTHING RETURNING 1"
+        ")"
+    ).format(
+        table=table,
+        where=" AND ".join(f"{qn(f.column)} = %s" for f, _ in match),
+        columns=", ".join(qn(f.column) for f in fields),
+        placeholders=", ".join(["%s"] * len(fields)),
+    )
+    sql_params = [p for _, p in match] + params
+
+    if counter is None:
+        sql += " SELECT NOT EXISTS (SELECT 1 FROM deleted), NULL"
+    else:
+        counter_model, column, pk = counter
+        returning = [qn(column)]
+        if touch is not None:
+            touch_model, fk = touch
+            returning.append(qn(counter_model._meta.get_field(fk).column))
+
+        sql += (
+            ", counted AS ("
+            "UPDATE {table} SET {column} = {column} "
+            "+ (SELECT COUNT(*) FROM inserted) - (SELECT COUNT(*) FROM deleted) "
+            "WHERE id = %s RETURNING {returning}"
+            ")"
+        ).format(table=qn(counter_model._meta.db_table), column=qn(column), returning=", ".join(returning))
+        sql_params.append(pk)
+
+        if touch is not None:
+            # Runs even though the final SELECT doesn't read it
+            sql += (
+                ", touched AS ("
+                "UPDATE {table} SET updated_at = %s WHERE {pk} IN (SELECT {fk} FROM counted)"
+                ")"
+            ).format(
+                table=qn(touch_model._meta.db_table),
+                pk=qn(touch_model._meta.pk.column),
+                fk=returning[1],
+            )
+            sql_params.append(timezone.now())
+
+        sql += " SELECT NOT EXISTS (SELECT 1 FROM deleted), (SELECT {column} FROM counted)".format(
+            column=qn(column)
+        )
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, sql_params)
+        present, value = cursor.fetchone()
+    return present, value
+
+
+def _toggle_statements(model, values, counter=None, touch=None):
+    # Same as _toggle without data-modifying CTEs (e.g. SQLite), one
+    # statement at a time; callers run it inside a transaction. The
+    # DELETE locks the row, so concurrent toggles queue up behind it.
+    deleted = model.objects.filter(**values).delete()[0] > 0
+    inserted = not deleted and _insert_ignore(model, **values)
+
+    if counter is None:
+        return not deleted, None
+
+    counter_model, column, pk = counter
+    rows = counter_model.objects.filter(pk=pk)
+    if inserted or deleted:
+        rows.update(**{column: F(column) + (1 if inserted else -1)})
+    if touch is not None:
+        touch_model, fk = touch
+        touch_model.objects.filter(pk__in=rows.values(fk)).update(updated_at=timezone.now())
+    return not deleted, rows.values_list(column, flat=True).first()
+
+
+def toggle_review_like(user_id, review_id):
+    """
+    Like or unlike a review, together with its like_count, in a single
+    statement on PostgreSQL.
+
+    Returns (liked, like_count). Double-clicks settle on a single like.
+    """
+    with transaction.atomic():
+        liked, like_count = _toggle(
+            ReviewLike,
+            {"user": user_id, "review": review_id},
+            counter=(MovieReview, "like_count", review_id),
+            # The movie's review change marker (see movies.conditional)
+            touch=(MovieStats, "movie"),
+        )
+        record_review_like(user_id, review_id, liked)
+
+    return liked, like_count
+
+
+def toggle_watchlist(user_id, movie_id):
+    """
+    Add or remove a movie from the user's watchlist the same way.
+
+    Returns True if the movie is now in the watchlist.
+    """
+    with transaction.atomic():
+        in_watchlist, _ = _toggle(Watchlist, {"user": user_id, "movie": movie_id})
+        record_watchlist(user_id, movie_id, in_watchlist)
+
+    return in_watchlist
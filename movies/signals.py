@@ -0,0 +1,26 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Movie, MovieHypeVote, MovieReview, MovieVote
+from .services.cache import group, invalidate
+from .services.stats import touch_movie_stats
+
+
+@receiver([post_save, post_delete], sender=Movie)
+def invalidate_movie(sender, instance, **kwargs):
+    invalidate(group(Movie), group(Movie, instance.pk))
+
+
+@receiver([post_save, post_delete], sender=MovieReview)
+@receiver([post_save, post_delete], sender=MovieVote)
+@receiver([post_save, post_delete], sender=MovieHypeVote)
+def invalidate_movie_opinions(sender, instance, **kwargs):
+    # Votes, hype and reviews feed the movie's stats and review list
+    invalidate(group(sender), group(Movie, instance.movie_id))
+
+
+@receiver([post_save, post_delete], sender=MovieReview)
+def touch_review_marker(sender, instance, signal, **kwargs):
+    # Review edits that keep the rating don't move a stats counter.
+    # Deletes don't create a row: the movie may be on its way out too.
+    touch_movie_stats(instance.movie_id, create=signal is post_save)
@@ -75,6 +75,77 @@ function openModal(title, html, isError = false) {
     return { res, data };
   }
 
+  // Put back the text from before a failed or cut-off generation
+  function resetGenerate(msg) {
+    textarea.value = lastTextBeforeAI;
+    if (undoBtn) undoBtn.disabled = true;
+    showStatus(msg, true);
+  }
+
+  // Text arrives as server-sent events: "data" deltas, then "done" or
+  // "error". Validation errors still come back as plain JSON.
+  async function streamGenerate(url, payload) {
+    const formData = new FormData();
+    Object.keys(payload).forEach((k) => formData.append(k, payload[k]));
+
+    const res = await fetch(url, {
+      method: "POST",
+      headers: {
+        "X-CSRFToken": csrf,
+        "X-Requested-With": "XMLHttpRequest",
+        Accept: "text/event-stream",
+      },
+      body: formData,
+    });
+
+    if (!(res.headers.get("Content-Type") || "").startsWith("text/event-stream")) {
+      const data = await res.json();
+      showStatus(data.error || "AI failed", true);
+      return;
+    }
+
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+    let streamed = "";
+
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+
+      buffer += decoder.decode(value, { stream: true });
+      const events = buffer.split("\n\n");
+      buffer = events.pop();
+
+      for (const raw of events) {
+        let event = "message";
+        let data = "";
+        raw.split("\n").forEach((line) => {
+          if (line.startsWith("event: ")) event = line.slice(7);
+          if (line.startsWith("data: ")) data += line.slice(6);
+        });
+        if (!data) continue;
+
+        const msg = JSON.parse(data);
+        if (event === "error") {
+          resetGenerate(msg.error || "AI failed");
+          return;
+        }
+        if (event === "done") {
+          textarea.value = msg.result;
+          showStatus("Done");
+          return;
+        }
+
+        streamed += msg.delta;
+        textarea.value = streamed;
+      }
+    }
+
+    // Connection closed before "done"
+    resetGenerate("Connection lost, please try again");
+  }
+
   function renderProsConsHTML(pros, cons) {
     const safePros = Array.isArray(pros) ? pros : [];
     const safeCons = Array.isArray(cons) ? cons : [];
@@ -116,18 +187,10 @@ function openModal(title, html, isError = false) {
       showStatus("Generating...");
 
       try {
-        const { data } = await post(url, { text: text, mode: mode });
-
-        if (!data.ok) {
-          showStatus(data.error || "AI failed", true);
-          return;
-        }
-
-        textarea.value = data.result;
-        showStatus("Done");
+        await streamGenerate(url, { text: text, mode: mode });
       } catch (err) {
         console.log(err);
-        showStatus("Something went wrong", true);
+        resetGenerate("Something went wrong");
       }
     });
   }
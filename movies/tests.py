@@ -1,3 +1,1710 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import html
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock, skipIf, skipUnless
+from urllib.parse import parse_qsl, urlsplit
 
-# Create your tests here.
+import requests
+
+from asgiref.sync import async_to_sync
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.views import APIView
+
+from users.models import User
+from .api.throttles import AIRateThrottle
+from .models import (
+    AIRequestLog,
+    AIResult,
+    Cast,
+    Crew,
+    Genre,
+    HomeSection,
+    Movie,
+    MovieHypeVote,
+    MovieReview,
+    MovieStats,
+    MovieVote,
+    Person,
+    ReviewComment,
+    ReviewLike,
+    SyncJob,
+    SyncState,
+    Watchlist,
+)
+from .pagination import HOME_MOVIE_KEYS, MOVIE_KEYS, keyset_filter, keyset_order, paginate_keyset
+from .services import ai_log
+from .services.ai_service import (
+    GROQ_MODEL_FALLBACK,
+    GROQ_MODEL_PRIMARY,
+    ROUTES,
+    _stream_with_fallback,
+    ai_extract_pros_cons,
+    astream_chat,
+    astream_rewrite_review,
+    groq_chat,
+    rewrite_messages,
+)
+from .services.ai_cache import HIT_SAMPLE, get_result, result_key, store_result
+from .services.breaker import breaker_states, get_breaker
+from .services.cache import cache_stats, cached, group, is_shared
+from .services.home_sections import REFRESH_LOCK_KEY, load_section_ids, refresh_home_sections
+from .services.interactions import get_interactions, load_interactions
+from .services.ratelimit import _window_key, hit
+from .services.reviews import rebuild_review_counts
+from .services.search import search_movies, search_people
+from .services.stats import rebuild_movie_stats, record_vote_change
+from .services.toggles import _insert_ignore, toggle_review_like, toggle_watchlist
+from .tmdb import client as tmdb_client
+from .tmdb.cache import ResponseCache
+from .tmdb.changes import sync_changed_movies
+from .tmdb.jobs import checkpoint, run_job, start_job
+from .tmdb.client import fetch_genres, size_pool
+from .tmdb.ratelimit import TokenBucket
+from .tmdb.sync import save_movies_to_db, sync_all_movies
+from .tmdb.people import enrich_people, ensure_people, needs_enrichment
+from .tmdb.sync_cast import save_movie_credits, sync_cast_and_crew
+
+
+class ReviewPageQueryCountTests(TestCase):
+    """
+    Review pages must run the same number of queries whatever the
+    number of reviews shown (no per-review lookups).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.movie = Movie.objects.create(tmdb_id=1, title="Movie", is_released=True)
+        cls.viewer = User.objects.create_user(
+            email="viewer@example.com",
+            password="pass",
+            first_name="View",
+            last_name="Er",
+        )
+
+    def add_reviews(self, count):
+        start = MovieReview.objects.count()
+
+        for i in range(start, start + count):
+            author = User.objects.create_user(
+                email=f"author{i}@example.com",
+                password="pass",
+                first_name="Author",
+                last_name=str(i),
+            )
+            review = MovieReview.objects.create(
+                user=author,
+                movie=self.movie,
+                rating=4,
+                review_text="Good",
+                like_count=1,
+                comment_count=1,
+            )
+            MovieVote.objects.create(user=author, movie=self.movie, vote="good")
+            ReviewLike.objects.create(user=self.viewer, review=review)
+            ReviewComment.objects.create(user=self.viewer, review=review, text="Nice")
+
+    def setUp(self):
+        cache.clear()
+
+    def assert_constant_queries(self, url, num):
+        self.client.force_login(self.viewer)
+
+        for count in (2, 10):
+            self.add_reviews(count)
+
+            # Likes were added behind the toggle views' back: reload and
+            # warm the viewer's interaction cache
+            cache.clear()
+            self.client.get(url)
+
+            with self.assertNumQueries(num):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+
+        return response
+
+    def test_all_reviews_page(self):
+        response = self.assert_constant_queries(
+            reverse("all-reviews", args=[self.movie.id]), 5
+        )
+
+        review = response.context["reviews"][0]
+        self.assertEqual(review.user_vote.vote, "good")
+        self.assertEqual(review.like_count, 1)
+        self.assertEqual(review.comment_count, 1)
+        self.assertTrue(review.is_liked)
+
+    def test_reviews_api(self):
+        # Includes the ETag markers query (movies.conditional)
+        response = self.assert_constant_queries(
+            f"/api/movies/{self.movie.id}/reviews/", 5
+        )
+
+        review = response.json()["results"][0]
+        self.assertEqual(review["user_vote"], "good")
+        self.assertEqual(review["like_count"], 1)
+        self.assertEqual(review["comment_count"], 1)
+
+    def test_reviews_api_cursor_walk(self):
+        self.add_reviews(25)
+        self.client.force_login(self.viewer)
+
+        seen = []
+        url = f"/api/movies/{self.movie.id}/reviews/?sort=liked"
+        while url:
+            data = self.client.get(url).json()
+            seen += [r["id"] for r in data["results"]]
+            url = data["next"]
+
+        self.assertEqual(len(seen), 25)
+        self.assertEqual(len(set(seen)), 25)
+
+
+class MovieStatsTests(TestCase):
+    """Incremental MovieStats deltas and rebuild_movie_stats."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.movie = Movie.objects.create(tmdb_id=1, title="Movie", is_released=True)
+        cls.upcoming = Movie.objects.create(tmdb_id=2, title="Upcoming", is_released=False)
+        cls.user = User.objects.create_user(
+            email="user@example.com", password="pass", first_name="A", last_name="B"
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def stats(self, movie, *fields):
+        return tuple(MovieStats.objects.filter(movie=movie).values_list(*fields).get())
+
+    def vote(self, vote):
+        self.client.post(reverse("vote-movie", args=[self.movie.id]), {"vote": vote})
+        return self.stats(self.movie, "good_votes", "bad_votes", "total_votes")
+
+    def test_vote_deltas(self):
+        self.assertEqual(self.vote("good"), (1, 0, 1))
+        self.assertEqual(self.vote("good"), (1, 0, 1))
+        self.assertEqual(self.vote("bad"), (0, 1, 1))
+        self.assertEqual(self.vote("remove"), (0, 0, 0))
+        self.assertEqual(self.vote("remove"), (0, 0, 0))
+
+        url = f"/api/movies/{self.movie.id}/vote/"
+        self.assertEqual(self.client.post(url, {"vote": "good"}).json(), {"vote": "good"})
+        self.assertEqual(self.client.post(url, {"vote": "good"}).json(), {"vote": "good"})
+        self.assertEqual(self.stats(self.movie, "good_votes", "total_votes"), (1, 1))
+        self.assertEqual(self.client.post(url, {"vote": "remove"}).json(), {"vote": None})
+        self.assertEqual(self.stats(self.movie, "good_votes", "total_votes"), (0, 0))
+
+    def test_vote_stored_concurrently_is_a_change(self):
+        # Another request's first vote committed before this one's write
+        MovieVote.objects.create(user=self.user, movie=self.movie, vote="good")
+        record_vote_change(self.movie.id, None, "good")
+
+        self.assertEqual(self.vote("bad"), (0, 1, 1))
+        self.assertEqual(MovieVote.objects.get().vote, "bad")
+
+    def test_hype_deltas(self):
+        url = reverse("hype-vote-movie", args=[self.upcoming.id])
+        expected = [("excited", (1, 1)), ("not_excited", (0, 1)), ("not_excited", (0, 1)), ("remove", (0, 0))]
+
+        for vote, counts in expected:
+            self.client.post(url, {"vote": vote})
+            self.assertEqual(self.stats(self.upcoming, "hype_excited", "hype_total"), counts)
+
+    def test_review_deltas(self):
+        url = reverse("submit-review", args=[self.movie.id])
+
+        self.client.post(url, {"rating": 4, "review_text": "Good"})
+        self.assertEqual(self.stats(self.movie, "review_count", "rating_total"), (1, 4))
+        self.client.post(url, {"rating": 2, "review_text": "Meh on rewatch"})
+        self.assertEqual(self.stats(self.movie, "review_count", "rating_total"), (1, 2))
+        self.assertEqual(MovieReview.objects.get().review_text, "Meh on rewatch")
+
+        self.client.post(reverse("delete-review", args=[self.movie.id]))
+        self.assertEqual(self.stats(self.movie, "review_count", "rating_total"), (0, 0))
+
+    def test_rebuild_fixes_drift(self):
+        # Written behind the counters' back
+        MovieVote.objects.create(user=self.user, movie=self.movie, vote="masterpiece")
+        MovieHypeVote.objects.create(user=self.user, movie=self.upcoming, vote="excited")
+        MovieReview.objects.create(user=self.user, movie=self.movie, rating=5, review_text="Wow")
+
+        self.assertEqual(rebuild_movie_stats(), 2)
+        self.assertEqual(
+            self.stats(self.movie, "masterpiece_votes", "total_votes", "review_count", "rating_total"),
+            (1, 1, 1, 5),
+        )
+        self.assertEqual(self.stats(self.upcoming, "hype_excited", "hype_total"), (1, 1))
+
+        MovieStats.objects.filter(movie=self.movie).update(total_votes=7)
+        self.assertEqual(rebuild_movie_stats(movie_ids=[self.movie.id]), 1)
+        self.assertEqual(self.stats(self.movie, "total_votes"), (1,))
+        self.assertEqual(rebuild_movie_stats(), 0)
+
+
+class ReviewCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.movie = Movie.objects.create(tmdb_id=1, title="Movie", is_released=True)
+        cls.user = User.objects.create_user(
+            email="user@example.com", password="pass", first_name="A", last_name="B"
+        )
+        cls.review = MovieReview.objects.create(
+            user=cls.user, movie=cls.movie, rating=4, review_text="Good"
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def counts(self):
+        self.review.refresh_from_db()
+        return self.review.like_count, self.review.comment_count
+
+    def test_like_toggle_updates_like_count(self):
+        url = reverse("toggle-review-like", args=[self.review.id])
+
+        self.assertEqual(self.client.post(url).json()["like_count"], 1)
+        self.assertEqual(self.counts(), (1, 0))
+
+        self.assertEqual(self.client.post(url).json()["like_count"], 0)
+        self.assertEqual(self.counts(), (0, 0))
+
+    @skipUnless(connection.vendor == "postgresql", "data-modifying CTEs need PostgreSQL")
+    def test_like_toggle_is_single_statement(self):
+        # One statement (plus the savepoint pair, as tests run inside a
+        # transaction) whichever way it toggles
+        with self.assertNumQueries(3):
+            self.assertEqual(toggle_review_like(self.user.id, self.review.id), (True, 1))
+        with self.assertNumQueries(3):
+            self.assertEqual(toggle_review_like(self.user.id, self.review.id), (False, 0))
+
+    def test_like_toggle_is_conflict_safe(self):
+        self.assertEqual(toggle_review_like(self.user.id, self.review.id), (True, 1))
+        self.assertEqual(toggle_review_like(self.user.id, self.review.id), (False, 0))
+
+        # A like inserted by a concurrent click is not counted twice
+        self.assertTrue(_insert_ignore(ReviewLike, user=self.user.id, review=self.review.id))
+        self.assertFalse(_insert_ignore(ReviewLike, user=self.user.id, review=self.review.id))
+        self.assertEqual(ReviewLike.objects.count(), 1)
+
+    def test_watchlist_toggle(self):
+        self.assertTrue(toggle_watchlist(self.user.id, self.movie.id))
+        self.assertFalse(toggle_watchlist(self.user.id, self.movie.id))
+        self.assertFalse(Watchlist.objects.exists())
+
+    def test_comments_update_comment_count(self):
+        self.client.post(reverse("add-comment-page", args=[self.review.id]), {"text": "Hi"})
+        parent = ReviewComment.objects.get()
+
+        self.client.post(reverse("reply-comment-page", args=[parent.id]), {"text": "Yo"})
+        self.client.post(reverse("reply-comment-page", args=[parent.id]), {"text": "Yo"})
+        self.assertEqual(self.counts(), (0, 3))
+
+        # Deleting a parent removes its replies too
+        self.client.post(reverse("delete-comment-page", args=[parent.id]))
+        self.assertEqual(self.counts(), (0, 0))
+
+    def test_rebuild_fixes_drift(self):
+        ReviewLike.objects.create(user=self.user, review=self.review)
+        self.assertEqual(rebuild_review_counts(), 1)
+        self.assertEqual(self.counts(), (1, 0))
+        self.assertEqual(rebuild_review_counts(), 0)
+
+
+class InteractionCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.movie = Movie.objects.create(tmdb_id=1, title="Movie", is_released=False)
+        cls.user = User.objects.create_user(
+            email="user@example.com", password="pass", first_name="A", last_name="B"
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_writes_invalidate_cached_interactions(self):
+        get_interactions(self.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("vote-movie", args=[self.movie.id]), {"vote": "good"})
+            self.client.post(reverse("hype-vote-movie", args=[self.movie.id]), {"vote": "excited"})
+            self.client.post(reverse("toggle-watchlist", args=[self.movie.id]))
+
+        data = get_interactions(self.user)
+        self.assertEqual(data["votes"], {self.movie.id: "good"})
+        self.assertEqual(data["hype"], {self.movie.id: "excited"})
+        self.assertEqual(data["watchlist"], {self.movie.id})
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_interactions(self.user), data)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("vote-movie", args=[self.movie.id]), {"vote": "remove"})
+            self.client.post(reverse("toggle-watchlist", args=[self.movie.id]))
+
+        self.assertEqual(get_interactions(self.user), load_interactions(self.user.id))
+        self.assertEqual(get_interactions(self.user)["watchlist"], set())
+
+    def test_read_racing_a_write_is_not_cached(self):
+        load = load_interactions
+
+        def racing_load(user_id):
+            stale = load(user_id)
+            # A toggle commits while this read is still in flight
+            with self.captureOnCommitCallbacks(execute=True):
+                toggle_watchlist(self.user.id, self.movie.id)
+            return stale
+
+        with mock.patch("movies.services.interactions.load_interactions", racing_load):
+            self.assertEqual(get_interactions(self.user)["watchlist"], set())
+
+        self.assertEqual(get_interactions(self.user)["watchlist"], {self.movie.id})
+
+
+class CacheLayerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.movie = Movie.objects.create(tmdb_id=1, title="Movie", is_released=True)
+        cls.user = User.objects.create_user(
+            email="user@example.com", password="pass", first_name="A", last_name="B"
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cached_values_are_invalidated_by_signals(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return len(calls)
+
+        depends = [group(Movie, self.movie.id)]
+        self.assertEqual(cached("movie_detail", self.movie.id, compute, depends), 1)
+        self.assertEqual(cached("movie_detail", self.movie.id, compute, depends), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            MovieVote.objects.create(user=self.user, movie=self.movie, vote="good")
+
+        self.assertEqual(cached("movie_detail", self.movie.id, compute, depends), 2)
+        self.assertEqual(
+            cache_stats(["movie_detail"])["movie_detail"],
+            {"hits": 1, "misses": 2, "hit_ratio": 0.333},
+        )
+
+    def test_shared_only_skips_local_memory_cache(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return len(calls)
+
+        self.assertFalse(is_shared())
+        self.assertEqual(cached("movie_detail", self.movie.id, compute, shared_only=True), 1)
+        self.assertEqual(cached("movie_detail", self.movie.id, compute, shared_only=True), 2)
+
+    def test_movie_detail_sees_new_vote(self):
+        self.client.force_login(self.user)
+        url = reverse("movie-detail", args=[self.movie.id])
+        self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("vote-movie", args=[self.movie.id]), {"vote": "good"})
+
+        response = self.client.get(url)
+        self.assertEqual(response.context["total_votes"], 1)
+
+
+class FragmentCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.movie = Movie.objects.create(tmdb_id=1, title="Movie", is_released=True)
+        cls.user = User.objects.create_user(
+            email="user@example.com", password="pass", first_name="A", last_name="B"
+        )
+        cls.review = MovieReview.objects.create(
+            user=cls.user, movie=cls.movie, rating=4, review_text="Original"
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_review_card_is_cached_until_the_review_changes(self):
+        url = reverse("all-reviews", args=[self.movie.id])
+        self.client.get(url)
+
+        # Bypasses updated_at, so the cached card is still served
+        MovieReview.objects.filter(id=self.review.id).update(review_text="Sneaky")
+        self.assertContains(self.client.get(url), "Original")
+
+        self.review.review_text = "Edited"
+        self.review.save()
+        self.assertContains(self.client.get(url), "Edited")
+
+    def test_author_changes_show_on_cached_cards(self):
+        url = reverse("all-reviews", args=[self.movie.id])
+        self.client.get(url)
+
+        User.objects.filter(id=self.user.id).update(first_name="Renamed")
+        self.assertContains(self.client.get(url), "Renamed B")
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.movie = Movie.objects.create(tmdb_id=1, title="Movie", is_released=True)
+        cls.user = User.objects.create_user(
+            email="user@example.com", password="pass", first_name="A", last_name="B"
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def assert_revalidates(self, url, change):
+        etag = self.client.get(url)["ETag"]
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+        change()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_movie_detail_api(self):
+        self.assert_revalidates(
+            f"/api/movies/{self.movie.id}/",
+            lambda: self.client.post(f"/api/movies/{self.movie.id}/vote/", {"vote": "good"}),
+        )
+
+    def test_movie_detail_api_body_matches_fresh_etag(self):
+        # Without a shared cache the body is built per request, like the ETag
+        url = f"/api/movies/{self.movie.id}/"
+        etag = self.client.get(url)["ETag"]
+        # A write another worker's locmem wouldn't hear about
+        Movie.objects.filter(id=self.movie.id).update(title="Renamed", updated_at=timezone.now())
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["title"], "Renamed")
+
+    def test_movie_page_sees_votes_behind_the_cache(self):
+        url = reverse("movie-detail", args=[self.movie.id])
+        # Picks up the csrf cookie, which is part of the page's ETag
+        self.client.get(url)
+        self.assert_revalidates(
+            url,
+            lambda: MovieVote.objects.create(user=self.user, movie=self.movie, vote="good"),
+        )
+
+    def test_movie_reviews_api(self):
+        self.assert_revalidates(
+            f"/api/movies/{self.movie.id}/reviews/",
+            lambda: MovieReview.objects.create(
+                user=self.user, movie=self.movie, rating=3, review_text="Fine"
+            ),
+        )
+
+    def test_movie_reviews_api_sees_likes_and_comments(self):
+        review = MovieReview.objects.create(
+            user=self.user, movie=self.movie, rating=3, review_text="Fine"
+        )
+        url = f"/api/movies/{self.movie.id}/reviews/"
+
+        self.assert_revalidates(url, lambda: toggle_review_like(self.user.id, review.id))
+        self.assert_revalidates(
+            url,
+            lambda: self.client.post(reverse("add-comment-page", args=[review.id]), {"text": "Agreed"}),
+        )
+        self.assert_revalidates(url, lambda: review.save(update_fields=["review_text"]))
+
+    def test_movie_list_api_last_modified(self):
+        response = self.client.get("/api/movies/")
+        response = self.client.get(
+            "/api/movies/", HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        self.assertEqual(response.status_code, 304)
+
+
+async def fake_groq_stream(messages, route=None, meta=None):
+    for word in ["Great ", "movie", "."]:
+        await asyncio.sleep(0)
+        yield word
+
+
+class AIStreamCoalescingTests(SimpleTestCase):
+    def test_identical_prompts_share_one_upstream_call(self):
+        upstream = mock.Mock(side_effect=fake_groq_stream)
+        messages = [{"role": "user", "content": "Rewrite"}]
+
+        async def collect():
+            return "".join([delta async for delta in astream_chat(messages)])
+
+        async def run():
+            return await asyncio.gather(collect(), collect(), collect())
+
+        with mock.patch("movies.services.ai_service._stream_with_fallback", upstream):
+            results = asyncio.run(run())
+
+        self.assertEqual(results, ["Great movie."] * 3)
+        self.assertEqual(upstream.call_count, 1)
+
+    def test_first_caller_leaving_does_not_fail_the_others(self):
+        messages = [{"role": "user", "content": "Rewrite"}]
+
+        async def collect():
+            return "".join([delta async for delta in astream_chat(messages)])
+
+        async def run():
+            first = astream_chat(messages)
+            await first.__anext__()
+            other = asyncio.ensure_future(collect())
+            await asyncio.sleep(0)
+            await first.aclose()
+            return await other
+
+        with mock.patch("movies.services.ai_service._stream_with_fallback", fake_groq_stream):
+            self.assertEqual(asyncio.run(run()), "Great movie.")
+
+    def test_upstream_cancelled_when_last_caller_leaves(self):
+        cancelled = []
+
+        async def hanging(messages, route=None, meta=None):
+            yield "Great "
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        async def run():
+            stream = astream_chat([{"role": "user", "content": "Rewrite"}])
+            await stream.__anext__()
+            await stream.aclose()
+            await asyncio.sleep(0)
+
+        with mock.patch("movies.services.ai_service._stream_with_fallback", hanging):
+            asyncio.run(run())
+        self.assertEqual(cancelled, [True])
+
+
+@mock.patch("movies.services.ai_service._stream_with_fallback", fake_groq_stream)
+@override_settings(AI_LOG_FLUSH_SECONDS=0)
+class AIReviewAssistantTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.movie = Movie.objects.create(tmdb_id=1, title="Movie", is_released=True)
+        cls.user = User.objects.create_user(
+            email="user@example.com", password="pass", first_name="A", last_name="B"
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.url = reverse("ai-review-assistant", args=[self.movie.id])
+
+    def test_json_response(self):
+        response = self.client.post(self.url, {"text": "good film", "mode": "rewrite"})
+        self.assertEqual(response.json(), {"ok": True, "result": "Great movie."})
+        self.assertTrue(AIRequestLog.objects.get().success)
+
+    def test_event_stream(self):
+        response = self.client.post(
+            self.url, {"text": "good film", "mode": "rewrite"}, HTTP_ACCEPT="text/event-stream"
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+
+        async def read():
+            return b"".join([chunk async for chunk in response.streaming_content])
+
+        body = async_to_sync(read)().decode()
+        self.assertIn('data: {"delta": "Great "}', body)
+        self.assertTrue(body.endswith('event: done\ndata: {"result": "Great movie."}\n\n'))
+
+
+@override_settings(AI_LOG_FLUSH_SECONDS=0)
+class AIResultCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.movie = Movie.objects.create(tmdb_id=1, title="Movie", is_released=True)
+        cls.user = User.objects.create_user(
+            email="user@example.com", password="pass", first_name="A", last_name="B"
+        )
+        cls.review = MovieReview.objects.create(
+            user=cls.user, movie=cls.movie, rating=4, review_text="Great acting, slow plot"
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    @mock.patch("movies.services.ai_cache.ai_extract_pros_cons")
+    def test_review_pros_cons_cached_until_edit(self, extract):
+        extract.return_value = {"pros": ["acting"], "cons": ["plot"]}
+        url = reverse("ai-pros-cons-review", args=[self.review.id])
+
+        self.client.post(url)
+        response = self.client.post(url)
+        self.assertEqual(response.json()["pros"], ["acting"])
+        self.assertEqual(extract.call_count, 1)
+        self.assertEqual(
+            list(AIRequestLog.objects.order_by("id").values_list("cache_hit", flat=True)),
+            [False, True],
+        )
+
+        self.review.review_text = "Great acting, great plot"
+        self.review.save()
+        self.client.post(url)
+        self.assertEqual(extract.call_count, 2)
+
+    @mock.patch("movies.services.ai_service._stream_with_fallback")
+    def test_rewrite_reuses_result(self, upstream):
+        upstream.side_effect = fake_groq_stream
+        url = reverse("ai-review-assistant", args=[self.movie.id])
+
+        for text in ("good  film", "good film"):
+            response = self.client.post(url, {"text": text, "mode": "rewrite"})
+            self.assertEqual(response.json()["result"], "Great movie.")
+
+        self.assertEqual(upstream.call_count, 1)
+
+
+    @mock.patch("movies.services.ai_service._stream_with_fallback")
+    def test_generated_review_keyed_on_overview(self, upstream):
+        upstream.side_effect = fake_groq_stream
+        url = reverse("ai-review-assistant", args=[self.movie.id])
+
+        self.client.post(url, {"text": "", "mode": "rewrite"})
+        self.client.post(url, {"text": "", "mode": "rewrite"})
+        self.assertEqual(upstream.call_count, 1)
+        self.assertEqual(AIResult.objects.get().model_name, ROUTES["generate"].model)
+
+        Movie.objects.filter(id=self.movie.id).update(overview="A heist goes wrong.")
+        self.client.post(url, {"text": "", "mode": "rewrite"})
+        self.assertEqual(upstream.call_count, 2)
+
+    def test_hits_counted_by_sample(self):
+        key = result_key("rewrite", "good film")
+        store_result(key, "rewrite", "Great movie.")
+
+        with mock.patch("movies.services.ai_cache.random.random", return_value=0.5):
+            with self.assertNumQueries(1):
+                self.assertEqual(get_result(key), "Great movie.")
+        with mock.patch("movies.services.ai_cache.random.random", return_value=0.0):
+            self.assertEqual(get_result(key), "Great movie.")
+
+        self.assertEqual(AIResult.objects.get().hits, HIT_SAMPLE)
+
+
+@override_settings(AI_RATE_LIMIT=2, AI_RATE_WINDOW_SECONDS=600, AI_LOG_FLUSH_SECONDS=0)
+class RateLimitTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.movie = Movie.objects.create(tmdb_id=1, title="Movie", is_released=True)
+        cls.user = User.objects.create_user(
+            email="user@example.com", password="pass", first_name="A", last_name="B"
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    @mock.patch("movies.services.ai_cache.ai_extract_pros_cons")
+    def test_pros_cons_limited_without_counting_logs(self, extract):
+        extract.return_value = {"pros": ["acting"], "cons": ["plot"]}
+        url = reverse("ai-pros-cons", args=[self.movie.id])
+
+        for _ in range(2):
+            self.assertEqual(self.client.post(url, {"text": "Great acting, slow plot"}).status_code, 200)
+
+        with self.assertNumQueries(0):
+            self.assertFalse(hit(self.user.id, "pros_cons")[0])
+
+        response = self.client.post(url, {"text": "Great acting, slow plot"})
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response["Retry-After"]), 0)
+        self.assertEqual(AIRequestLog.objects.count(), 2)
+
+    @mock.patch("movies.services.ai_service._stream_with_fallback")
+    def test_assistant_limited_per_mode(self, upstream):
+        upstream.side_effect = fake_groq_stream
+        url = reverse("ai-review-assistant", args=[self.movie.id])
+
+        statuses = [
+            self.client.post(url, {"text": "good film", "mode": "rewrite"}).status_code
+            for _ in range(3)
+        ]
+        self.assertEqual(statuses, [200, 200, 429])
+        response = self.client.post(url, {"text": "good film", "mode": "funny"})
+        self.assertEqual(response.status_code, 200)
+
+    def test_rejected_methods_do_not_spend_budget(self):
+        for name in ("ai-pros-cons", "ai-review-assistant"):
+            response = self.client.get(reverse(name, args=[self.movie.id]))
+            self.assertEqual(response.status_code, 405)
+
+        self.client.logout()
+        response = self.client.post(reverse("ai-review-assistant", args=[self.movie.id]), {"text": "x"})
+        self.assertEqual(response.status_code, 302)
+
+        # Both budgets are untouched
+        for action in ("pros_cons", "rewrite"):
+            self.assertTrue(hit(self.user.id, action)[0])
+            self.assertTrue(hit(self.user.id, action)[0])
+
+    def test_previous_window_weighted(self):
+        with mock.patch("movies.services.ratelimit._now", return_value=600 * 10):
+            self.assertTrue(hit(self.user.id, "x")[0])
+            self.assertTrue(hit(self.user.id, "x")[0])
+            self.assertFalse(hit(self.user.id, "x")[0])
+
+        # Three quarters into the next window, a quarter of the old count remains
+        with mock.patch("movies.services.ratelimit._now", return_value=600 * 11 + 450):
+            self.assertTrue(hit(self.user.id, "x")[0])
+            self.assertTrue(hit(self.user.id, "x")[0])
+            self.assertEqual(hit(self.user.id, "x"), (False, 600 - 450))
+
+    def test_concurrent_hits_never_exceed_limit(self):
+        with mock.patch("movies.services.ratelimit._now", return_value=600 * 10):
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                allowed = list(pool.map(lambda _: hit(self.user.id, "x", limit=5)[0], range(20)))
+
+        self.assertEqual(allowed.count(True), 5)
+        # Rejected hits were rolled back
+        self.assertEqual(cache.get(_window_key(self.user.id, "x", 600, 10)), 5)
+
+    def test_falls_back_to_log_count(self):
+        AIRequestLog.objects.bulk_create(
+            [AIRequestLog(user=self.user, action="pros_cons", input_text="t") for _ in range(2)]
+        )
+        with mock.patch("movies.services.ratelimit.cache.add", side_effect=ConnectionError):
+            self.assertEqual(hit(self.user.id, "pros_cons"), (False, 600))
+            self.assertTrue(hit(self.user.id, "rewrite")[0])
+
+    def test_drf_throttle(self):
+        class AIView(APIView):
+            throttle_classes = [AIRateThrottle]
+            ai_action = "summary"
+
+            def post(self, request):
+                return Response({"ok": True})
+
+        factory = APIRequestFactory()
+
+        def post(user):
+            request = factory.post("/")
+            if user:
+                force_authenticate(request, user=user)
+            return AIView.as_view()(request)
+
+        self.assertEqual([post(self.user).status_code for _ in range(3)], [200, 200, 429])
+        self.assertGreater(int(post(self.user)["Retry-After"]), 0)
+        # Anonymous requests are left to the view's permissions
+        self.assertEqual(post(None).status_code, 200)
+        self.assertTrue(hit(self.user.id, "rewrite")[0])
+
+
+@override_settings(AI_LOG_FLUSH_SECONDS=60, AI_LOG_BATCH_SIZE=2, AI_LOG_BUFFER_SIZE=3)
+@mock.patch("movies.services.ai_log._ensure_worker")
+class AILogBufferTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="user@example.com", password="pass", first_name="A", last_name="B"
+        )
+
+    def tearDown(self):
+        ai_log.flush()
+
+    def test_buffered_until_flush(self, ensure_worker):
+        ai_log.record(user=self.user, action="rewrite", input_text="a", success=True)
+        self.assertEqual(AIRequestLog.objects.count(), 0)
+        ensure_worker.assert_called_once()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(ai_log.flush(), 1)
+        self.assertTrue(AIRequestLog.objects.get().success)
+
+    def test_batch_wakes_writer_and_buffer_is_bounded(self, ensure_worker):
+        ai_log.record(user=self.user, action="rewrite", input_text="a")
+        self.assertFalse(ai_log._wake.is_set())
+        ai_log.record(user=self.user, action="rewrite", input_text="b")
+        self.assertTrue(ai_log._wake.is_set())
+        ai_log._wake.clear()
+
+        dropped = ai_log.stats["dropped"]
+        for text in "cd":
+            ai_log.record(user=self.user, action="rewrite", input_text=text)
+        self.assertEqual(ai_log.pending(), 3)
+        self.assertEqual(ai_log.stats["dropped"], dropped + 1)
+
+
+class AILogArchiveTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="user@example.com", password="pass", first_name="A", last_name="B"
+        )
+        now = timezone.now()
+        cls.old = AIRequestLog.objects.create(
+            user=cls.user, action="rewrite", input_text="old", created_at=now - timedelta(days=100)
+        )
+        cls.recent = AIRequestLog.objects.create(
+            user=cls.user, action="rewrite", input_text="recent", created_at=now - timedelta(days=1)
+        )
+
+    def test_prune_moves_old_rows_to_archive(self):
+        with tempfile.TemporaryDirectory() as directory:
+            call_command("prune_ai_logs", days=90, archive_dir=directory, stdout=mock.Mock())
+            call_command("prune_ai_logs", days=90, archive_dir=directory, stdout=mock.Mock())
+
+            path = f"{directory}/ai_logs-{self.old.created_at:%Y-%m}.jsonl.gz"
+            with gzip.open(path, "rt") as f:
+                rows = [json.loads(line) for line in f]
+
+        self.assertEqual([row["input_text"] for row in rows], ["old"])
+        self.assertEqual(list(AIRequestLog.objects.values_list("id", flat=True)), [self.recent.id])
+
+    @override_settings(AI_LOG_ADMIN_DAYS=7)
+    def test_admin_lists_recent_rows_by_default(self):
+        admin_user = User.objects.create_superuser(
+            email="admin@example.com", password="pass", first_name="A", last_name="B"
+        )
+        self.client.force_login(admin_user)
+        url = reverse("admin:movies_airequestlog_changelist")
+
+        self.assertEqual(list(self.client.get(url).context["cl"].result_list), [self.recent])
+        self.assertEqual(len(self.client.get(url, {"age": "all"}).context["cl"].result_list), 2)
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    messages = [{"role": "user", "content": "Rewrite"}]
+
+    def setUp(self):
+        patcher = mock.patch.dict("movies.services.breaker._breakers", clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_open_breaker_skips_model(self):
+        breaker = get_breaker(GROQ_MODEL_PRIMARY)
+        for _ in range(5):
+            breaker.record(False, 0.1)
+        self.assertEqual(breaker_states()[GROQ_MODEL_PRIMARY]["state"], "open")
+
+        with mock.patch("movies.services.ai_service._call_model", return_value=("ok", {})) as call:
+            self.assertEqual(groq_chat(self.messages), "ok")
+        call.assert_called_once_with(GROQ_MODEL_FALLBACK, self.messages, 350)
+
+    def test_success_after_cooldown_closes(self):
+        breaker = get_breaker(GROQ_MODEL_PRIMARY)
+        for _ in range(5):
+            breaker.record(False, 0.1)
+        breaker.open_until = time.monotonic() - 1
+        self.assertTrue(breaker.allow())
+
+        breaker.record(True, 0.1)
+        self.assertEqual(breaker.snapshot()["state"], "closed")
+        self.assertEqual(breaker.snapshot()["calls"], 1)
+
+    @override_settings(GROQ_HEDGE_MAX_SECONDS=0.05)
+    def test_slow_primary_is_hedged(self):
+        def call(model_name, messages, max_tokens):
+            if model_name == GROQ_MODEL_PRIMARY:
+                time.sleep(0.5)
+            return model_name, {}
+
+        started = time.monotonic()
+        with mock.patch("movies.services.ai_service._call_model", side_effect=call):
+            self.assertEqual(groq_chat(self.messages), GROQ_MODEL_FALLBACK)
+        self.assertLess(time.monotonic() - started, 0.4)
+
+    @override_settings(GROQ_HEDGE_MAX_SECONDS=0.05)
+    def test_slow_primary_stream_is_hedged(self):
+        async def stream(model_name, messages, max_tokens, usage):
+            if model_name == GROQ_MODEL_PRIMARY:
+                await asyncio.sleep(1)
+            yield model_name
+
+        async def collect():
+            return "".join([delta async for delta in _stream_with_fallback(self.messages)])
+
+        with mock.patch("movies.services.ai_service._stream_model", stream):
+            self.assertEqual(asyncio.run(collect()), GROQ_MODEL_FALLBACK)
+        self.assertEqual(breaker_states()[GROQ_MODEL_PRIMARY]["errors"], 1)
+
+
+class AIRoutingTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.dict("movies.services.breaker._breakers", clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_overview_truncated_to_route_budget(self):
+        overview = "A heist goes wrong. " * 100
+        messages = rewrite_messages("good film", "rewrite", "Movie", overview)
+        self.assertIn("A heist goes wrong.", messages[1]["content"])
+        self.assertLess(len(messages[1]["content"]), 4 * ROUTES["rewrite"].context_tokens + 200)
+
+        messages = rewrite_messages("good film", "shorten", "Movie", overview)
+        self.assertNotIn("overview", messages[1]["content"])
+
+    @mock.patch("movies.services.ai_service._call_model")
+    def test_truncated_pros_cons_is_a_failure(self, call_model):
+        usage = {"prompt_tokens": 50, "completion_tokens": 400}
+
+        call_model.return_value = ('{"pros": ["acting"], "cons": ["pl', {**usage, "finish_reason": "length"})
+        with self.assertRaises(ValueError):
+            ai_extract_pros_cons("Great acting, slow plot")
+        self.assertEqual(call_model.call_args.args[2], ROUTES["pros_cons"].max_tokens)
+
+        call_model.return_value = ('{"pros": ["acting"], "cons": ["plot"]}', {**usage, "finish_reason": "stop"})
+        self.assertEqual(
+            ai_extract_pros_cons("Great acting, slow plot"),
+            {"pros": ["acting"], "cons": ["plot"]},
+        )
+
+    def test_cheap_mode_streams_from_small_model_with_usage(self):
+        calls = []
+
+        async def stream(model_name, messages, max_tokens, usage):
+            calls.append((model_name, max_tokens))
+            yield "Short."
+            usage.update(prompt_tokens=40, completion_tokens=3)
+
+        async def collect(meta):
+            return "".join([d async for d in astream_rewrite_review("good film", "shorten", meta=meta)])
+
+        meta = {}
+        with mock.patch("movies.services.ai_service._stream_model", stream):
+            self.assertEqual(asyncio.run(collect(meta)), "Short.")
+
+        self.assertEqual(calls, [(GROQ_MODEL_FALLBACK, ROUTES["shorten"].max_tokens)])
+        self.assertEqual(meta, {"model": GROQ_MODEL_FALLBACK, "prompt_tokens": 40, "completion_tokens": 3})
+
+
+class FakeTMDB:
+    """
+    Threaded local HTTP server standing in for the TMDB API, with canned
+    genre, discover, changes and movie payloads.
+
+    `routes` maps a path (without the /3 prefix) to a callable taking the
+    query params and returning the JSON body, or None for a 404. Every
+    request is recorded in `requests` as (path, params).
+    """
+
+    GENRES = [{"id": 28, "name": "Action"}, {"id": 18, "name": "Drama"}]
+
+    def __init__(self, routes=None):
+        self.requests = []
+        self.routes = {
+            "/genre/movie/list": lambda params: {"genres": self.GENRES},
+            "/discover/movie": self.discover,
+            **(routes or {}),
+        }
+
+    @staticmethod
+    def discover(params):
+        # Released and upcoming lists get disjoint ids, 20 per page
+        upcoming = "primary_release_date.lte" not in params
+        page = int(params.get("page", 1))
+        first = (100000 if upcoming else 0) + (page - 1) * 20 + 1
+        release_date = "2099-01-01" if upcoming else "2020-01-01"
+        return {
+            "page": page,
+            "results": [
+                {
+                    "id": tmdb_id,
+                    "title": f"Movie {tmdb_id}",
+                    "release_date": release_date,
+                    "overview": "",
+                    "poster_path": None,
+                    "genre_ids": [28],
+                }
+                for tmdb_id in range(first, first + 20)
+            ],
+        }
+
+    def __enter__(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlsplit(self.path)
+                path = url.path.removeprefix("/3")
+                params = dict(parse_qsl(url.query))
+                fake.requests.append((path, params))
+
+                route = fake.routes.get(path)
+                if route is None and path.startswith("/movie/"):
+                    route = fake.routes.get("/movie/{id}")
+                body = route(params) if route else None
+
+                if body is None:
+                    self.send_error(404)
+                    return
+                payload = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        self.settings = override_settings(
+            TMDB_BASE_URL=f"http://127.0.0.1:{self.server.server_port}/3",
+        )
+        self.settings.enable()
+        self.no_cache = mock.patch("movies.tmdb.client.response_cache", None)
+        self.no_cache.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.no_cache.stop()
+        self.settings.disable()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def paths(self, path, **params):
+        """Requests made to `path` whose params include `params`."""
+        return [
+            p for requested, p in self.requests
+            if requested == path and params.items() <= p.items()
+        ]
+
+
+class MovieUpsertTests(TestCase):
+    """save_movies_to_db: bulk upsert plus the categories diff."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.genre_map = {
+            28: Genre.objects.create(name="Action"),
+            18: Genre.objects.create(name="Drama"),
+            35: Genre.objects.create(name="Comedy"),
+        }
+
+    def payload(self, tmdb_id, genre_ids, **fields):
+        return {"id": tmdb_id, "title": f"Movie {tmdb_id}", "release_date": "2020-01-01", "genre_ids": genre_ids, **fields}
+
+    def categories(self, movie):
+        return set(movie.categories.values_list("name", flat=True))
+
+    def test_upsert_diffs_categories(self):
+        [movie] = save_movies_to_db([self.payload(1, [28, 18])], self.genre_map)
+        self.assertEqual(self.categories(movie), {"Action", "Drama"})
+        Through = Movie.categories.through
+        kept = Through.objects.get(movie=movie, genre__name="Drama").id
+
+        movies = save_movies_to_db(
+            [self.payload(1, [18, 35], title="Renamed"), self.payload(2, [28])],
+            self.genre_map,
+        )
+
+        self.assertEqual([m.tmdb_id for m in movies], [1, 2])
+        self.assertEqual(movies[0].id, movie.id)
+        self.assertEqual(movies[0].title, "Renamed")
+        self.assertEqual(self.categories(movie), {"Drama", "Comedy"})
+        self.assertEqual(self.categories(movies[1]), {"Action"})
+        # Unchanged links are left alone, not deleted and re-added
+        self.assertEqual(Through.objects.get(movie=movie, genre__name="Drama").id, kept)
+
+    def test_repeated_movie_in_batch_last_wins(self):
+        movies = save_movies_to_db(
+            [self.payload(1, [28], title="First"), self.payload(1, [18], title="Second")],
+            self.genre_map,
+        )
+
+        self.assertEqual(len(movies), 1)
+        self.assertEqual(Movie.objects.get().title, "Second")
+        self.assertEqual(self.categories(movies[0]), {"Drama"})
+
+    def test_unchanged_resync_keeps_updated_at(self):
+        payload = self.payload(1, [28, 18], overview="Plot", poster_path="/p.jpg")
+        save_movies_to_db([payload], self.genre_map)
+        before = Movie.objects.get().updated_at
+
+        # Same movie, as /movie/{id} sends it
+        same = {**payload, "genre_ids": None, "genres": [{"id": 18}, {"id": 28}]}
+        with self.captureOnCommitCallbacks() as callbacks:
+            [movie] = save_movies_to_db([same], self.genre_map)
+        self.assertEqual(movie.updated_at, before)
+        self.assertEqual(Movie.objects.get().updated_at, before)
+        # Nothing to invalidate either
+        self.assertEqual(callbacks, [])
+
+        save_movies_to_db([{**payload, "genre_ids": [28]}], self.genre_map)
+        recategorized = Movie.objects.get().updated_at
+        self.assertGreater(recategorized, before)
+
+        save_movies_to_db([{**payload, "genre_ids": [28], "overview": "New plot"}], self.genre_map)
+        self.assertGreater(Movie.objects.get().updated_at, recategorized)
+        self.assertEqual(Movie.objects.get().overview, "New plot")
+
+    def test_unknown_genres_and_dates_ignored(self):
+        [movie] = save_movies_to_db([self.payload(1, [99], release_date="soon")], self.genre_map)
+        self.assertEqual(self.categories(movie), set())
+        movie.refresh_from_db()
+        self.assertIsNone(movie.release_date)
+        self.assertFalse(movie.is_released)
+
+
+class CreditsDiffTests(TestCase):
+    """save_movie_credits only writes the credits that changed."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.movie = Movie.objects.create(tmdb_id=1, title="Movie", is_released=True)
+        cls.people = {
+            tmdb_id: Person.objects.create(tmdb_id=tmdb_id, name=f"Person {tmdb_id}")
+            for tmdb_id in (10, 11, 12)
+        }
+
+    def save(self, cast, crew=()):
+        return save_movie_credits(self.movie, list(cast), list(crew), self.people)
+
+    def cast(self):
+        return list(
+            Cast.objects.filter(movie=self.movie).order_by("order").values_list("id", "person__tmdb_id", "character")
+        )
+
+    def test_resync_writes_only_changes(self):
+        cast = [
+            {"id": 10, "credit_id": "c10", "character": "Hero"},
+            {"id": 11, "credit_id": "c11", "character": "Villain"},
+        ]
+        crew = [{"id": 12, "credit_id": "d12", "job": "Director"}]
+        self.assertEqual(self.save(cast, crew), 3)
+        before = self.cast()
+
+        self.assertEqual(self.save(cast, crew), 0)
+        self.assertEqual(self.cast(), before)
+
+        cast[1]["character"] = "Antihero"
+        cast.append({"id": 12, "credit_id": "c12", "character": "Sidekick"})
+        self.assertEqual(self.save(cast, []), 3)
+
+        after = self.cast()
+        # Rows keep their ids across resyncs
+        self.assertEqual([row[0] for row in after[:2]], [row[0] for row in before])
+        self.assertEqual([row[2] for row in after], ["Hero", "Antihero", "Sidekick"])
+        self.assertFalse(Crew.objects.filter(movie=self.movie).exists())
+
+    def test_rows_without_credit_id_replaced(self):
+        Cast.objects.create(movie=self.movie, person=self.people[10], character="Hero")
+
+        self.assertEqual(self.save([{"id": 10, "credit_id": "c10", "character": "Hero"}]), 2)
+        self.assertEqual(list(Cast.objects.values_list("credit_id", flat=True)), ["c10"])
+
+
+@override_settings(TMDB_PERSON_REFRESH_DAYS=30)
+class PeopleEnrichmentTests(TestCase):
+    """ensure_people / enrich_people fetch each person once, when needed."""
+
+    DETAILS = {"biography": "Bio", "birthday": "1950-01-01", "place_of_birth": "Town"}
+
+    def credit(self, tmdb_id):
+        return {"id": tmdb_id, "name": f"Person {tmdb_id}", "known_for_department": "Acting"}
+
+    def test_needs_enrichment(self):
+        now = timezone.now()
+        person = Person(tmdb_id=1, name="A")
+        self.assertTrue(needs_enrichment(person, now))
+
+        person.enriched_at = now - timedelta(days=29)
+        self.assertFalse(needs_enrichment(person, now))
+        person.enriched_at = now - timedelta(days=31)
+        self.assertTrue(needs_enrichment(person, now))
+
+        # Complete profiles are never refetched, however old
+        person.biography, person.birthday, person.place_of_birth = "Bio", date(1950, 1, 1), "Town"
+        self.assertFalse(needs_enrichment(person, now))
+        person.place_of_birth = ""
+        self.assertTrue(needs_enrichment(person, now))
+
+    def test_ensure_people_creates_only_missing(self):
+        existing = Person.objects.create(tmdb_id=1, name="Known", biography="Bio")
+
+        with self.assertNumQueries(3):
+            people = ensure_people([self.credit(1), self.credit(2), self.credit(2)])
+
+        self.assertEqual(set(people), {1, 2})
+        self.assertEqual(people[1].id, existing.id)
+        self.assertEqual(people[1].name, "Known")
+        self.assertEqual((people[2].name, people[2].known_for_department), ("Person 2", "Acting"))
+        self.assertEqual(ensure_people([]), {})
+
+        with self.assertNumQueries(1):
+            self.assertEqual(set(ensure_people([self.credit(1), self.credit(2)])), {1, 2})
+
+    @mock.patch("movies.tmdb.people.fetch_person_details")
+    def test_each_person_fetched_once_per_run(self, fetch):
+        fetch.return_value = self.DETAILS
+        Person.objects.create(tmdb_id=3, name="Fresh", enriched_at=timezone.now())
+        Person.objects.create(tmdb_id=4, name="Complete", **self.DETAILS)
+        movies = [Movie.objects.create(tmdb_id=i, title=f"Movie {i}") for i in (1, 2)]
+        # Both movies credit people 1 and 2
+        director = {**self.credit(2), "job": "Director"}
+        credits = {
+            1: ([self.credit(1), self.credit(3)], [director]),
+            2: ([self.credit(1), self.credit(2)], [{**self.credit(4), "job": "Writer"}]),
+        }
+
+        # One movie per chunk: `seen` has to carry across chunks
+        with mock.patch("movies.tmdb.sync_cast.fetch_movie_credits", side_effect=credits.get), \
+                mock.patch("movies.tmdb.sync_cast.CHUNK_SIZE", 1):
+            sync_cast_and_crew(limit=len(movies), workers=2)
+
+            self.assertEqual(sorted(call.args[0] for call in fetch.call_args_list), [1, 2])
+            self.assertEqual(Person.objects.get(tmdb_id=1).biography, "Bio")
+            self.assertIsNotNone(Person.objects.get(tmdb_id=2).enriched_at)
+            self.assertEqual(Person.objects.get(tmdb_id=3).biography, "")
+
+            # The next run finds everyone fresh
+            fetch.reset_mock()
+            sync_cast_and_crew(limit=len(movies), workers=2)
+            fetch.assert_not_called()
+
+    @mock.patch("movies.tmdb.people.fetch_person_details", side_effect=requests.ConnectionError)
+    def test_failed_fetch_retried_next_run(self, fetch):
+        person = Person.objects.create(tmdb_id=1, name="A")
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            self.assertEqual(enrich_people([person], pool), 1)
+            person.refresh_from_db()
+            self.assertIsNone(person.enriched_at)
+
+            # A new run (fresh `seen`) tries again
+            self.assertEqual(enrich_people([person], pool), 1)
+        self.assertEqual(fetch.call_count, 2)
+
+
+class ResponseCacheTests(SimpleTestCase):
+    """On-disk TMDB response cache: TTLs, eviction and the client path."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+
+    def test_ttl_per_endpoint_and_expiry(self):
+        store = ResponseCache(self.dir, ttls={"/movie/{id}": 60}, max_bytes=10**6)
+        self.assertEqual(store.ttl_for("/movie/550"), 60)
+        self.assertEqual(store.ttl_for("/discover/movie"), 0)
+        # The api_key never reaches the key (or the disk)
+        self.assertEqual(store.key("/movie/550", {"api_key": "x"}), store.key("/movie/550", {}))
+
+        with mock.patch("movies.tmdb.cache.time.time", return_value=1000):
+            entry = store.set(store.key("/movie/550", {}), {"id": 550}, etag='"v1"')
+
+        stored = store.get(store.key("/movie/550", {}))
+        self.assertEqual(stored, entry)
+        with mock.patch("movies.tmdb.cache.time.time", return_value=1059):
+            self.assertTrue(store.is_fresh(stored, 60))
+        with mock.patch("movies.tmdb.cache.time.time", return_value=1061):
+            self.assertFalse(store.is_fresh(stored, 60))
+
+    def test_evicts_least_recently_written(self):
+        body = {"overview": "x" * 1000}
+        store = ResponseCache(self.dir, ttls={}, max_bytes=2500)
+
+        for i, key in enumerate(["a1", "b2", "c3"]):
+            store.set(key, body)
+            os.utime(store._file(key), (i, i))
+        store.set("d4", body)
+
+        self.assertIsNone(store.get("a1"))
+        self.assertIsNone(store.get("b2"))
+        self.assertIsNotNone(store.get("c3"))
+        self.assertIsNotNone(store.get("d4"))
+
+    def test_client_serves_fresh_entries_from_disk(self):
+        store = ResponseCache(self.dir, ttls={"/genre/movie/list": 60}, max_bytes=10**6)
+
+        with FakeTMDB() as fake, mock.patch("movies.tmdb.client.response_cache", store):
+            self.assertEqual(fetch_genres(), FakeTMDB.GENRES)
+            self.assertEqual(fetch_genres(), FakeTMDB.GENRES)
+
+        self.assertEqual(len(fake.paths("/genre/movie/list")), 1)
+
+
+class TokenBucketTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 100.0
+        self.sleeps = []
+
+        def sleep(seconds):
+            self.sleeps.append(seconds)
+            self.now += seconds
+
+        for name, fake in (("monotonic", lambda: self.now), ("sleep", sleep)):
+            patcher = mock.patch(f"movies.tmdb.ratelimit.time.{name}", fake)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_burst_then_waits_for_refill(self):
+        bucket = TokenBucket(rate=4)
+
+        for _ in range(4):
+            bucket.acquire()
+        self.assertEqual(self.sleeps, [])
+
+        bucket.acquire()
+        self.assertEqual(self.sleeps, [0.25])
+
+    def test_refill_capped_at_capacity(self):
+        bucket = TokenBucket(rate=8, capacity=2)
+        self.now += 60
+
+        for _ in range(3):
+            bucket.acquire()
+        self.assertEqual(self.sleeps, [0.125])
+
+    def test_rate_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=0)
+
+    def test_sync_workers_get_pooled_connections(self):
+        size_pool(64)
+        adapter = tmdb_client.session.get_adapter("https://api.themoviedb.org/3")
+        self.assertEqual(adapter.poolmanager.connection_pool_kw["maxsize"], 64)
+        self.assertIs(tmdb_client.session.get_adapter("http://127.0.0.1/3"), adapter)
+
+
+class TMDBSyncTests(TestCase):
+    """sync_all_movies and the incremental sync against FakeTMDB."""
+
+    def released_pages(self, fake):
+        return sorted(int(p["page"]) for p in fake.paths("/discover/movie") if "primary_release_date.lte" in p)
+
+    def test_full_sync_saves_movies_and_categories(self):
+        with FakeTMDB() as fake:
+            sync_all_movies(workers=2)
+
+        # 30 released (two pages, second one cut short) + 20 upcoming
+        self.assertEqual(Movie.objects.count(), 50)
+        self.assertEqual(Movie.objects.filter(is_released=True).count(), 30)
+        self.assertEqual(self.released_pages(fake), [1, 2])
+        action = Genre.objects.get(name="Action")
+        self.assertEqual(action.movies.count(), 50)
+
+    def test_resumed_run_skips_finished_pages(self):
+        routes = {"/discover/movie": lambda params: (
+            FakeTMDB.discover(params) if "primary_release_date.lte" in params else None
+        )}
+        with FakeTMDB(routes) as fake:
+            with self.assertRaises(requests.HTTPError):
+                call_command("sync_tmdb_movies", workers=2)
+
+        job = SyncJob.objects.get()
+        self.assertEqual(job.status, "failed")
+        self.assertTrue(job.cursor["released"]["done"])
+        self.assertEqual(Movie.objects.count(), 30)
+
+        with FakeTMDB() as fake:
+            call_command("sync_tmdb_movies", workers=2, resume=True)
+
+        self.assertEqual(self.released_pages(fake), [])
+        self.assertEqual(len(fake.paths("/discover/movie")), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, "completed")
+        self.assertEqual(job.processed_count, 50)
+        self.assertEqual(Movie.objects.count(), 50)
+
+    def test_resume_mid_phase_starts_after_last_page(self):
+        job = start_job("movies", {"limit": 50})
+        checkpoint(job, processed=20, released={"page": 1, "synced": 20})
+
+        with FakeTMDB() as fake:
+            run_job(start_job("movies", {}, resume=True), sync_all_movies, workers=2)
+
+        self.assertEqual(self.released_pages(fake), [2])
+        job.refresh_from_db()
+        self.assertEqual(job.status, "completed")
+        self.assertEqual(job.cursor["released"], {"page": 2, "synced": 30, "done": True})
+        self.assertEqual(job.processed_count, 50)
+        # Page 1 was saved by the interrupted run, not this one
+        self.assertEqual(Movie.objects.filter(is_released=True).count(), 10)
+
+    def test_incremental_sync_refreshes_changed_movies_only(self):
+        changed = Movie.objects.create(tmdb_id=1, title="Old title")
+        untouched = Movie.objects.create(tmdb_id=2, title="Untouched")
+        routes = {
+            # 3 is not in our catalog
+            "/movie/changes": lambda params: {"results": [{"id": 1}, {"id": 3}], "total_pages": 1},
+            "/movie/{id}": lambda params: {
+                "id": 1,
+                "title": "New title",
+                "release_date": "2020-01-01",
+                "overview": "Now with an overview",
+                "genres": [{"id": 18, "name": "Drama"}],
+            },
+        }
+
+        with FakeTMDB(routes) as fake:
+            synced, failures = sync_changed_movies("movies", update_credits=False, workers=2)
+
+        self.assertEqual((synced, failures), (1, 0))
+        self.assertEqual([path for path, _ in fake.requests if path.startswith("/movie/1")], ["/movie/1"])
+        changed.refresh_from_db()
+        untouched.refresh_from_db()
+        self.assertEqual(changed.title, "New title")
+        self.assertEqual(list(changed.categories.values_list("name", flat=True)), ["Drama"])
+        self.assertEqual(untouched.title, "Untouched")
+        self.assertIsNotNone(SyncState.objects.get(name="movies").high_water_mark)
+
+    def test_failed_fetch_keeps_high_water_mark(self):
+        Movie.objects.create(tmdb_id=1, title="Old title")
+        routes = {
+            "/movie/changes": lambda params: {"results": [{"id": 1}], "total_pages": 1},
+            "/movie/{id}": lambda params: None,
+        }
+
+        with FakeTMDB(routes):
+            synced, failures = sync_changed_movies("movies", update_credits=False, workers=2)
+
+        self.assertEqual((synced, failures), (0, 1))
+        self.assertIsNone(SyncState.objects.get(name="movies").high_water_mark)
+
+
+class HomeSectionsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.movie = Movie.objects.create(tmdb_id=1, title="Movie", is_released=True, release_date=date.today())
+
+    def setUp(self):
+        cache.clear()
+        refresh_home_sections()
+        stale = timezone.now() - timedelta(hours=1)
+        HomeSection.objects.update(refreshed_at=stale, movie_ids=[])
+
+    def test_one_request_rebuilds_a_stale_snapshot(self):
+        self.assertEqual(load_section_ids()["latest_released_movies"], [self.movie.id])
+        self.assertIsNone(cache.get(REFRESH_LOCK_KEY))
+
+        with mock.patch("movies.services.home_sections.refresh_home_sections") as refresh:
+            self.assertEqual(load_section_ids()["latest_released_movies"], [self.movie.id])
+        refresh.assert_not_called()
+
+    def test_stale_snapshot_served_while_another_request_rebuilds(self):
+        cache.add(REFRESH_LOCK_KEY, 1)
+
+        with mock.patch("movies.services.home_sections.refresh_home_sections") as refresh:
+            self.assertEqual(load_section_ids()["latest_released_movies"], [])
+        refresh.assert_not_called()
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alien, cls.aliens, cls.resurrection, cls.alienist, cls.space, cls.heat = [
+            Movie.objects.create(
+                tmdb_id=i, title=title, overview=overview, release_date=date(year, 1, 1), is_released=True
+            )
+            for i, (title, overview, year) in enumerate([
+                ("Alien", "A crew meets a creature.", 1979),
+                ("Aliens", "She goes back.", 1986),
+                ("Alien Resurrection", "Cloned.", 1997),
+                ("The Alienist", "A psychologist in 1896.", 2018),
+                ("Space Film", "An alien lands.", 2001),
+                ("Heat", "A heist in Los Angeles.", 1995),
+            ], start=1)
+        ]
+        cls.weaver, cls.hawkins = [
+            Person.objects.create(tmdb_id=i, name=name)
+            for i, name in enumerate(["Sigourney Weaver", "Weaver Hawkins"], start=1)
+        ]
+
+    def ids(self, qs):
+        return [obj.id for obj in qs]
+
+    def test_empty_query_matches_nothing(self):
+        for query in ("", "   ", None):
+            self.assertEqual(self.ids(search_movies(query)), [])
+            self.assertEqual(self.ids(search_people(query)), [])
+
+    def test_people_and_filtered_querysets(self):
+        self.assertEqual(set(self.ids(search_people("weaver"))), {self.weaver.id, self.hawkins.id})
+        self.assertEqual(
+            self.ids(search_movies("alien", Movie.objects.filter(release_date__year__lt=1990))),
+            [self.alien.id, self.aliens.id],
+        )
+
+    @skipIf(connection.vendor == "postgresql", "icontains fallback only")
+    def test_fallback_ranks_exact_then_prefix_then_substring(self):
+        # Ties (the two prefix matches) go newest first
+        self.assertEqual(
+            self.ids(search_movies("  ALIEN ")),
+            [self.alien.id, self.resurrection.id, self.aliens.id, self.alienist.id, self.space.id],
+        )
+        self.assertEqual(self.ids(search_people("weaver")), [self.hawkins.id, self.weaver.id])
+
+    @skipIf(connection.vendor == "postgresql", "icontains fallback only")
+    def test_fallback_matches_prefixes_but_not_typos(self):
+        self.assertEqual(
+            self.ids(search_movies("alie"))[:3],
+            [self.resurrection.id, self.aliens.id, self.alien.id],
+        )
+        self.assertEqual(self.ids(search_people("sigour")), [self.weaver.id])
+        self.assertEqual(self.ids(search_movies("Alien Resurection")), [])
+
+    @skipUnless(connection.vendor == "postgresql", "trigram search needs PostgreSQL")
+    def test_typos_match_on_postgresql(self):
+        self.assertEqual(self.ids(search_movies("Alien Resurection"))[0], self.resurrection.id)
+        self.assertEqual(self.ids(search_people("Sigorney Weaver"))[0], self.weaver.id)
+
+    def test_home_search(self):
+        response = self.client.get(reverse("movies-home"), {"search": "weaver"})
+        self.assertEqual(list(response.context["movies"]), [])
+        self.assertEqual(set(self.ids(response.context["people"])), {self.weaver.id, self.hawkins.id})
+
+        response = self.client.get(reverse("movies-home"), {"search": "heist"})
+        self.assertEqual(self.ids(response.context["movies"]), [self.heat.id])
+        self.assertEqual(list(response.context["people"]), [])
+
+    def test_search_api(self):
+        self.assertEqual(self.client.get("/api/search/", {"q": " "}).status_code, 400)
+
+        data = self.client.get("/api/search/", {"q": "alien"}).json()
+        self.assertEqual(data["count"], search_movies("alien").count())
+        self.assertEqual(data["results"][0]["id"], self.alien.id)
+        self.assertEqual(
+            set(data["results"][0]), {"id", "title", "is_released", "release_date", "genres"}
+        )
+        self.assertEqual(data["people"], [])
+
+        data = self.client.get("/api/search/", {"q": "hawkins"}).json()
+        self.assertEqual(data["count"], 0)
+        self.assertEqual(
+            data["people"],
+            [{"id": self.hawkins.id, "name": "Weaver Hawkins", "profile_path": None, "known_for_department": ""}],
+        )
+
+
+# Both keys descending and NOT NULL
+RELEASED_KEYS = [("is_released", True), ("id", True)]
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        today = date.today()
+        Movie.objects.bulk_create([
+            Movie(
+                tmdb_id=i,
+                title=f"Movie {i}",
+                # Duplicate dates and missing dates exercise the tie-breakers
+                release_date=None if i % 7 == 0 else today - timedelta(days=i % 5),
+                is_released=i % 3 != 0,
+            )
+            for i in range(1, 60)
+        ])
+
+    def walk(self, keys, page_size):
+        qs = Movie.objects.all()
+        pages = []
+        page = paginate_keyset(qs, keys, None, page_size)
+        pages.append(page)
+
+        while page.has_next:
+            page = paginate_keyset(qs, keys, page.next_cursor, page_size)
+            pages.append(page)
+
+        return pages
+
+    def test_forward_matches_full_ordering(self):
+        for keys in (MOVIE_KEYS, HOME_MOVIE_KEYS, RELEASED_KEYS):
+            expected = list(
+                Movie.objects.order_by(*keyset_order(keys)).values_list("id", flat=True)
+            )
+            pages = self.walk(keys, 10)
+
+            self.assertEqual([m.id for page in pages for m in page], expected)
+            self.assertFalse(pages[0].has_previous)
+
+    def test_previous_cursor_returns_previous_page(self):
+        pages = self.walk(HOME_MOVIE_KEYS, 10)
+
+        for before, page in zip(pages, pages[1:]):
+            previous = paginate_keyset(
+                Movie.objects.all(), HOME_MOVIE_KEYS, page.previous_cursor, 10
+            )
+            self.assertEqual(
+                [m.id for m in previous], [m.id for m in before]
+            )
+
+    def test_previous_cursor_with_row_value_comparison(self):
+        pages = self.walk(RELEASED_KEYS, 10)
+        previous = paginate_keyset(Movie.objects.all(), RELEASED_KEYS, pages[2].previous_cursor, 10)
+        self.assertEqual([m.id for m in previous], [m.id for m in pages[1]])
+
+    def test_filter_has_leading_key_bound(self):
+        day = date(2026, 1, 1)
+        sql = str(Movie.objects.filter(keyset_filter(Movie, MOVIE_KEYS, [day, 5])).query)
+        self.assertIn('("movies_movie"."release_date" <= 2026-01-01 OR "movies_movie"."release_date" IS NULL) AND', sql)
+
+        sql = str(Movie.objects.filter(keyset_filter(Movie, MOVIE_KEYS, [day, 5], backwards=True)).query)
+        self.assertIn('"movies_movie"."release_date" >= 2026-01-01 AND', sql)
+
+    def test_same_direction_keys_use_row_value_comparison(self):
+        sql = str(Movie.objects.filter(keyset_filter(Movie, RELEASED_KEYS, [True, 5])).query)
+        self.assertIn('("movies_movie"."is_released", "movies_movie"."id") < (True, 5)', sql)
+
+        # NULLs don't order like row values do
+        sql = str(Movie.objects.filter(keyset_filter(Movie, MOVIE_KEYS, [None, 5])).query)
+        self.assertNotIn('("movies_movie"."release_date", "movies_movie"."id")', sql)
+
+    def test_invalid_cursor_shows_first_page(self):
+        page = paginate_keyset(Movie.objects.all(), MOVIE_KEYS, "not-a-cursor", 10)
+        self.assertFalse(page.has_previous)
+        self.assertEqual(len(page), 10)
+
+    def test_cursor_surrounding_whitespace_ignored(self):
+        pages = self.walk(MOVIE_KEYS, 10)
+        for before, page in zip(pages, pages[1:]):
+            again = paginate_keyset(Movie.objects.all(), MOVIE_KEYS, f"{before.next_cursor}\n  ", 10)
+            self.assertEqual([m.id for m in again], [m.id for m in page])
+
+    def test_home_pages_through_genre_filter(self):
+        genre = Genre.objects.create(name="Drama")
+        genre.movies.add(*Movie.objects.filter(tmdb_id__lte=50))
+        expected = list(
+            genre.movies.order_by(*keyset_order(MOVIE_KEYS)).values_list("id", flat=True)
+        )
+
+        seen = []
+        query = f"genre={genre.id}"
+        while query is not None:
+            response = self.client.get(f"{reverse('movies-home')}?{query}")
+            seen += [m.id for m in response.context["movies"]]
+            # Follow the rendered Next link, as a browser would
+            match = re.search(r'href="\?([^"]*)" class="page-btn">\s*Next', response.content.decode())
+            query = html.unescape(match.group(1)) if match else None
+            if query:
+                self.assertEqual(dict(parse_qsl(query))["genre"], str(genre.id))
+
+        self.assertEqual(seen, expected)
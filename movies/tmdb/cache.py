@@ -0,0 +1,135 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+
+# /movie/123 and /movie/456 share a TTL entry: "/movie/{id}"
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def endpoint_of(path):
+    return _ID_SEGMENT.sub("/{id}", path)
+
+
+class ResponseCache:
+    """
+    Size-bounded on-disk store for TMDB JSON responses.
+
+    Entries keep the body together with the ETag / Last-Modified headers,
+    so an expired entry can be revalidated with a conditional request
+    instead of downloaded again. `ttls` maps endpoints ("/movie/{id}") to
+    seconds; endpoints not listed are never cached.
+
+    Any object with the same get/set/touch/ttl_for methods can be plugged
+    into the client instead.
+    """
+
+    def __init__(self, directory, ttls, max_bytes):
+        self.directory = Path(directory)
+        self.ttls = ttls
+        self.max_bytes = max_bytes
+        self._size = None
+        self._lock = threading.Lock()
+
+    def ttl_for(self, path):
+        return self.ttls.get(endpoint_of(path), 0)
+
+    def key(self, path, params):
+        # api_key is the same for every request and must not end up on disk
+        params = sorted((k, str(v)) for k, v in (params or {}).items() if k != "api_key")
+        raw = json.dumps([path, params])
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _file(self, key):
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key):
+        try:
+            with open(self._file(key), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def is_fresh(self, entry, ttl):
+        return entry["stored_at"] + ttl > time.time()
+
+    def set(self, key, body, etag=None, last_modified=None):
+        entry = {
+            "stored_at": time.time(),
+            "etag": etag,
+            "last_modified": last_modified,
+            "body": body,
+        }
+        self._write(key, entry)
+        return entry
+
+    def touch(self, key, entry):
+        # 304 Not Modified: same body, new freshness window
+        entry["stored_at"] = time.time()
+        self._write(key, entry)
+
+    def _write(self, key, entry):
+        target = self._file(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+
+        data = json.dumps(entry).encode()
+        try:
+            old_size = target.stat().st_size
+        except OSError:
+            old_size = 0
+
+        # Write-then-rename so concurrent readers never see half a file
+        fd, tmp = tempfile.mkstemp(dir=target.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, target)
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._disk_usage()
+            else:
+                self._size += len(data) - old_size
+
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        return [p for p in self.directory.glob("*/*.json") if p.is_file()]
+
+    def _disk_usage(self):
+        return sum(p.stat().st_size for p in self._entries())
+
+    def _evict(self):
+        # Least recently written first, down to 90% of the limit
+        files = []
+        for p in self._entries():
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, p))
+        files.sort()
+
+        size = sum(s for _, s, _ in files)
+        target = self.max_bytes * 0.9
+        for _, file_size, p in files:
+            if size <= target:
+                break
+            try:
+                p.unlink()
+            except OSError:
+                continue
+            size -= file_size
+
+        self._size = size
+
+    def clear(self):
+        with self._lock:
+            for p in self._entries():
+                p.unlink(missing_ok=True)
+            self._size = 0
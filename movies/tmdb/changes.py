@@ -0,0 +1,99 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+from movies.models import Movie, SyncState
+from .client import fetch_movie_changes, fetch_movie_full, size_pool
+from .people import ensure_people, enrich_people
+from .sync import sync_genres, save_movies_to_db
+from .sync_cast import CHUNK_SIZE, select_credits, save_movie_credits
+
+
+# TMDB only serves the changes feed in windows of up to 14 days
+CHANGES_WINDOW_DAYS = 14
+
+# First incremental run without a stored high-water mark
+DEFAULT_LOOKBACK = timedelta(days=1)
+
+
+def iter_changed_tmdb_ids(since, until):
+    start = since.date()
+    end = until.date()
+
+    while start <= end:
+        window_end = min(start + timedelta(days=CHANGES_WINDOW_DAYS - 1), end)
+
+        page = 1
+        total_pages = 1
+        while page <= total_pages:
+            data = fetch_movie_changes(start, window_end, page)
+            total_pages = data.get("total_pages") or 1
+
+            for item in data.get("results", []):
+                yield item["id"]
+
+            page += 1
+
+        start = window_end + timedelta(days=1)
+
+
+def _fetch_full_or_none(tmdb_id):
+    try:
+        # TMDB says it changed: don't trust a still-fresh cached copy
+        return fetch_movie_full(tmdb_id, revalidate=True)
+    except Exception:
+        return None
+
+
+def sync_changed_movies(state_name, update_movies=True, update_credits=True, workers=None, since=None):
+    """
+    Re-fetch only catalog movies that TMDB reports as changed since the
+    stored high-water mark, then advance the mark.
+
+    The mark is left in place if any fetch failed, so the next run picks
+    those movies up again. Returns (movies_synced, failures).
+    """
+    workers = workers or settings.TMDB_SYNC_WORKERS
+    size_pool(workers)
+
+    state, _ = SyncState.objects.get_or_create(name=state_name)
+    until = timezone.now()
+    since = since or state.high_water_mark or until - DEFAULT_LOOKBACK
+
+    print(f"🔎 Fetching TMDB changes since {since:%Y-%m-%d}")
+    changed = set(iter_changed_tmdb_ids(since, until))
+    movies = list(Movie.objects.filter(tmdb_id__in=changed).order_by("id"))
+    print(f"🎬 {len(changed)} changed on TMDB, {len(movies)} in our catalog")
+
+    genre_map = sync_genres() if update_movies else {}
+    seen_people = set()
+    synced = 0
+    failures = 0
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for start in range(0, len(movies), CHUNK_SIZE):
+            chunk = movies[start:start + CHUNK_SIZE]
+            payloads = list(pool.map(_fetch_full_or_none, [m.tmdb_id for m in chunk]))
+
+            fetched = [(movie, data) for movie, data in zip(chunk, payloads) if data]
+            failures += len(chunk) - len(fetched)
+
+            if update_movies:
+                save_movies_to_db([data for _, data in fetched], genre_map)
+
+            if update_credits:
+                credits = [(movie, *select_credits(data)) for movie, data in fetched]
+                people = ensure_people([c for _, cast, crew in credits for c in cast + crew])
+                enrich_people(people.values(), pool, seen=seen_people)
+
+                for movie, cast, crew in credits:
+                    save_movie_credits(movie, cast, crew, people)
+
+            synced += len(fetched)
+
+    if not failures:
+        state.high_water_mark = until
+        state.save(update_fields=["high_water_mark", "updated_at"])
+
+    print(f"✅ Incremental sync complete — {synced} movies refreshed, {failures} failed")
+    return synced, failures
@@ -3,6 +3,8 @@ from datetime import date
 from django.conf import settings
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
+from .cache import ResponseCache
+from .ratelimit import TokenBucket
 
 TMDB_BASE_URL = "https://api.themoviedb.org/3"
 
@@ -16,32 +18,111 @@ retries = Retry(
     
 )
 
-adapter = HTTPAdapter(max_retries=retries)
-session.mount("https://", adapter)
+pool_size = 0
+
+
+def size_pool(workers):
+    """
+    Keep at least one pooled connection per sync worker thread sharing
+    this session (urllib3 discards the extras otherwise). Called by the
+    sync jobs before they start their thread pool.
+    """
+    global pool_size
+    if workers <= pool_size:
+        return
+
+    adapter = HTTPAdapter(max_retries=retries, pool_maxsize=workers)
+    session.mount("https://", adapter)
+    # TMDB_BASE_URL may point at a plain-http fake server (tests, local runs)
+    session.mount("http://", adapter)
+    pool_size = workers
+
+
+size_pool(getattr(settings, "TMDB_SYNC_WORKERS", 8))
+
+# Shared by all threads; replaces the fixed sleeps between calls
+limiter = TokenBucket(rate=getattr(settings, "TMDB_RATE_LIMIT", 40))
 
 session.headers.update({
     "Accept": "application/json",
     "User-Agent": "MovieOpinionMeter/1.0",
 })
 
+# Set to None to always go to the network
+response_cache = (
+    ResponseCache(
+        settings.TMDB_CACHE_DIR,
+        ttls=settings.TMDB_CACHE_TTLS,
+        max_bytes=settings.TMDB_CACHE_MAX_MB * 1024 * 1024,
+    )
+    if getattr(settings, "TMDB_CACHE_DIR", None)
+    else None
+)
+
+
+def tmdb_get(path, params=None, timeout=20, revalidate=False):
+    """
+    GET a TMDB endpoint and return the decoded JSON.
+
+    Cacheable endpoints are served from `response_cache` while fresh;
+    expired entries (or any entry with `revalidate=True`) are checked with
+    a conditional request and only re-downloaded if TMDB has a new version.
+    """
+    cache = response_cache
+    ttl = cache.ttl_for(path) if cache else 0
+    key = entry = None
+    headers = {}
+
+    if ttl:
+        key = cache.key(path, params)
+        entry = cache.get(key)
+
+        if entry and not revalidate and cache.is_fresh(entry, ttl):
+            return entry["body"]
+
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    limiter.acquire()
 
-def fetch_genres():
     r = session.get(
-        f"{TMDB_BASE_URL}/genre/movie/list",
-        params={"api_key": settings.TMDB_API_KEY},
-        timeout=20,
+        # Read per call so tests can override it
+        f"{getattr(settings, 'TMDB_BASE_URL', TMDB_BASE_URL)}{path}",
+        params={"api_key": settings.TMDB_API_KEY, **(params or {})},
+        headers=headers,
+        timeout=timeout,
     )
+
+    if r.status_code == 304 and entry:
+        cache.touch(key, entry)
+        return entry["body"]
+
     r.raise_for_status()
-    return r.json()["genres"]
+    body = r.json()
+
+    if ttl:
+        cache.set(
+            key,
+            body,
+            etag=r.headers.get("ETag"),
+            last_modified=r.headers.get("Last-Modified"),
+        )
+
+    return body
+
+
+def fetch_genres():
+    return tmdb_get("/genre/movie/list")["genres"]
 
 
 def fetch_indian_recent_released_movies(page=1):
     one_year_ago = date.today().replace(year=date.today().year - 1)
 
-    r = session.get(
-        f"{TMDB_BASE_URL}/discover/movie",
+    return tmdb_get(
+        "/discover/movie",
         params={
-            "api_key": settings.TMDB_API_KEY,
             "region": "IN",
             "with_original_language": "hi|te|ta|ml|kn",
             "primary_release_date.gte": one_year_ago.isoformat(),
@@ -49,57 +130,44 @@ def fetch_indian_recent_released_movies(page=1):
             "sort_by": "popularity.desc",
             "page": page,
         },
-        timeout=20,
     )
-    r.raise_for_status()
-    return r.json()
 
 
 def fetch_indian_upcoming_movies(page=1):
-    r = session.get(
-        f"{TMDB_BASE_URL}/discover/movie",
+    return tmdb_get(
+        "/discover/movie",
         params={
-            "api_key": settings.TMDB_API_KEY,
             "region": "IN",
             "with_original_language": "hi|te|ta|ml|kn",
             "primary_release_date.gte": date.today().isoformat(),
             "sort_by": "popularity.desc",
             "page": page,
         },
-        timeout=20,
     )
-    r.raise_for_status()
-    return r.json()
 
 
 
 def fetch_movie_by_id(tmdb_id):
-    r = session.get(
-        f"{TMDB_BASE_URL}/movie/{tmdb_id}",
-        params={"api_key": settings.TMDB_API_KEY},
-        timeout=20,
-    )
-    r.raise_for_status()
-    return r.json()
+    return tmdb_get(f"/movie/{tmdb_id}")
 
 
-def fetch_movie_full(tmdb_id):
-    r = session.get(
-        f"{TMDB_BASE_URL}/movie/{tmdb_id}",
+def fetch_movie_full(tmdb_id, revalidate=False):
+    return tmdb_get(
+        f"/movie/{tmdb_id}",
+        params={"append_to_response": "credits"},
+        timeout=25,
+        revalidate=revalidate,
+    )
+
+def fetch_movie_changes(start_date, end_date, page=1):
+    return tmdb_get(
+        "/movie/changes",
         params={
-            "api_key": settings.TMDB_API_KEY,
-            "append_to_response": "credits",
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "page": page,
         },
-        timeout=25,
     )
-    r.raise_for_status()
-    return r.json()
 
 def fetch_person_details(tmdb_person_id):
-    r = session.get(
-        f"{TMDB_BASE_URL}/person/{tmdb_person_id}",
-        params={"api_key": settings.TMDB_API_KEY},
-        timeout=15,
-    )
-    r.raise_for_status()
-    return r.json()
+    return tmdb_get(f"/person/{tmdb_person_id}", timeout=15)
@@ -0,0 +1,67 @@
+from django.utils import timezone
+from movies.models import SyncJob
+
+
+def start_job(kind, options, resume=False):
+    """
+    Return the SyncJob to run: the latest unfinished `kind` job when
+    resuming (keeping its original options), otherwise a new one.
+    """
+    if resume:
+        job = (
+            SyncJob.objects
+            .filter(kind=kind, status__in=["running", "failed"])
+            .order_by("-started_at", "-id")
+            .first()
+        )
+        if job:
+            job.status = "running"
+            job.save(update_fields=["status", "updated_at"])
+            print(f"↩️  Resuming {kind} sync job #{job.id} at {job.cursor or 'start'}")
+            return job
+
+    return SyncJob.objects.create(kind=kind, options=options)
+
+
+def checkpoint(job, processed=0, failed_ids=(), **cursor):
+    # Called after each batch is committed, so the cursor never runs
+    # ahead of what is actually in the database.
+    if job is None:
+        return
+
+    job.cursor.update(cursor)
+    job.processed_count += processed
+    job.error_count += len(failed_ids)
+    job.failed_ids.extend(failed_ids)
+    job.save(update_fields=[
+        "cursor",
+        "processed_count",
+        "error_count",
+        "failed_ids",
+        "updated_at",
+    ])
+
+
+def finish_job(job):
+    job.status = "completed"
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "finished_at", "updated_at"])
+
+
+def fail_job(job, exc):
+    job.status = "failed"
+    job.error_count += 1
+    job.last_error = f"{type(exc).__name__}: {exc}"
+    job.save(update_fields=["status", "error_count", "last_error", "updated_at"])
+
+
+def run_job(job, func, **kwargs):
+    # Runs func(job=job, **kwargs), recording the outcome on the job
+    try:
+        result = func(job=job, **kwargs)
+    except BaseException as exc:
+        fail_job(job, exc)
+        raise
+
+    finish_job(job)
+    return result
@@ -0,0 +1,107 @@
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+from movies.models import Person
+from movies.services.cache import group, invalidate
+from .client import fetch_person_details
+
+
+ENRICH_FIELDS = ["biography", "birthday", "place_of_birth"]
+
+
+def refresh_after():
+    return timedelta(days=getattr(settings, "TMDB_PERSON_REFRESH_DAYS", 30))
+
+
+def needs_enrichment(person, now=None):
+    # Complete profiles are never re-fetched
+    if all(getattr(person, f) for f in ENRICH_FIELDS):
+        return False
+
+    if person.enriched_at is None:
+        return True
+
+    now = now or timezone.now()
+    return person.enriched_at < now - refresh_after()
+
+
+def ensure_people(credits):
+    """
+    Get or create a Person for every credit, in bulk.
+
+    Returns {tmdb_person_id: Person}.
+    """
+    raw_by_id = {c["id"]: c for c in credits}
+    if not raw_by_id:
+        return {}
+
+    people = Person.objects.in_bulk(list(raw_by_id), field_name="tmdb_id")
+
+    missing = [tmdb_id for tmdb_id in raw_by_id if tmdb_id not in people]
+    if missing:
+        Person.objects.bulk_create(
+            [
+                Person(
+                    tmdb_id=tmdb_id,
+                    name=raw_by_id[tmdb_id].get("name", ""),
+                    profile_path=raw_by_id[tmdb_id].get("profile_path"),
+                    known_for_department=raw_by_id[tmdb_id].get("known_for_department", ""),
+                )
+                for tmdb_id in missing
+            ],
+            ignore_conflicts=True,
+        )
+        people.update(Person.objects.in_bulk(missing, field_name="tmdb_id"))
+
+    return people
+
+
+def _fetch_details(tmdb_person_id):
+    try:
+        return fetch_person_details(tmdb_person_id)
+    except Exception:
+        # TMDB failed — skip enrichment, retried on a later run
+        return None
+
+
+def enrich_people(people, pool, seen=None):
+    """
+    Fill biography / birthday / place_of_birth for people that need it.
+
+    Lookups run on `pool` (rate limited by the client). `seen` is a set of
+    tmdb ids already handled in this run so the same person appearing in
+    many movies is looked at once. Returns the number of people fetched.
+    """
+    seen = seen if seen is not None else set()
+    now = timezone.now()
+
+    pending = []
+    for person in people:
+        if person.tmdb_id in seen:
+            continue
+        seen.add(person.tmdb_id)
+
+        if needs_enrichment(person, now):
+            pending.append(person)
+
+    if not pending:
+        return 0
+
+    to_update = []
+    for person, details in zip(pending, pool.map(_fetch_details, [p.tmdb_id for p in pending])):
+        if details is None:
+            continue
+
+        # update fields only if empty
+        for field in ENRICH_FIELDS:
+            if not getattr(person, field) and details.get(field):
+                setattr(person, field, details[field])
+
+        person.enriched_at = now
+        to_update.append(person)
+
+    Person.objects.bulk_update(to_update, ENRICH_FIELDS + ["enriched_at"], batch_size=200)
+    if to_update:
+        invalidate(group(Person))
+
+    return len(pending)
@@ -1,18 +1,26 @@
-import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
 from movies.models import Movie, Genre
+from movies.services.cache import group, invalidate
 from .client import (
     fetch_genres,
     fetch_indian_recent_released_movies,
     fetch_indian_upcoming_movies,
     fetch_movie_by_id,
+    size_pool,
 )
+from .jobs import checkpoint
 
 
 IMPORTANT_TMDB_IDS = [
 
 ]
 
+TMDB_PAGE_SIZE = 20
+
 
 def sync_genres():
     genre_map = {}
@@ -21,11 +29,15 @@ def sync_genres():
         genre, _ = Genre.objects.get_or_create(name=g["name"])
         genre_map[g["id"]] = genre
 
+    invalidate(group(Genre))
     return genre_map
 
 
-def save_movie_to_db(movie_data, genre_map):
-    release_date = movie_data.get("release_date")
+MOVIE_SYNC_FIELDS = ["title", "poster_path", "release_date", "is_released", "overview"]
+
+
+def build_movie(movie_data):
+    release_date = movie_data.get("release_date") or None
     is_released = False
 
     if release_date:
@@ -34,82 +46,194 @@ def save_movie_to_db(movie_data, genre_map):
         except ValueError:
             release_date = None
 
-    movie, _ = Movie.objects.update_or_create(
+    return Movie(
         tmdb_id=movie_data["id"],
-        defaults={
-            "title": movie_data.get("title", ""),
-            "poster_path": movie_data.get("poster_path"),
-            "release_date": release_date,
-            "is_released": is_released,
-            "overview": movie_data.get("overview", ""),
-        },
+        title=movie_data.get("title", ""),
+        poster_path=movie_data.get("poster_path"),
+        release_date=release_date,
+        is_released=is_released,
+        overview=movie_data.get("overview", ""),
     )
 
-    genre_ids = movie_data.get("genre_ids") or []
-    movie.categories.set(
-        [genre_map[g] for g in genre_ids if g in genre_map]
-    )
 
-    return movie
+def movie_genre_ids(movie_data):
+    # Discover results carry genre_ids, /movie/{id} carries genre objects
+    if movie_data.get("genre_ids"):
+        return movie_data["genre_ids"]
+    return [g["id"] for g in movie_data.get("genres") or []]
 
 
-def sync_priority_movies(genre_map):
-    for tmdb_id in IMPORTANT_TMDB_IDS:
-        try:
-            movie_data = fetch_movie_by_id(tmdb_id)
-            save_movie_to_db(movie_data, genre_map)
-            time.sleep(0.4)
-        except Exception:
+def _sync_values(movie):
+    return [Movie._meta.get_field(f).to_python(getattr(movie, f)) for f in MOVIE_SYNC_FIELDS]
+
+
+@transaction.atomic
+def save_movies_to_db(results, genre_map):
+    """
+    Upsert a batch of TMDB movie payloads in a handful of queries: one
+    read of the known movies, an INSERT .. ON CONFLICT (plus an id
+    lookup) for new ones, a diff of the categories through-table (read,
+    delete stale, insert new) and one UPDATE for the movies that changed.
+
+    Unchanged movies keep their updated_at and cache entries, so a resync
+    doesn't invalidate every ETag and cached page.
+    """
+    # Last payload wins if TMDB repeats a movie within the batch
+    payloads = {movie_data["id"]: movie_data for movie_data in results}
+    if not payloads:
+        return []
+
+    movies = {
+        m.tmdb_id: m
+        for m in Movie.objects.filter(tmdb_id__in=payloads)
+    }
+    changed = set()
+
+    for tmdb_id, movie_data in payloads.items():
+        movie = movies.get(tmdb_id)
+        if movie is None:
             continue
+        values = _sync_values(build_movie(movie_data))
+        if _sync_values(movie) != values:
+            for field, value in zip(MOVIE_SYNC_FIELDS, values):
+                setattr(movie, field, value)
+            changed.add(tmdb_id)
+
+    new = [tmdb_id for tmdb_id in payloads if tmdb_id not in movies]
+    if new:
+        # ON CONFLICT covers a concurrent sync inserting the same movie
+        Movie.objects.bulk_create(
+            [build_movie(payloads[tmdb_id]) for tmdb_id in new],
+            update_conflicts=True,
+            unique_fields=["tmdb_id"],
+            update_fields=MOVIE_SYNC_FIELDS + ["updated_at"],
+        )
+        movies.update(
+            (m.tmdb_id, m) for m in Movie.objects.filter(tmdb_id__in=new)
+        )
+
+    wanted = {
+        (movies[tmdb_id].id, genre_map[g].id)
+        for tmdb_id, movie_data in payloads.items()
+        for g in movie_genre_ids(movie_data)
+        if g in genre_map
+    }
+
+    Through = Movie.categories.through
+    existing = {
+        (movie_id, genre_id): pk
+        for pk, movie_id, genre_id in Through.objects.filter(
+            movie_id__in=[m.id for m in movies.values()]
+        ).values_list("id", "movie_id", "genre_id")
+    }
+
+    stale = [pair for pair in existing if pair not in wanted]
+    if stale:
+        Through.objects.filter(id__in=[existing[pair] for pair in stale]).delete()
+
+    added = [pair for pair in wanted if pair not in existing]
+    Through.objects.bulk_create([
+        Through(movie_id=movie_id, genre_id=genre_id)
+        for movie_id, genre_id in added
+    ])
+
+    # Genres are part of the movie too
+    recategorized = {movie_id for movie_id, _ in stale + added}
+    updated = [
+        movie
+        for tmdb_id, movie in movies.items()
+        if tmdb_id not in new and (tmdb_id in changed or movie.id in recategorized)
+    ]
+    if updated:
+        now = timezone.now()
+        for movie in updated:
+            movie.updated_at = now
+        Movie.objects.bulk_update(updated, MOVIE_SYNC_FIELDS + ["updated_at"])
+
+    touched = updated + [movies[tmdb_id] for tmdb_id in new]
+    if touched:
+        invalidate(group(Movie), *[group(Movie, m.id) for m in touched])
+
+    return [movies[tmdb_id] for tmdb_id in payloads]
 
-def sync_all_movies(limit=50):
-    print("🎬 Syncing Indian movies (last 1 year + upcoming)")
 
-    genre_map = sync_genres()
+def save_movie_to_db(movie_data, genre_map):
+    return save_movies_to_db([movie_data], genre_map)[0]
 
-    released_limit = 30
-    upcoming_limit = 20
 
-    synced_released = 0
-    synced_upcoming = 0
+def _fetch_or_none(fetch, *args):
+    try:
+        return fetch(*args)
+    except Exception:
+        return None
 
-    # -------- Released (last 1 year) --------
-    page = 1
-    while synced_released < released_limit:
-        data = fetch_indian_recent_released_movies(page)
-        results = data.get("results", [])
 
-        if not results:
-            break
+def sync_priority_movies(genre_map, workers=None):
+    workers = workers or settings.TMDB_SYNC_WORKERS
+    size_pool(workers)
 
-        for movie_data in results:
-            if synced_released >= released_limit:
-                break
+    # Fetches run concurrently (rate limited by the client), DB writes
+    # stay on this thread.
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(lambda i: _fetch_or_none(fetch_movie_by_id, i), IMPORTANT_TMDB_IDS)
+        save_movies_to_db([movie_data for movie_data in results if movie_data], genre_map)
 
-            save_movie_to_db(movie_data, genre_map)
-            synced_released += 1
-            time.sleep(0.3)
+def _sync_discover(pool, fetch_page, limit, genre_map, job=None, phase=None):
+    # Fetch every page we may need up front (concurrently, rate limited),
+    # then save in page order on this thread. With a job, progress is
+    # checkpointed per page and a resumed run skips finished pages.
+    progress = job.cursor.get(phase, {}) if job else {}
+    if progress.get("done"):
+        return progress.get("synced", 0)
 
-        page += 1
+    pages = -(-limit // TMDB_PAGE_SIZE)
+    first_page = progress.get("page", 0) + 1
+    synced = progress.get("synced", 0)
+    page_numbers = range(first_page, pages + 1)
 
-    # -------- Upcoming --------
-    page = 1
-    while synced_upcoming < upcoming_limit:
-        data = fetch_indian_upcoming_movies(page)
+    for page, data in zip(page_numbers, pool.map(fetch_page, page_numbers)):
         results = data.get("results", [])
 
         if not results:
             break
 
-        for movie_data in results:
-            if synced_upcoming >= upcoming_limit:
-                break
+        batch = results[: limit - synced]
+        save_movies_to_db(batch, genre_map)
+        synced += len(batch)
+
+        if job:
+            checkpoint(job, processed=len(batch), **{phase: {"page": page, "synced": synced}})
+
+        if synced >= limit:
+            break
+
+    if job:
+        checkpoint(job, **{phase: {"page": pages, "synced": synced, "done": True}})
+    return synced
 
-            save_movie_to_db(movie_data, genre_map)
-            synced_upcoming += 1
-            time.sleep(0.3)
 
-        page += 1
+def sync_all_movies(limit=50, workers=None, job=None):
+    print("🎬 Syncing Indian movies (last 1 year + upcoming)")
+
+    workers = workers or settings.TMDB_SYNC_WORKERS
+    size_pool(workers)
+    genre_map = sync_genres()
+
+    released_limit = 30
+    upcoming_limit = 20
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # -------- Released (last 1 year) --------
+        synced_released = _sync_discover(
+            pool, fetch_indian_recent_released_movies, released_limit, genre_map,
+            job=job, phase="released",
+        )
+
+        # -------- Upcoming --------
+        synced_upcoming = _sync_discover(
+            pool, fetch_indian_upcoming_movies, upcoming_limit, genre_map,
+            job=job, phase="upcoming",
+        )
 
     total = synced_released + synced_upcoming
     print(
@@ -1,84 +1,167 @@
-import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
 from django.db import transaction
+from django.utils import timezone
 from movies.models import Movie, Cast, Crew, Person
-from .client import fetch_movie_full, fetch_person_details
+from movies.services.cache import group, invalidate
+from .client import fetch_movie_full, size_pool
+from .jobs import checkpoint
+from .people import ensure_people, enrich_people
 
 
-def get_or_create_person(tmdb_person_id, raw):
-    # Step 1: create or fetch person WITHOUT external API
-    person, _ = Person.objects.get_or_create(
-        tmdb_id=tmdb_person_id,
-        defaults={
-            "name": raw.get("name", ""),
-            "profile_path": raw.get("profile_path"),
-            "known_for_department": raw.get("known_for_department", ""),
-        },
-    )
-
-    # Step 2: fetch extra details SAFELY
-    try:
-        details = fetch_person_details(tmdb_person_id)
-    except Exception:
-        # TMDB failed — skip enrichment, keep base person
-        return person
+CAST_LIMIT = 12
+CREW_JOBS = {"Director", "Producer", "Writer"}
 
-    # Step 3: update fields only if empty
-    updated = False
+# Movies fetched per round; people are enriched once per round
+CHUNK_SIZE = 50
 
-    if not person.biography and details.get("biography"):
-        person.biography = details["biography"]
-        updated = True
 
-    if not person.birthday and details.get("birthday"):
-        person.birthday = details["birthday"]
-        updated = True
+def select_credits(data):
+    credits = data.get("credits", {})
 
-    if not person.place_of_birth and details.get("place_of_birth"):
-        person.place_of_birth = details["place_of_birth"]
-        updated = True
+    cast = credits.get("cast", [])[:CAST_LIMIT]
+    crew = [c for c in credits.get("crew", []) if c.get("job") in CREW_JOBS]
 
-    if updated:
-        person.save(update_fields=["biography", "birthday", "place_of_birth"])
+    return cast, crew
 
-    return person
 
-
-def sync_cast_and_crew(limit=50):
-    movies = Movie.objects.all()[:limit]
-
-    for movie in movies:
-        try:
-            data = fetch_movie_full(movie.tmdb_id)
-        except Exception:
-            # Skip movie if TMDB fails
+def fetch_movie_credits(tmdb_id):
+    # Runs on a worker thread: TMDB only, no DB access
+    try:
+        return select_credits(fetch_movie_full(tmdb_id))
+    except Exception:
+        # Skip movie if TMDB fails
+        return None
+
+
+def credit_key(c, role):
+    # TMDB always sends credit_id; fall back to person + role just in case
+    return c.get("credit_id") or f"{c['id']}:{role}"
+
+
+def reconcile_rows(model, movie, desired, fields):
+    """
+    Bring `model` rows for `movie` in line with `desired`
+    ({credit_id: {field: value}}) using only the inserts, updates and
+    deletes that are actually needed. Returns the number of rows written.
+    """
+    existing = {}
+    stale = []
+    for row in model.objects.filter(movie=movie):
+        if row.credit_id and row.credit_id not in existing:
+            existing[row.credit_id] = row
+        else:
+            # Rows synced before credit ids were stored (or duplicates)
+            stale.append(row.id)
+
+    to_create = []
+    to_update = []
+    for credit_id, values in desired.items():
+        row = existing.pop(credit_id, None)
+
+        if row is None:
+            to_create.append(model(movie=movie, credit_id=credit_id, **values))
             continue
 
-        credits = data.get("credits", {})
-
-        # Clear old relations first
-        Cast.objects.filter(movie=movie).delete()
-        Crew.objects.filter(movie=movie).delete()
+        if any(getattr(row, f) != v for f, v in values.items()):
+            for f, v in values.items():
+                setattr(row, f, v)
+            to_update.append(row)
+
+    stale += [row.id for row in existing.values()]
+
+    if stale:
+        model.objects.filter(id__in=stale).delete()
+    if to_create:
+        model.objects.bulk_create(to_create)
+    if to_update:
+        model.objects.bulk_update(to_update, fields)
+
+    return len(stale) + len(to_create) + len(to_update)
+
+
+@transaction.atomic
+def save_movie_credits(movie, cast, crew, people):
+    # CAST
+    written = reconcile_rows(
+        Cast,
+        movie,
+        {
+            credit_key(c, c.get("character", "")): {
+                "person_id": people[c["id"]].id,
+                "character": c.get("character", ""),
+                "order": position,
+            }
+            for position, c in enumerate(cast)
+        },
+        ["person_id", "character", "order"],
+    )
 
-        # CAST
-        for c in credits.get("cast", [])[:12]:
-            person = get_or_create_person(c["id"], c)
+    # CREW (important roles only)
+    written += reconcile_rows(
+        Crew,
+        movie,
+        {
+            credit_key(c, c.get("job")): {
+                "person_id": people[c["id"]].id,
+                "job": c.get("job"),
+            }
+            for c in crew
+        },
+        ["person_id", "job"],
+    )
 
-            Cast.objects.create(
-                movie=movie,
-                person=person,
-                character=c.get("character", ""),
+    if written:
+        # Credits have no timestamp of their own; conditional GET
+        # (movies.conditional) watches the movie's
+        Movie.objects.filter(id=movie.id).update(updated_at=timezone.now())
+        invalidate(group(Movie, movie.id), group(Person))
+
+    return written
+
+
+def sync_cast_and_crew(limit=50, workers=None, job=None):
+    workers = workers or settings.TMDB_SYNC_WORKERS
+    size_pool(workers)
+
+    # Walk movies in id order so a job can resume after the last
+    # movie of the last committed chunk.
+    movies = Movie.objects.order_by("id")
+    if job:
+        movies = movies.filter(id__gt=job.cursor.get("last_movie_id", 0))
+        limit = max(limit - job.processed_count - job.error_count, 0)
+    movies = list(movies[:limit])
+
+    # tmdb person ids already checked for enrichment during this run
+    seen_people = set()
+
+    # TMDB requests run on the pool (throttled by the client's shared
+    # token bucket); DB writes stay on this thread.
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for start in range(0, len(movies), CHUNK_SIZE):
+            chunk = movies[start:start + CHUNK_SIZE]
+            credits = list(pool.map(fetch_movie_credits, [m.tmdb_id for m in chunk]))
+
+            all_credits = [
+                c
+                for result in credits if result
+                for c in result[0] + result[1]
+            ]
+            people = ensure_people(all_credits)
+            enrich_people(people.values(), pool, seen=seen_people)
+
+            failed = []
+            for movie, result in zip(chunk, credits):
+                if result is None:
+                    failed.append(movie.tmdb_id)
+                    continue
+
+                cast, crew = result
+                save_movie_credits(movie, cast, crew, people)
+
+            checkpoint(
+                job,
+                processed=len(chunk) - len(failed),
+                failed_ids=failed,
+                last_movie_id=chunk[-1].id,
             )
-
-        # CREW (important roles only)
-        for c in credits.get("crew", []):
-            if c.get("job") in {"Director", "Producer", "Writer"}:
-                person = get_or_create_person(c["id"], c)
-
-                Crew.objects.create(
-                    movie=movie,
-                    person=person,
-                    job=c.get("job"),
-                )
-
-        # VERY IMPORTANT: slow down
-        time.sleep(0.8)
@@ -28,6 +28,7 @@ urlpatterns = [
     path("movie/<int:movie_id>/ai/assist/", views_ai.ai_review_assistant, name="ai-review-assistant"),
     path("movie/<int:movie_id>/ai/pros-cons/",views_ai.ai_pros_cons, name="ai-pros-cons"),
     path("review/<int:review_id>/ai/pros-cons/", views_ai.ai_pros_cons_review, name="ai-pros-cons-review"),
+    path("ai/status/", views_ai.ai_status, name="ai-status"),
 
 
 
@@ -1,12 +1,37 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.core.paginator import Paginator
-from django.db.models import Count, Prefetch,Q
+from django.db.models import Prefetch
 from django.contrib import messages
 from django.urls import reverse
 from django.contrib.auth.decorators import login_required
-from datetime import date, timedelta
-from .models import (Movie, Genre, MovieVote, Watchlist, Person, Cast, Crew, MovieReview, ReviewLike, ReviewComment, MovieHypeVote)
+from django.db import IntegrityError, transaction
+from .models import (Movie, Genre, MovieVote, Watchlist, Person, Cast, Crew, MovieReview, ReviewComment, MovieHypeVote)
+from .conditional import conditional, movie_page_markers, person_markers
 from .forms import MovieReviewForm
+from .services.cache import cached, group
+from .services.home_sections import get_home_sections
+from .pagination import HOME_MOVIE_KEYS, MOVIE_KEYS, paginate_keyset
+from .services.interactions import (
+    get_interactions,
+    record_hype,
+    record_vote,
+)
+from .services.reviews import (
+    REVIEW_KEYS,
+    reviews_queryset,
+    assemble_reviews,
+    record_comment_change,
+)
+from .services.toggles import toggle_review_like as toggle_like
+from .services.toggles import toggle_watchlist as toggle_watchlist_item
+from .services.search import search_movies, search_people
+from .services.stats import (
+    get_movie_stats,
+    save_vote,
+    record_vote_change,
+    record_hype_change,
+    record_review_change,
+)
 from collections import defaultdict
 from django.http import HttpResponse
 
@@ -16,6 +41,10 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+def _genres():
+    return cached("genres", "all", lambda: list(Genre.objects.all()), depends=[group(Genre)])
+
+
 
 
 
@@ -26,15 +55,13 @@ def home(request):
     genre_filter = request.GET.get("genre", "").strip()
     status_filter = request.GET.get("released", "").strip()
     page_number = request.GET.get("page", "1")
+    cursor = request.GET.get("cursor")
 
     # Base queryset with optimized prefetch
     base_qs = Movie.objects.all().prefetch_related("categories")
     movies_qs = base_qs
 
     # Apply filters server-side
-    if search_query:
-        movies_qs = movies_qs.filter(title__icontains=search_query)
-
     if genre_filter:
         movies_qs = movies_qs.filter(categories__id=genre_filter).distinct()
 
@@ -45,91 +72,68 @@ def home(request):
 
     # If any filters applied, show filtered results
     if search_query or genre_filter or status_filter:
-        paginator = Paginator(movies_qs.order_by("-release_date"), 24)
-        page_obj = paginator.get_page(page_number)
+        if search_query:
+            # Ranked full-text / trigram search (see movies.services.search);
+            # relevance ranking keeps page numbers
+            movies_qs = search_movies(search_query, movies_qs)
+            page_obj = Paginator(movies_qs, 24).get_page(page_number)
+        else:
+            page_obj = paginate_keyset(movies_qs, MOVIE_KEYS, cursor, 24)
+
+        people = []
+        if search_query and str(page_number) == "1":
+            people = search_people(search_query)[:12]
 
         return render(request, "movies/home.html", {
             "section_title": "Search Results",
             "movies": page_obj.object_list,
+            "people": people,
             "page_obj": page_obj,
-            "genres": Genre.objects.all(),
+            "genres": _genres(),
         })
 
-    all_movies = base_qs.order_by("-is_released", "-release_date")
-    paginator = Paginator(all_movies, 24)
-    page_obj = paginator.get_page(page_number)
+    # Cursor pagination: constant cost however deep the page
+    page_obj = paginate_keyset(base_qs, HOME_MOVIE_KEYS, cursor, 24)
 
     context = {
         "movies": page_obj.object_list,
         "page_obj": page_obj,
-        "genres": Genre.objects.all(),
+        "genres": _genres(),
     }
 
-    if str(page_number) == "1":
-        today = date.today()
-        soon_limit = today + timedelta(days=60)
-        recent_limit = today - timedelta(days=120)
-        
-        #trednding section 
-        context["trending_movies"] = Movie.objects.filter(
-            is_released=True,
-            release_date__gte=recent_limit
-        ).prefetch_related("categories").annotate(
-            vote_count=Count("votes")
-        ).order_by("-vote_count", "-release_date")[:12]
-
-
-        #  Most Hyped (Upcoming) movies
-        context["hyped_movies"] = Movie.objects.filter(
-            is_released=False
-        ).annotate(
-            excited_count=Count("hype_votes", filter=Q(hype_votes__vote="excited")),
-            total_hype_votes=Count("hype_votes"),
-        ).filter(
-            total_hype_votes__gt=0
-        ).order_by(
-            "-excited_count",
-            "-total_hype_votes",
-            "release_date"
-        )[:12]
-
-
-                
-        # Latest released
-        context["latest_released_movies"] = Movie.objects.filter(
-            is_released=True
-        ).prefetch_related("categories").order_by("-release_date")[:12]
-        
-        # Coming soon (next 60 days)
-        context["coming_soon_movies"] = Movie.objects.filter(
-            is_released=False,
-            release_date__isnull=False,
-            release_date__lte=soon_limit
-        ).prefetch_related("categories").order_by("release_date")[:12]
-        
-    
-        context["major_upcoming_movies"] = Movie.objects.filter(
-            is_released=False,
-            release_date__isnull=False,
-            release_date__gt=soon_limit
-        ).prefetch_related("categories").order_by("release_date")[:12]
+    if not page_obj.has_previous:
+        # Section lists come from the precomputed snapshot
+        # (see movies.services.home_sections / refresh_home_sections).
+        context.update(get_home_sections())
 
     return render(request, "movies/home.html", context)
 
 
+@conditional(movie_page_markers)
 def movie_detail(request, movie_id):
     if not request.user.is_authenticated:
         messages.warning(request, "Please login to access the movie detail page.")
         return redirect(f"{reverse('login')}?next={request.path}")
 
-    # Fetch movie with optimized queries
-    movie = get_object_or_404(
-        Movie.objects.prefetch_related(
-            "categories",
-            "cast__person",
-            "crew__person",
+    # Movie with stats, genres, cast and crew; cached until the movie,
+    # its votes, hype or reviews change (see movies.signals). Only with a
+    # shared cache: locmem would keep serving other workers' old stats.
+    movie = cached(
+        "movie_detail",
+        movie_id,
+        lambda: get_object_or_404(
+            Movie.objects.select_related("stats").prefetch_related(
+                "categories",
+                Prefetch(
+                    "cast",
+                    queryset=Cast.objects.select_related("person").order_by("order", "id"),
+                ),
+                "crew__person",
+            ),
+            id=movie_id,
         ),
-        id=movie_id,
+        depends=[group(Movie, movie_id)],
+        shared_only=True,
     )
     sort = request.GET.get("sort", "liked").strip().lower()
     if sort not in ["liked", "latest"]:
@@ -162,24 +166,17 @@ def movie_detail(request, movie_id):
         key=lambda x: person_priority(x["jobs"])
     )
 
-    vote_stats_qs = MovieVote.objects.filter(
-        movie=movie
-    ).values("vote").annotate(count=Count("id"))
-    
-    vote_counts = {x["vote"]: x["count"] for x in vote_stats_qs}
-    for key in ["bad", "average", "good", "masterpiece"]:
-        vote_counts.setdefault(key, 0)
+    stats = get_movie_stats(movie)
 
-    total_votes = sum(vote_counts.values())
+    vote_counts = stats.vote_counts
+    total_votes = stats.total_votes
     
     def pct(x):
         return round((x / total_votes) * 100) if total_votes > 0 else 0
 
    
-    user_vote = MovieVote.objects.filter(
-        user=request.user, 
-        movie=movie
-    ).first()
+    # Viewer's votes / hype / watchlist / likes: one cache read
+    interactions = get_interactions(request.user)
 
     hype_counts = {"excited": 0, "not_excited": 0}
     hype_score = 0
@@ -187,13 +184,12 @@ def movie_detail(request, movie_id):
     user_hype_vote = ""
 
     if not movie.is_released:
-        hype_stats = MovieHypeVote.objects.filter(movie=movie).values("vote").annotate(count=Count("id"))
-        hype_counts = {x["vote"]: x["count"] for x in hype_stats}
-
-        hype_counts.setdefault("excited", 0)
-        hype_counts.setdefault("not_excited", 0)
+        hype_counts = {
+            "excited": stats.hype_excited,
+            "not_excited": stats.hype_not_excited,
+        }
 
-        hype_total = hype_counts["excited"] + hype_counts["not_excited"]
+        hype_total = stats.hype_total
 
         if hype_total > 0:
             hype_score = round((hype_counts["excited"] / hype_total) * 100)
@@ -202,84 +198,32 @@ def movie_detail(request, movie_id):
             hype_score = 0
             hype_not_excited_percent = 0
 
-        hype_obj = MovieHypeVote.objects.filter(movie=movie, user=request.user).first()
-        user_hype_vote = hype_obj.vote if hype_obj else ""
+        user_hype_vote = interactions["hype"].get(movie.id, "")
 
 
     
     # Check if movie in watchlist
-    in_watchlist = Watchlist.objects.filter(
-        user=request.user, 
-        movie=movie
-    ).exists()
+    in_watchlist = movie.id in interactions["watchlist"]
 
     # Fetch reviews with optimized queries
+    reviews_qs = reviews_queryset(movie.id, sort)
 
-    reviews_base_qs = (
-        MovieReview.objects
-        .filter(movie=movie)
-        .select_related("user")
-        .annotate(like_count=Count("likes"))
-        .prefetch_related(
-            Prefetch(
-                "likes",
-                queryset=ReviewLike.objects.filter(user=request.user),
-                to_attr="user_likes"
-            ),
-            Prefetch(
-                "comments",
-                queryset=ReviewComment.objects.select_related("user").order_by("created_at")
-            )
-        )
-    )
+    total_reviews_count = reviews_qs.count()
 
-    total_reviews_count = reviews_base_qs.count()
+    my_review = reviews_qs.filter(user=request.user).first()
 
-    if sort == "latest":
-        ordered_qs = reviews_base_qs.order_by("-created_at")
-    else:
-        ordered_qs = reviews_base_qs.order_by("-like_count", "-created_at")
-
-    my_review = ordered_qs.filter(user=request.user).first()
-
-    other_reviews_qs = ordered_qs
+    other_reviews_qs = reviews_qs
     if my_review:
         other_reviews_qs = other_reviews_qs.exclude(id=my_review.id)
 
     other_reviews = list(other_reviews_qs[:10])
 
-    review_user_ids = []
-
-    if my_review:
-        review_user_ids.append(my_review.user_id)
-
-    review_user_ids += [r.user_id for r in other_reviews]
-
-    votes_map = {
-        v.user_id: v
-        for v in MovieVote.objects.filter(movie=movie, user_id__in=review_user_ids)
-    }
-
-
-    def enrich_review(review):
-        review.is_liked = bool(review.user_likes)
-        review.comment_count = review.comments.count()
-
-        text = (review.review_text or "").strip()
-        line_count = len(text.splitlines())
-        char_count = len(text)
-
-        review.show_more = (line_count > 3) or (char_count > 150)
-
-        review.user_vote = votes_map.get(review.user_id)
-
-        return review
-
-
-    if my_review:
-        my_review = enrich_review(my_review)
-
-    other_reviews = [enrich_review(r) for r in other_reviews]
+    # Votes, comment counts and likes for all cards in one pass
+    assemble_reviews(
+        ([my_review] if my_review else []) + other_reviews,
+        movie.id,
+        viewer=request.user,
+    )
 
 
 
@@ -296,7 +240,7 @@ def movie_detail(request, movie_id):
             "good": pct(vote_counts["good"]),
             "masterpiece": pct(vote_counts["masterpiece"]),
         },
-        "user_vote": user_vote.vote if user_vote else "",
+        "user_vote": interactions["votes"].get(movie.id, ""),
         "in_watchlist": in_watchlist,
         "my_review": my_review,
         "other_reviews": other_reviews,
@@ -330,10 +274,14 @@ def vote_movie(request, movie_id):
 
     # Remove vote
     if vote == "remove":
-        deleted_count = MovieVote.objects.filter(
-            user=request.user, 
-            movie=movie
-        ).delete()[0]
+        with transaction.atomic():
+            old_vote = save_vote(MovieVote, request.user, movie.id, None)
+
+            deleted_count = 0
+            if old_vote:
+                deleted_count = 1
+                record_vote_change(movie.id, old_vote, None)
+                record_vote(request.user.id, movie.id, None)
 
         logger.info(
         "Movie vote removed",
@@ -346,11 +294,10 @@ def vote_movie(request, movie_id):
         return redirect('movie-detail', movie_id=movie_id)
 
     # Add or update vote
-    MovieVote.objects.update_or_create(
-        user=request.user,
-        movie=movie,
-        defaults={"vote": vote}
-    )
+    with transaction.atomic():
+        old_vote = save_vote(MovieVote, request.user, movie.id, vote)
+        record_vote_change(movie.id, old_vote, vote)
+        record_vote(request.user.id, movie.id, vote)
     logger.info(
     "Movie vote updated",
     extra={
@@ -374,31 +321,25 @@ def toggle_watchlist(request, movie_id):
         return redirect('movie-detail', movie_id=movie_id)
     
     movie = get_object_or_404(Movie, id=movie_id)
-    watchlist_item = Watchlist.objects.filter(
-        user=request.user, 
-        movie=movie
-    )
 
-    if watchlist_item.exists():
-        watchlist_item.delete()
+    if toggle_watchlist_item(request.user.id, movie.id):
         logger.info(
-        "Watchlist item removed",
+        "Watchlist item added",
         extra={
             "user_id": request.user.id,
             "movie_id": movie.id,
         }
-        )
-        messages.info(request, f"Removed '{movie.title}' from watchlist")
+    )
+        messages.success(request, f"Added '{movie.title}' to watchlist")
     else:
-        Watchlist.objects.create(user=request.user, movie=movie)
         logger.info(
-        "Watchlist item added",
+        "Watchlist item removed",
         extra={
             "user_id": request.user.id,
             "movie_id": movie.id,
         }
-    )
-        messages.success(request, f"Added '{movie.title}' to watchlist")
+        )
+        messages.info(request, f"Removed '{movie.title}' from watchlist")
 
     return redirect('movie-detail', movie_id=movie_id)
 
@@ -407,15 +348,8 @@ def watchlist_page(request):
     watchlist_qs = (
         Watchlist.objects
         .filter(user=request.user)
-        .select_related("movie")
+        .select_related("movie", "movie__stats")
         .prefetch_related("movie__categories")
-        .annotate(
-            excited_count=Count(
-                "movie__hype_votes",
-                filter=Q(movie__hype_votes__vote="excited")
-            ),
-            total_hype_votes=Count("movie__hype_votes"),
-        )
         .order_by("-created_at")
     )
 
@@ -427,6 +361,30 @@ def watchlist_page(request):
     return render(request, "movies/watchlist.html", context)
 
 
+def _save_review(request, movie):
+    # The rating delta comes from the locked row, so a concurrent edit
+    # can't be counted from a stale read. Returns (form, saved review or
+    # None, previous review or None).
+    existing_review = MovieReview.objects.select_for_update().filter(
+        user=request.user,
+        movie=movie
+    ).first()
+
+    old_rating = existing_review.rating if existing_review else None
+    form = MovieReviewForm(request.POST, instance=existing_review)
+    if not form.is_valid():
+        return form, None, existing_review
+
+    review = form.save(commit=False)
+    review.user = request.user
+    review.movie = movie
+
+    with transaction.atomic():
+        review.save()
+    record_review_change(movie.id, old_rating, review.rating)
+    return form, review, existing_review
+
+
 @login_required
 def submit_review(request, movie_id):
 
@@ -435,19 +393,14 @@ def submit_review(request, movie_id):
     if request.method != "POST":
         return redirect('movie-detail', movie_id=movie_id)
 
-    existing_review = MovieReview.objects.filter(
-        user=request.user, 
-        movie=movie
-    ).first()
-    
-    form = MovieReviewForm(request.POST, instance=existing_review)
-    
-    if form.is_valid():
-        review = form.save(commit=False)
-        review.user = request.user
-        review.movie = movie
-   
-        review.save()
+    with transaction.atomic():
+        try:
+            form, review, existing_review = _save_review(request, movie)
+        except IntegrityError:
+            # A concurrent first review got in first: edit that one
+            form, review, existing_review = _save_review(request, movie)
+
+    if review is not None:
         logger.info("Review saved",extra={
         "user_id": request.user.id,
         "movie_id": movie.id,
@@ -475,10 +428,17 @@ def delete_review(request, movie_id):
         return redirect('movie-detail', movie_id=movie_id)
     
     movie = get_object_or_404(Movie, id=movie_id)
-    deleted_count = MovieReview.objects.filter(
-        movie=movie, 
-        user=request.user
-    ).delete()[0]
+
+    with transaction.atomic():
+        review = MovieReview.objects.select_for_update().filter(
+            movie=movie,
+            user=request.user
+        ).first()
+
+        deleted_count = 0
+        if review:
+            deleted_count = review.delete()[0]
+            record_review_change(movie.id, review.rating, None)
     
     if deleted_count:
         logger.info("Review deleted",extra={
@@ -501,14 +461,7 @@ def toggle_review_like(request, review_id):
 
     review = get_object_or_404(MovieReview, id=review_id)
 
-    like_obj = ReviewLike.objects.filter(user=request.user, review=review)
-
-    if like_obj.exists():
-        like_obj.delete()
-        liked = False
-    else:
-        ReviewLike.objects.create(user=request.user, review=review)
-        liked = True
+    liked, like_count = toggle_like(request.user.id, review.id)
     logger.info(
     "Review like toggled",
     extra={
@@ -518,8 +471,6 @@ def toggle_review_like(request, review_id):
     }
 )
 
-    like_count = ReviewLike.objects.filter(review=review).count()
-
     return JsonResponse({
         "ok": True,
         "liked": liked,
@@ -541,25 +492,32 @@ def review_likes_list(request, review_id):
 
 
 
+@conditional(person_markers)
 def person_detail(request, person_id):
 
-    person = get_object_or_404(Person, id=person_id)
+    def load():
+        person = get_object_or_404(
+            Person.objects.prefetch_related(
+                Prefetch("cast_set", queryset=Cast.objects.select_related("movie")),
+                Prefetch("crew_set", queryset=Crew.objects.select_related("movie")),
+            ),
+            id=person_id,
+        )
 
-    # Get movies where person acted
-    acted_movies = Cast.objects.filter(
-        person=person
-    ).select_related("movie")
-    
-    # Get movies where person was crew
-    crew_movies = Crew.objects.filter(
-        person=person
-    ).select_related("movie")
+        return {
+            "person": person,
+            # Movies where the person acted / was crew
+            "acted_movies": list(person.cast_set.all()),
+            "crew_movies": list(person.crew_set.all()),
+        }
 
-    context = {
-        "person": person,
-        "acted_movies": acted_movies,
-        "crew_movies": crew_movies,
-    }
+    # Credits come from TMDB sync, which invalidates these groups
+    context = cached(
+        "person_detail",
+        person_id,
+        load,
+        depends=[group(Person), group(Movie)],
+    )
 
     return render(request, "movies/person_detail.html", context)
 
@@ -568,13 +526,11 @@ def person_detail(request, person_id):
 @login_required
 def comments_page(request, review_id):
     review = get_object_or_404(
-        MovieReview.objects.select_related("movie", "user").prefetch_related("likes"),
+        MovieReview.objects.select_related("movie", "user"),
         id=review_id
     )
 
-    review.like_count = review.likes.count()
     review.is_liked = review.likes.filter(user=request.user).exists()
-    review.comment_count = ReviewComment.objects.filter(review=review).count()
     text = (review.review_text or "").strip()
     review.show_more = (len(text) > 150) or (len(text.splitlines()) > 3)
 
@@ -589,13 +545,11 @@ def comments_page(request, review_id):
         )
     ).order_by("-created_at")
 
-    total_count = ReviewComment.objects.filter(review=review).count()
-
     context = {
         "review": review,
         "movie": review.movie,
         "parent_comments": parent_comments,
-        "total_count": total_count,
+        "total_count": review.comment_count,
         "is_owner": review.user == request.user,
     }
 
@@ -620,11 +574,13 @@ def add_comment_page(request, review_id):
         messages.error(request, "Comment too long")
         return redirect("comments-page", review_id=review_id)
 
-    ReviewComment.objects.create(
-        user=request.user,
-        review=review,
-        text=text
-    )
+    with transaction.atomic():
+        ReviewComment.objects.create(
+            user=request.user,
+            review=review,
+            text=text
+        )
+        record_comment_change(review.id, 1)
 
     messages.success(request, "Comment added")
     return redirect("comments-page", review_id=review_id)
@@ -651,12 +607,14 @@ def reply_comment_page(request, comment_id):
         messages.error(request, "Reply too long")
         return redirect("comments-page", review_id=parent.review_id)
 
-    ReviewComment.objects.create(
-        user=request.user,
-        review=parent.review,
-        parent=parent,
-        text=text
-    )
+    with transaction.atomic():
+        ReviewComment.objects.create(
+            user=request.user,
+            review=parent.review,
+            parent=parent,
+            text=text
+        )
+        record_comment_change(parent.review_id, 1)
 
     messages.success(request, "Reply added")
     return redirect("comments-page", review_id=parent.review_id)
@@ -681,7 +639,11 @@ def delete_comment_page(request, comment_id):
         return redirect("comments-page", review_id=comment.review_id)
 
     review_id = comment.review_id
-    comment.delete()
+
+    with transaction.atomic():
+        # Replies are deleted with their parent
+        _, deleted = comment.delete()
+        record_comment_change(review_id, -deleted.get(ReviewComment._meta.label, 0))
 
     messages.success(request, "Comment deleted")
     return redirect("comments-page", review_id=review_id)
@@ -708,15 +670,20 @@ def hype_vote_movie(request, movie_id):
         return redirect("movie-detail", movie_id=movie_id)
 
     if vote == "remove":
-        MovieHypeVote.objects.filter(user=request.user, movie=movie).delete()
+        with transaction.atomic():
+            old_vote = save_vote(MovieHypeVote, request.user, movie.id, None)
+
+            if old_vote:
+                record_hype_change(movie.id, old_vote, None)
+                record_hype(request.user.id, movie.id, None)
+
         messages.success(request, "Hype vote removed.")
         return redirect("movie-detail", movie_id=movie_id)
 
-    MovieHypeVote.objects.update_or_create(
-        user=request.user,
-        movie=movie,
-        defaults={"vote": vote},
-    )
+    with transaction.atomic():
+        old_vote = save_vote(MovieHypeVote, request.user, movie.id, vote)
+        record_hype_change(movie.id, old_vote, vote)
+        record_hype(request.user.id, movie.id, vote)
 
     logger.info(
         "Hype vote updated",
@@ -733,58 +700,25 @@ def hype_vote_movie(request, movie_id):
 
 @login_required
 def all_reviews_page(request, movie_id):
-    movie = get_object_or_404(Movie, id=movie_id)
+    movie = get_object_or_404(Movie.objects.select_related("stats"), id=movie_id)
 
     sort = request.GET.get("sort", "liked").strip().lower()
     if sort not in ["liked", "latest"]:
         sort = "liked"
 
-    reviews_qs = (
-        MovieReview.objects
-        .filter(movie=movie)
-        .select_related("user")
-        .annotate(like_count=Count("likes"))
-        .prefetch_related(
-            Prefetch(
-                "likes",
-                queryset=ReviewLike.objects.filter(user=request.user),
-                to_attr="user_likes"
-            ),
-            Prefetch(
-                "comments",
-                queryset=ReviewComment.objects.select_related("user").order_by("created_at")
-            )
-        )
-    )
-
-    if sort == "latest":
-        reviews_qs = reviews_qs.order_by("-created_at")
-    else:
-        reviews_qs = reviews_qs.order_by("-like_count", "-created_at")
-
-    paginator = Paginator(reviews_qs, 20)
-    page_obj = paginator.get_page(request.GET.get("page", "1"))
-
-    reviews = list(page_obj.object_list)
+    reviews_qs = reviews_queryset(movie.id, sort)
 
-    for review in reviews:
-        review.is_liked = bool(review.user_likes)
-        review.comment_count = review.comments.count()
+    # Cursor pagination: constant cost however deep the page
+    page_obj = paginate_keyset(reviews_qs, REVIEW_KEYS[sort], request.GET.get("cursor"), 20)
 
-        text = (review.review_text or "").strip()
-        review.show_more = (len(text.splitlines()) > 3) or (len(text) > 150)
-
-        review.user_vote = MovieVote.objects.filter(
-            movie=movie,
-            user=review.user
-        ).first()
+    reviews = assemble_reviews(page_obj.object_list, movie.id, viewer=request.user)
 
     return render(request, "movies/all_reviews.html", {
         "movie": movie,
         "reviews": reviews,
         "page_obj": page_obj,
         "sort": sort,
-        "total_reviews_count": reviews_qs.count(),
+        "total_reviews_count": get_movie_stats(movie).review_count,
     })
 
 
@@ -1,32 +1,44 @@
-from django.http import JsonResponse
-from django.utils import timezone
+import json
+import time
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
-from datetime import timedelta
-
-from .models import Movie, AIRequestLog
-from .services.ai_service import ai_rewrite_review, ai_extract_pros_cons, clean_text
+from django.contrib.auth.views import redirect_to_login
+
+from .models import Movie
+from .services import ai_log
+from .services.ai_cache import aget_result, astore_result, pros_cons, result_key
+from .services.ai_service import astream_rewrite_review, clean_text, route_for
+from .services.breaker import breaker_states
+from .services.ratelimit import ai_rate_limit
 import logging
 logger = logging.getLogger(__name__)
 
 
 
-def user_ai_limit_exceeded(user, action, minutes=10, limit=5):
-    since = timezone.now() - timedelta(minutes=minutes)
-    count = AIRequestLog.objects.filter(user=user, action=action, created_at__gte=since).count()
-    return count >= limit
+@sync_to_async
+def _authenticated_user(request):
+    # Resolves the lazy request.user (session + user queries) off the loop
+    return request.user if request.user.is_authenticated else None
 
 
-@login_required
-def ai_review_assistant(request, movie_id):
-    if request.method != "POST":
-        return JsonResponse({"ok": False, "error": "Invalid method"}, status=405)
+def _sse(data, event=None):
+    head = f"event: {event}\n" if event else ""
+    return f"{head}data: {json.dumps(data)}\n\n"
 
-    movie = Movie.objects.filter(id=movie_id).first()
 
-    text = clean_text(request.POST.get("text", ""))
-    mode = request.POST.get("mode", "rewrite").strip()
+def _usage_fields(meta, started):
+    # AIRequestLog accounting; meta is filled in by ai_service
+    return {
+        "model_name": meta.get("model") or "",
+        "latency_ms": round((time.monotonic() - started) * 1000),
+        "prompt_tokens": meta.get("prompt_tokens"),
+        "completion_tokens": meta.get("completion_tokens"),
+    }
+
 
-    allowed_modes = {
+ASSISTANT_MODES = {
     "rewrite",
     "shorten",
     "funny",
@@ -37,7 +49,35 @@ def ai_review_assistant(request, movie_id):
 }
 
 
-    if mode not in allowed_modes:
+def _mode_action(request):
+    # Each mode has its own budget, as when they were counted from the
+    # log. Unknown modes (rejected by the view) share the rewrite one, so
+    # made-up names can't mint fresh buckets.
+    mode = request.POST.get("mode", "rewrite").strip()
+    return mode if mode in ASSISTANT_MODES else "rewrite"
+
+
+@ai_rate_limit(_mode_action)
+async def ai_review_assistant(request, movie_id):
+    """
+    Async: the LLM call awaits on the event loop (under ASGI) instead of
+    holding a worker. Clients sending `Accept: text/event-stream` get the
+    text streamed as SSE ("data" deltas, then a "done" or "error" event);
+    others get the usual JSON once it is complete.
+    """
+    user = await _authenticated_user(request)
+    if user is None:
+        return redirect_to_login(request.get_full_path())
+
+    if request.method != "POST":
+        return JsonResponse({"ok": False, "error": "Invalid method"}, status=405)
+
+    movie = await Movie.objects.filter(id=movie_id).afirst()
+
+    text = clean_text(request.POST.get("text", ""))
+    mode = request.POST.get("mode", "rewrite").strip()
+
+    if mode not in ASSISTANT_MODES:
         return JsonResponse({"ok": False, "error": "Invalid mode"}, status=400)
 
 
@@ -49,58 +89,97 @@ def ai_review_assistant(request, movie_id):
     if len(text) > 1000:
         return JsonResponse({"ok": False, "error": "Review too long"}, status=400)
 
-    if user_ai_limit_exceeded(request.user, mode, minutes=10, limit=100):#developer mode now 
-        return JsonResponse({"ok": False, "error": "Too many requests. Try later."}, status=429)
-
-    log = AIRequestLog.objects.create(
-        user=request.user,
-        movie=movie,
-        action=mode,
-        input_text=text,
-        success=False,
-    )
-
-    try:
-        output = ai_rewrite_review(
-                text=text,
-                mode=mode,
-                movie_title=movie.title if movie else "",
-                movie_overview=movie.overview if movie and movie.overview else ""
-                )
-
-
-        log.output_text = output
-        log.success = True
-        log.save()
-
-        logger.info(
-            "AI review generated",
-            extra={
-                "user_id": request.user.id,
-                "movie_id": movie.id if movie else None,
-                "mode": mode,
-            }
+    movie_context = f"{movie.title}\n{movie.overview or ''}" if movie else ""
+    key = result_key(mode, text, movie.id if movie else None, movie_context)
+    cached_output = await aget_result(key)
+
+    log = {
+        "user": user,
+        "movie": movie,
+        "action": mode,
+        "input_text": text,
+        "cache_hit": cached_output is not None,
+    }
+
+    log_extra = {
+        "user_id": user.id,
+        "movie_id": movie.id if movie else None,
+        "mode": mode,
+    }
+
+    meta = {}
+    started = time.monotonic()
+
+    if cached_output is not None:
+        async def replay():
+            yield cached_output
+        deltas = replay()
+    else:
+        deltas = astream_rewrite_review(
+            text=text,
+            mode=mode,
+            movie_title=movie.title if movie else "",
+            movie_overview=movie.overview if movie and movie.overview else "",
+            meta=meta,
         )
 
-
-        return JsonResponse({"ok": True, "result": output})
-
+    async def finish(output=None, error=None):
+        log.update(_usage_fields(meta, started))
+        if error is None:
+            log.update(output_text=output, success=True)
+            logger.info("AI review generated", extra={**log_extra, "cache_hit": log["cache_hit"]})
+            if not log["cache_hit"] and output:
+                model_name = meta.get("model") or route_for(mode, bool(text)).model
+                await astore_result(key, mode, output, model_name)
+        else:
+            log.update(output_text=output or "", error_message=str(error)[:255])
+            logger.error("AI review failed", extra={**log_extra, "error": str(error)})
+        await ai_log.arecord(**log)
+
+    if "text/event-stream" in request.headers.get("Accept", ""):
+        async def events():
+            parts = []
+            error = RuntimeError("Client disconnected")
+            try:
+                async for delta in deltas:
+                    parts.append(delta)
+                    yield _sse({"delta": delta})
+                error = None
+            except Exception as e:
+                error = e
+            finally:
+                # Also runs when the client goes away mid-stream
+                await finish("".join(parts).strip(), error)
+
+            if error is None:
+                yield _sse({"result": "".join(parts).strip()}, event="done")
+            else:
+                yield _sse({"error": "AI failed"}, event="error")
+
+        response = StreamingHttpResponse(events(), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        # Don't let a proxy buffer the stream
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    output = ""
+    error = RuntimeError("Client disconnected")
+    try:
+        output = "".join([delta async for delta in deltas]).strip()
+        error = None
     except Exception as e:
-        log.error_message = str(e)[:255]
-        log.save()
+        error = e
+    finally:
+        await finish(output, error)
 
-        logger.error(
-        "AI review failed",
-        extra={
-            "user_id": request.user.id,
-            "movie_id": movie.id if movie else None,
-            "mode": mode,
-            "error": str(e),})
-        return JsonResponse({"ok": False, "error": str(e)}, status=500)
+    if error is not None:
+        return JsonResponse({"ok": False, "error": str(error)}, status=500)
+    return JsonResponse({"ok": True, "result": output})
     
 
 
 @login_required
+@ai_rate_limit("pros_cons")
 def ai_pros_cons(request, movie_id):
     if request.method != "POST":
         return JsonResponse({"ok": False, "error": "Invalid method"}, status=405)
@@ -120,23 +199,20 @@ def ai_pros_cons(request, movie_id):
     if len(text) > 1000:
         return JsonResponse({"ok": False, "error": "Review too long"}, status=400)
 
-    if user_ai_limit_exceeded(request.user, "pros_cons", minutes=10, limit=100): #for developer mode now 
-
-        return JsonResponse({"ok": False, "error": "Too many requests. Try later."}, status=429)
-
-    log = AIRequestLog.objects.create(
-        user=request.user,
-        movie=movie,
-        action="pros_cons",
-        input_text=text,
-        success=False,
-    )
+    log = {
+        "user": request.user,
+        "movie": movie,
+        "action": "pros_cons",
+        "input_text": text,
+    }
+    meta = {}
+    started = time.monotonic()
 
     try:
-        data = ai_extract_pros_cons(text)
-        log.output_text = f"Pros: {data.get('pros')} | Cons: {data.get('cons')}"
-        log.success = True
-        log.save()
+        data, log["cache_hit"] = pros_cons(text, meta)
+        log["output_text"] = f"Pros: {data.get('pros')} | Cons: {data.get('cons')}"
+        log["success"] = True
+        ai_log.record(**log, **_usage_fields(meta, started))
 
         logger.info(
             "AI pros/cons generated",
@@ -150,8 +226,8 @@ def ai_pros_cons(request, movie_id):
         return JsonResponse({"ok": True, "pros": data["pros"], "cons": data["cons"]})
 
     except Exception as e:
-        log.error_message = str(e)[:255]
-        log.save()
+        log["error_message"] = str(e)[:255]
+        ai_log.record(**log, **_usage_fields(meta, started))
 
         logger.error(
         "AI pros/cons failed",
@@ -169,6 +245,7 @@ from django.shortcuts import get_object_or_404
 from .models import MovieReview
 
 @login_required
+@ai_rate_limit("pros_cons")
 def ai_pros_cons_review(request, review_id):
     if request.method != "POST":
         return JsonResponse({"ok": False, "error": "Invalid method"}, status=405)
@@ -185,23 +262,21 @@ def ai_pros_cons_review(request, review_id):
         return JsonResponse({"ok": False, "error": "Write at least 10 characters"}, status=400)
     
 
-    if user_ai_limit_exceeded(request.user, "pros_cons", minutes=10, limit=100):
-        return JsonResponse({"ok": False, "error": "Too many requests. Try later."}, status=429)
-
-    log = AIRequestLog.objects.create(
-        user=request.user,
-        movie=review.movie,
-        action="pros_cons",
-        input_text=text,
-        success=False,
-    )
+    log = {
+        "user": request.user,
+        "movie": review.movie,
+        "action": "pros_cons",
+        "input_text": text,
+    }
+    meta = {}
+    started = time.monotonic()
 
     try:
-        data = ai_extract_pros_cons(text)
+        data, log["cache_hit"] = pros_cons(text, meta)
         
-        log.output_text = f"Pros: {data.get('pros')} | Cons: {data.get('cons')}"
-        log.success = True
-        log.save()
+        log["output_text"] = f"Pros: {data.get('pros')} | Cons: {data.get('cons')}"
+        log["success"] = True
+        ai_log.record(**log, **_usage_fields(meta, started))
 
         logger.info(
             "AI pros/cons generated",
@@ -217,8 +292,8 @@ def ai_pros_cons_review(request, review_id):
 
         return JsonResponse({"ok": True, "pros": data["pros"], "cons": data["cons"]})
     except Exception as e:
-        log.error_message = str(e)[:255]
-        log.save()
+        log["error_message"] = str(e)[:255]
+        ai_log.record(**log, **_usage_fields(meta, started))
 
         logger.error(
             "AI pros/cons failed",
@@ -230,3 +305,9 @@ def ai_pros_cons_review(request, review_id):
             }
         )
         return JsonResponse({"ok": False, "error": "AI failed"}, status=500)
+
+
+@staff_member_required
+def ai_status(request):
+    """Circuit breaker state per Groq model, as seen by this worker process."""
+    return JsonResponse({"breakers": breaker_states()})